@@ -45,6 +45,8 @@ from .constants import (
     TRANSLATE_AUTHORS,
     ENABLE_FEEDS,
     ADMIN_LIST_FILTERS,
+    SEARCH_ANALYTICS,
+    SEARCH_SLOW_THRESHOLD,
 )
 if IS_THERE_COMPANIES:
     from js_companies.models import Company
@@ -383,8 +385,8 @@ class NewsBlogConfigAdmin(
 
     fields = (
             'app_title', 'show_landing_page', 'allow_post', 'permalink_type', 'non_permalink_handling',
-            'template_prefix', 'paginate_by', 'pagination_pages_start',
-            'pagination_pages_visible', 'exclude_featured',
+            'template_prefix', 'paginate_by', 'pagination_type', 'pagination_pages_start',
+            'pagination_pages_visible', 'exclude_featured', 'list_prefetch_plan',
             'create_authors', 'search_indexed', 'show_in_listing',
             'show_in_related', 'show_in_specific',
             'show_logo', 'auto_read_time',
@@ -422,3 +424,61 @@ if ENABLE_FEEDS:
     admin.site.register(models.NewsBlogFeed, NewsBlogFeedAdmin)
 
 admin.site.register(models.ArticleMedium)
+
+
+class SearchQueryProblemFilter(admin.SimpleListFilter):
+    title = _('problem')
+    parameter_name = 'problem'
+
+    def lookups(self, request, model_admin):
+        return (
+            ('slow', _('slow')),
+            ('zero', _('no results')),
+        )
+
+    def queryset(self, request, queryset):
+        if self.value() == 'slow':
+            return queryset.filter(slow_searches__gt=0).order_by('-max_time')
+        if self.value() == 'zero':
+            return queryset.filter(zero_results__gt=0).order_by(
+                '-zero_results')
+        return queryset
+
+
+class ArticleSearchQueryAdmin(admin.ModelAdmin):
+    """
+    Read only statistics of the searches, to find the slow queries and the
+    ones without results.
+    """
+    list_display = (
+        'query', 'language_code', 'namespace', 'searches', 'zero_results',
+        'slow_searches', 'average_time_view', 'max_time_view',
+        'last_searched')
+    list_filter = (SearchQueryProblemFilter, 'language_code', 'namespace')
+    search_fields = ('query', )
+    ordering = ('-searches', )
+    readonly_fields = [
+        field.name for field in models.ArticleSearchQuery._meta.fields]
+
+    def average_time_view(self, obj):
+        return '{0:.3f}s'.format(obj.average_time)
+    average_time_view.short_description = _('average database time')
+
+    def max_time_view(self, obj):
+        return '{0:.3f}s'.format(obj.max_time)
+    max_time_view.short_description = _('slowest database time')
+    max_time_view.admin_order_field = 'max_time'
+
+    def has_add_permission(self, request):
+        return False
+
+    def changelist_view(self, request, extra_context=None):
+        extra_context = dict(extra_context or {})
+        extra_context['title'] = _(
+            'Search queries (slow above {0}s)').format(SEARCH_SLOW_THRESHOLD)
+        return super(ArticleSearchQueryAdmin, self).changelist_view(
+            request, extra_context)
+
+
+if SEARCH_ANALYTICS:
+    admin.site.register(models.ArticleSearchQuery, ArticleSearchQueryAdmin)
@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.db import IntegrityError, connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from django.utils.timezone import now
+
+from .constants import (
+    SEARCH_ANALYTICS,
+    SEARCH_ANALYTICS_DAYS,
+    SEARCH_SLOW_THRESHOLD,
+)
+from .models import ArticleSearchQuery
+
+
+def normalize_query(query):
+    """
+    Returns the query lower cased, with its whitespace collapsed, so that
+    the same search is counted once.
+    """
+    return ' '.join((query or '').lower().split())[:255]
+
+
+class SearchTimer(object):
+    """
+    Sums the time spent in database queries, and remembers the slowest one,
+    while it is installed as execute wrapper.
+    """
+
+    def __init__(self):
+        self.db_time = 0
+        self.slowest = (0, '')
+        self.results = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.time()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.time() - started
+            self.db_time += elapsed
+            if elapsed > self.slowest[0]:
+                self.slowest = (elapsed, sql)
+
+
+@contextmanager
+def track_search(query, language, namespace, enabled=SEARCH_ANALYTICS):
+    """
+    Records the search for the given query with the database time of the
+    queries run inside the block. Set the number of results as the
+    `results` attribute of the yielded timer. Yields None and records
+    nothing when disabled (ARTICLES_SEARCH_ANALYTICS is off by default) or
+    the query is empty.
+    """
+    query = normalize_query(query)
+    if not (enabled and query):
+        yield None
+        return
+    timer = SearchTimer()
+    with connection.execute_wrapper(timer):
+        yield timer
+    record_search(
+        query, language, namespace, timer.results or 0, timer.db_time,
+        timer.slowest[1])
+
+
+def record_search(query, language, namespace, results, db_time, sql=''):
+    """
+    Adds a search to the statistics of its (normalised) query, language and
+    namespace.
+    """
+    language = language or ''
+    namespace = namespace or ''
+    slow = db_time >= SEARCH_SLOW_THRESHOLD
+    searched = now()
+    changes = {
+        'searches': F('searches') + 1,
+        'zero_results': F('zero_results') + (0 if results else 1),
+        'slow_searches': F('slow_searches') + (1 if slow else 0),
+        'last_results': results,
+        'total_time': F('total_time') + db_time,
+        'max_time': Greatest(F('max_time'), Value(db_time)),
+        'last_searched': searched,
+    }
+    if slow:
+        changes['slow_sql'] = sql
+    entries = ArticleSearchQuery.objects.filter(
+        query=query, language_code=language, namespace=namespace)
+    if entries.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            ArticleSearchQuery.objects.create(
+                query=query, language_code=language, namespace=namespace,
+                searches=1, zero_results=0 if results else 1,
+                slow_searches=1 if slow else 0, last_results=results,
+                total_time=db_time, max_time=db_time,
+                slow_sql=sql if slow else '', last_searched=searched)
+    except IntegrityError:
+        # created concurrently
+        entries.update(**changes)
+        return
+    # new queries are rare enough to drop the stale ones with them
+    ArticleSearchQuery.objects.filter(
+        last_searched__lt=searched - timedelta(days=SEARCH_ANALYTICS_DAYS),
+    ).delete()
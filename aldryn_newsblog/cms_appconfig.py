@@ -13,6 +13,8 @@ from django.db import models
 from django.utils.translation import ugettext_lazy as _
 from parler.models import TranslatableModel, TranslatedFields
 
+from .constants import LIST_PREFETCH_PLAN_CHOICES
+
 
 PERMALINK_CHOICES = (
     ('s', _('the-eagle-has-landed/', )),
@@ -29,6 +31,14 @@ NON_PERMALINK_HANDLING = (
     (404, _('Return 404: Not Found')),
 )
 
+PAGINATION_NUMBERS = 'numbers'
+PAGINATION_KEYSET = 'keyset'
+
+PAGINATION_TYPE_CHOICES = (
+    (PAGINATION_NUMBERS, _('Numbered pages')),
+    (PAGINATION_KEYSET, _('Previous / next only (faster on large sections)')),
+)
+
 # TODO override default if support for Django 1.6 will be dropped
 TEMPLATE_PREFIX_CHOICES = getattr(
     settings, 'ALDRYN_NEWSBLOG_TEMPLATE_PREFIXES', [])
@@ -69,6 +79,16 @@ class NewsBlogConfig(TranslatableModel, AppHookConfig):
         default=5,
         help_text=_('When paginating list views, how many articles per page?'),
     )
+    pagination_type = models.CharField(
+        _('Pagination type'),
+        max_length=10,
+        blank=False,
+        default=PAGINATION_NUMBERS,
+        choices=PAGINATION_TYPE_CHOICES,
+        help_text=_('Previous / next pagination skips counting the articles '
+                    'and stays fast on deep pages, but shows no page '
+                    'numbers. Numbered links (?page=N) keep working.'),
+    )
     pagination_pages_start = models.PositiveIntegerField(
         _('Pagination pages start'),
         blank=False,
@@ -93,6 +113,16 @@ class NewsBlogConfig(TranslatableModel, AppHookConfig):
             'article list itself to avoid duplicates. To do this, enter the '
             'same number here as in your Featured Articles plugin.'),
     )
+    list_prefetch_plan = models.CharField(
+        _('List prefetch plan'),
+        max_length=32,
+        blank=True,
+        default='default',
+        choices=LIST_PREFETCH_PLAN_CHOICES,
+        help_text=_('Which related objects are loaded up-front for the '
+                    'articles of a list page. Leave the default unless a '
+                    'custom plan has been configured for this section.'),
+    )
     template_prefix = models.CharField(
         max_length=20,
         null=True, blank=True,
@@ -182,6 +212,9 @@ class NewsBlogConfig(TranslatableModel, AppHookConfig):
     )
     custom_fields_settings = JSONField(blank=True, null=True)
     custom_fields = JSONField(blank=True, null=True)
+    # also bumped when one of the section's articles changes, see
+    # aldryn_newsblog.models.touch_sections
+    last_modified = models.DateTimeField(_('last modified'), auto_now=True)
 
     def get_app_title(self):
         return getattr(self, 'app_title', _('untitled'))
@@ -209,6 +242,9 @@ class NewsBlogFeed(TranslatableModel, AppHookConfig):
         blank=False,
         default=25,
     )
+    # also bumped when one of the feed's articles changes, see
+    # aldryn_newsblog.models.touch_sections
+    last_modified = models.DateTimeField(_('last modified'), auto_now=True)
 
     def get_app_title(self):
         return getattr(self, 'app_title', _('untitled'))
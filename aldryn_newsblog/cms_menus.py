@@ -33,7 +33,8 @@ class NewsBlogMenu(CMSAttachMenu):
     def get_nodes(self, request):
         nodes = []
         language = get_language_from_request(request, check_path=True)
-        articles = self.get_queryset(request).active_translations(language)
+        articles = self.get_queryset(request).active_translations(
+            language).light_translations().with_urls(language)
 
         if hasattr(self, 'instance') and self.instance:
             app = apphook_pool.get_apphook(self.instance.application_urls)
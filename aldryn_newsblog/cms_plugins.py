@@ -5,14 +5,17 @@ import datetime
 
 from distutils.version import LooseVersion
 from django.db.models import Q
+from django.utils.functional import SimpleLazyObject
 from django.utils.translation import ugettext_lazy as _
 from django.template import TemplateDoesNotExist
 from django.template.loader import select_template
 
+from aldryn_categories.models import Category
+from aldryn_people.models import Person
 from cms import __version__ as cms_version
 from cms.plugin_base import CMSPluginBase
 from cms.plugin_pool import plugin_pool
-from . import models, forms, default_medium
+from . import models, forms
 from .constants import (
     IS_THERE_COMPANIES,
     ADDITIONAL_CHILD_CLASSES,
@@ -21,7 +24,7 @@ from .constants import (
 )
 if IS_THERE_COMPANIES:
     from js_companies.models import Company
-from .utils import add_prefix_to_path, default_reverse
+from .utils import add_prefix_to_path, default_reverse, get_current_article
 
 CMS_GTE_330 = LooseVersion(cms_version) >= LooseVersion('3.3.0')
 
@@ -109,15 +112,7 @@ class NewsBlogRelatedPlugin(AdjustableCacheMixin, NewsBlogPlugin):
     ]
 
     def get_article(self, request):
-        if request and request.resolver_match:
-            view_name = request.resolver_match.view_name
-            namespace = request.resolver_match.namespace
-            if view_name == '{0}:article-detail'.format(namespace):
-                article = models.Article.objects.active_translations(
-                    slug=request.resolver_match.kwargs['slug'])
-                if article.count() == 1:
-                    return article[0]
-        return None
+        return get_current_article(request)
 
     def render(self, context, instance, placeholder):
         context['instance'] = instance
@@ -162,15 +157,7 @@ class NewsBlogJSRelatedPlugin(AdjustableCacheMixin, NewsBlogPlugin):
     author = None
 
     def get_article(self, request):
-        if request and request.resolver_match:
-            view_name = request.resolver_match.view_name
-            namespace = request.resolver_match.namespace
-            if view_name == '{0}:article-detail'.format(namespace):
-                article = models.Article.objects.active_translations(
-                    slug=request.resolver_match.kwargs['slug'])
-                if article.count() == 1:
-                    return article[0]
-        return None
+        return get_current_article(request)
 
     def if_search_page(self, request):
         if request and request.resolver_match:
@@ -188,101 +175,96 @@ class NewsBlogJSRelatedPlugin(AdjustableCacheMixin, NewsBlogPlugin):
         context['more_button_is_shown'] = instance.more_button_is_shown
         context['more_button_text'] = instance.more_button_text
         context['more_button_link'] = instance.more_button_link
-        layout = instance.layout
-        featured = instance.featured
-        exclude_current_article = instance.exclude_current_article
-        related_types = instance.related_types
-        related_mediums = instance.related_mediums
-        related_authors = instance.related_authors
-        related_categories = instance.related_categories
-        related_service_sections = instance.related_service_sections
-        related_services = instance.related_services
-        if IS_THERE_COMPANIES:
-            related_companies = instance.related_companies.all()
+        selections = instance.get_selections()
+        related_types = selections['related_types']
+        related_mediums = selections['related_mediums']
+        related_authors = selections['related_authors']
 
         if self.if_search_page(request):
             qs = context['object_list']
-            if related_types.exists():
-                qs = qs.filter(app_config__in=related_types.all())
-        elif related_types.exists():
-            qs = models.Article.all_objects.published().distinct()
-            qs = qs.filter(app_config__in=related_types.all())
+            if related_types:
+                qs = qs.filter(app_config__in=related_types)
+        elif related_types:
+            qs = models.Article.all_objects.published()
+            qs = qs.filter(app_config__in=related_types)
         else:
-            qs = models.Article.objects.published().distinct()
-        if related_mediums.exists():
-            if related_mediums.count() == 1 and related_mediums.first().title == default_medium:
+            qs = models.Article.objects.published()
+        if related_mediums:
+            if len(related_mediums) == 1 and selections['default_medium']:
                 qs = qs.filter(medium__isnull=True)
             else:
-                qs = qs.filter(medium__in=related_mediums.all())
-            context['related_mediums'] = related_mediums.all()
-        if related_authors.exists():
-            if TRANSLATE_AUTHORS:
-                if related_authors.count() == 1:
-                    self.author = related_authors.first()
+                qs = qs.filter(medium__in=related_mediums)
+            context['related_mediums'] = instance.related_mediums.all()
+        if related_authors:
+            if len(related_authors) == 1:
+                author_pk = related_authors[0]
+                self.author = SimpleLazyObject(
+                    lambda: Person.objects.get(pk=author_pk))
+                if TRANSLATE_AUTHORS:
                     qs = qs.translated(
-                        Q(author_trans=self.author) |
-                        Q(author_2_trans=self.author) |
-                        Q(author_3_trans=self.author)
+                        Q(author_trans=author_pk) |
+                        Q(author_2_trans=author_pk) |
+                        Q(author_3_trans=author_pk)
                     )
                 else:
-                    qs = qs.translated(author_trans__in=related_authors.all())
-            else:
-                if related_authors.count() == 1:
-                    self.author = related_authors.first()
                     qs = qs.filter(
-                        Q(author=self.author) |
-                        Q(author_2=self.author) |
-                        Q(author_3=self.author)
+                        Q(author=author_pk) |
+                        Q(author_2=author_pk) |
+                        Q(author_3=author_pk)
                     )
-                else:
-                    qs = qs.filter(author__in=related_authors.all())
-            context['related_authors'] = related_authors.all()
-        if related_categories.exists():
-            qs = qs.filter(categories__in=related_categories.all())
-            context['related_categories'] = related_categories.all()
-        if related_service_sections.exists():
-            qs = qs.filter(services__sections__in=related_service_sections.all())
-            context['related_service_sections'] = related_service_sections.all()
-        if related_services.exists():
-            qs = qs.filter(services__in=related_services.all())
-            context['related_services'] = related_services.all()
-        if IS_THERE_COMPANIES and related_companies.exists():
-            qs = qs.filter(companies__in=related_companies.all())
-            context['related_companies'] = related_companies.all()
-        if exclude_current_article:
+            elif TRANSLATE_AUTHORS:
+                qs = qs.translated(author_trans__in=related_authors)
+            else:
+                qs = qs.filter(author__in=related_authors)
+            context['related_authors'] = instance.related_authors.all()
+        if selections['related_categories']:
+            qs = qs.filter_exists(
+                'categories', pk__in=selections['related_categories'])
+            context['related_categories'] = instance.related_categories.all()
+        if selections['related_service_sections']:
+            qs = qs.filter_exists(
+                'services', sections__in=selections['related_service_sections'])
+            context['related_service_sections'] = (
+                instance.related_service_sections.all())
+        if selections['related_services']:
+            qs = qs.filter_exists(
+                'services', pk__in=selections['related_services'])
+            context['related_services'] = instance.related_services.all()
+        if IS_THERE_COMPANIES and selections['related_companies']:
+            qs = qs.filter_exists(
+                'companies', pk__in=selections['related_companies'])
+            context['related_companies'] = instance.related_companies.all()
+        if instance.exclude_current_article:
             current_article = self.get_article(request)
             if current_article is not None:
                 qs = qs.exclude(id=current_article.id)
-        if featured:
+        if instance.featured:
             if TRANSLATE_IS_PUBLISHED:
                 qs = qs.translated(is_featured_trans=True)
             else:
                 qs = qs.filter(is_featured=True)
-        related_articles = qs.filter(app_config__show_in_related=True)
-        articles_with_images = qs.exclude(featured_image__isnull=True)
+        related_articles = qs.filter(
+            app_config__show_in_related=True).prefetch_plan()
+        related_articles = related_articles.light_translations().with_urls()
 
         context['related_articles'] = related_articles[:int(instance.number_of_articles)]
         context['related_articles_all'] = related_articles
-
-        context['show_images'] = True
-        for article in context['related_articles']:
-            if not article.featured_image:
-                context['show_images'] = False
-                break
-
-        related_types_first = instance.related_types.first()
-        if related_types_first is not None:
-            context['related_types_first'] = related_types_first.namespace
-        else:
-            context['related_types_first'] = 'all'
-        related_categories_first = instance.related_categories.all().first()
-        if related_categories_first is not None:
-            context['related_categories_first'] = related_categories_first.slug
+        # evaluates the (cached) page of articles, the images are not loaded
+        context['show_images'] = all(
+            article.featured_image_id is not None
+            for article in context['related_articles'])
+
+        context['related_types_first'] = (
+            selections['related_types_first'] or 'all')
+        if selections['related_categories']:
+            category_pk = selections['related_categories'][0]
+            context['related_categories_first'] = SimpleLazyObject(
+                lambda: Category.objects.get(pk=category_pk).slug)
         else:
             context['related_categories_first'] = 'all'
-        related_authors_first = instance.related_authors.all().first()
-        if related_authors_first is not None:
-            context['related_authors_first'] = related_authors_first.slug
+        if related_authors:
+            context['related_authors_first'] = SimpleLazyObject(
+                lambda: Person.objects.get(pk=related_authors[0]).slug)
 
         context['author'] = self.author
         return context
@@ -291,10 +273,11 @@ class NewsBlogJSRelatedPlugin(AdjustableCacheMixin, NewsBlogPlugin):
         super().save_model(request, obj, form, change)
         if IS_THERE_COMPANIES:
             obj.related_companies.set(Company.objects.filter(pk__in=form.cleaned_data.get('related_companies')))
+        obj.__dict__.pop('_selections', None)
 
     def get_render_template(self, context, instance, placeholder):
         layout = instance.layout
-        if layout == 'default' and self.author:
+        if layout == 'default' and self.author is not None:
             layout = 'by_author'
         if layout:
             template = self.TEMPLATE_NAME % layout
@@ -26,6 +26,7 @@ from aldryn_translation_tools.utils import (
 
 from .models import Article
 from .cms_appconfig import NewsBlogConfig
+from .utils import get_current_article
 
 from cms.cms_toolbars import (
     ADMIN_MENU_IDENTIFIER,
@@ -80,6 +81,8 @@ class NewsBlogToolbar(CMSToolbar):
             view_name = self.request.resolver_match.view_name
         except AttributeError:
             view_name = None
+        # If we're on an Article detail page, then get the article
+        article = get_current_article(self.request)
 
         if user and view_name:
             language = get_language_from_request(self.request, check_path=True)
@@ -91,16 +94,6 @@ class NewsBlogToolbar(CMSToolbar):
             # add new Articles item
             admin_menu.add_sideframe_item(_('Articles'), url='/admin/aldryn_newsblog/article/', position=0)
 
-            # If we're on an Article detail page, then get the article
-            if view_name == '{0}:article-detail'.format(config.namespace):
-                kwargs = self.request.resolver_match.kwargs
-                if 'pk' in kwargs:
-                    article = Article.all_objects.filter(pk=kwargs['pk']).first()
-                elif 'slug' in kwargs:
-                    filter_kwargs = {'slug': kwargs['slug']}
-                    article = Article.all_objects.active_translations(language, **filter_kwargs).first()
-            else:
-                article = None
             menu = self.toolbar.get_or_create_menu('newsblog-app',
                                                    config.get_app_title())
 
@@ -95,6 +95,26 @@ SITEMAP_PRIORITY = getattr(
     'ARTICLES_SITEMAP_PRIORITY',
     0.5,
 )
+# Number of articles loaded per query by the streamed and pre-generated
+# sitemaps (see aldryn_newsblog.sitemaps.streaming).
+SITEMAP_CHUNK_SIZE = getattr(
+    settings,
+    'ARTICLES_SITEMAP_CHUNK_SIZE',
+    500,
+)
+# Directory where gzipped sitemaps of each section and language are written
+# whenever an article is published or unpublished, None to not write them.
+SITEMAP_ROOT = getattr(
+    settings,
+    'ARTICLES_SITEMAP_ROOT',
+    None,
+)
+# Protocol of the urls of the pre-generated sitemaps.
+SITEMAP_PROTOCOL = getattr(
+    settings,
+    'ARTICLES_SITEMAP_PROTOCOL',
+    'https',
+)
 SHOW_CONTER_FILTERS = getattr(
     settings,
     'ARTICLES_SHOW_CONTER_FILTERS',
@@ -121,6 +141,60 @@ TRANSLATE_AUTHORS = getattr(
     'ARTICLES_TRANSLATE_AUTHORS',
     False,
 )
+
+# Named eager-loading plans for article list pages. Each plan lists the
+# relations to join (select_related) and to batch-load (prefetch_related) for
+# the rows of the current page, so a page costs a fixed number of queries
+# regardless of its size. Sections pick a plan by name, see
+# NewsBlogConfig.list_prefetch_plan.
+LIST_PREFETCH_PLANS = {
+    'none': {
+        'select_related': (),
+        'prefetch_related': (),
+    },
+    'default': {
+        'select_related': (
+            'app_config',
+            'featured_image',
+            'medium',
+        ) + (() if TRANSLATE_AUTHORS else (
+            'author',
+            'author_2',
+            'author_3',
+        )),
+        'prefetch_related': (
+            'translations',
+            'app_config__translations',
+            'categories__translations',
+            'services__translations',
+            'locations',
+        ) + ((
+            'translations__author_trans',
+            'translations__author_2_trans',
+            'translations__author_3_trans',
+        ) if TRANSLATE_AUTHORS else ()),
+    },
+}
+LIST_PREFETCH_PLANS.update(getattr(
+    settings,
+    'ARTICLES_LIST_PREFETCH_PLANS',
+    {},
+))
+LIST_PREFETCH_PLAN_CHOICES = [
+    (name, name) for name in sorted(LIST_PREFETCH_PLANS)]
+# Translated fields that querysets using ArticleQuerySet.light_translations()
+# (lists, menus, feeds, sitemaps and plugins) don't load with the rest.
+DEFERRED_TRANSLATION_FIELDS = getattr(
+    settings,
+    'ARTICLES_DEFERRED_TRANSLATION_FIELDS',
+    (
+        'search_data',
+        'search_vector',
+        'summary',
+        'meta_description',
+        'meta_keywords',
+    ),
+)
 GET_NEXT_ARTICLE = getattr(
     settings,
     'ARTICLES_GET_NEXT_ARTICLE',
@@ -162,6 +236,11 @@ RELATED_ARTICLES_NEW_STYLE = getattr(
     'ARTICLES_RELATED_ARTICLES_NEW_STYLE',
     False
 )
+RELATED_ARTICLES_PAGINATION = getattr(
+    settings,
+    'ARTICLES_RELATED_ARTICLES_PAGINATION',
+    'numbers',
+)
 RELATED_ARTICLES_NEVER_CACHE = getattr(
     settings,
     'ARTICLES_RELATED_ARTICLES_NEVER_CACHE',
@@ -189,3 +268,136 @@ USE_CACHE = getattr(
     'JUMPSUITE_USE_CACHE',
     {}
 )
+
+# Seconds to cache each rendered article list item for. The cached fragments
+# are keyed by the article's version stamp, which is bumped whenever the
+# article, its relations or its placeholder plugins change. 0 disables it.
+ITEM_CACHE_TIMEOUT = getattr(
+    settings,
+    'ARTICLES_ITEM_CACHE_TIMEOUT',
+    0
+)
+
+# Seconds the month archive of AllManager.get_months_cached() is kept. It is
+# invalidated as soon as an article is published, unpublished or re-dated.
+MONTHS_CACHE_TIMEOUT = getattr(
+    settings,
+    'ARTICLES_MONTHS_CACHE_TIMEOUT',
+    60 * 60 * 24
+)
+
+# Seconds the index text of each plugin is cached when computing the
+# search_data of articles. It is keyed by the last change of the plugin and
+# its children, so edits are picked up at once. 0 disables it.
+PLUGIN_INDEX_CACHE_TIMEOUT = getattr(
+    settings,
+    'ARTICLES_PLUGIN_INDEX_CACHE_TIMEOUT',
+    60 * 60 * 24 * 7
+)
+
+# Seconds the previous and next articles of ArticleDetail (see
+# ARTICLES_GET_NEXT_ARTICLE) are cached, they are invalidated like the months.
+NEIGHBOURS_CACHE_TIMEOUT = getattr(
+    settings,
+    'ARTICLES_NEIGHBOURS_CACHE_TIMEOUT',
+    60 * 60 * 24
+)
+
+# Whether the article detail, list and feed views send ETag and Last-Modified
+# headers, and answer conditional requests of anonymous visitors with 304 Not
+# Modified before rendering. They are derived from the last_modified of the
+# article, its section (or feed) and the CMS page, and from the latest
+# publishing date of the section.
+CONDITIONAL_GET = getattr(
+    settings,
+    'ARTICLES_CONDITIONAL_GET',
+    True
+)
+
+# Seconds the documents of the article feeds are cached for anonymous
+# requests. They are keyed by the feed's ETag (see ARTICLES_CONDITIONAL_GET),
+# so any change of their articles builds a new one. 0 disables it, see also
+# the warm_article_feeds command.
+FEED_CACHE_TIMEOUT = getattr(
+    settings,
+    'ARTICLES_FEED_CACHE_TIMEOUT',
+    60 * 60 * 24
+)
+
+# Backend used by the article search view and the search filters: 'auto'
+# (full text search on PostgreSQL, icontains lookups elsewhere),
+# 'postgres', 'trigram' (typo tolerant, for search-as-you-type),
+# 'icontains' or the dotted path of a backend class, see
+# aldryn_newsblog.search.
+SEARCH_BACKEND = getattr(
+    settings,
+    'ARTICLES_SEARCH_BACKEND',
+    'auto'
+)
+# When the search data of articles whose plugins were edited is recomputed:
+# 'on_commit' (once per article and language, after the editing transaction
+# commits) or 'deferred' (by the process_search_data_queue command).
+SEARCH_DATA_QUEUE = getattr(
+    settings,
+    'ARTICLES_SEARCH_DATA_QUEUE',
+    'on_commit'
+)
+# When the facet counts of the sections whose articles changed are
+# recounted: 'on_commit' (once per section, after the saving transaction
+# commits) or 'deferred' (by the process_facet_queue command). Counts that
+# expire when scheduled articles go live are always left to the command.
+FACETS_QUEUE = getattr(
+    settings,
+    'ARTICLES_FACETS_QUEUE',
+    'on_commit'
+)
+# Whether the search results show snippets of the matching article content
+# (as article.search_snippet), computed by the search backend for the
+# current page only.
+SEARCH_SNIPPETS = getattr(
+    settings,
+    'ARTICLES_SEARCH_SNIPPETS',
+    False
+)
+# Whether the searches of the search view and the list filters are recorded
+# (see aldryn_newsblog.analytics), with their database time. Searches over
+# SEARCH_SLOW_THRESHOLD seconds are counted as slow and keep their slowest SQL
+# query, queries not searched for SEARCH_ANALYTICS_DAYS are dropped.
+SEARCH_ANALYTICS = getattr(
+    settings,
+    'ARTICLES_SEARCH_ANALYTICS',
+    False
+)
+SEARCH_SLOW_THRESHOLD = getattr(
+    settings,
+    'ARTICLES_SEARCH_SLOW_THRESHOLD',
+    0.5
+)
+SEARCH_ANALYTICS_DAYS = getattr(
+    settings,
+    'ARTICLES_SEARCH_ANALYTICS_DAYS',
+    30
+)
+# Postgres text search configuration per language code, other languages
+# use 'simple'.
+SEARCH_CONFIGS = getattr(
+    settings,
+    'ARTICLES_SEARCH_CONFIGS',
+    {
+        'da': 'danish',
+        'de': 'german',
+        'en': 'english',
+        'es': 'spanish',
+        'fi': 'finnish',
+        'fr': 'french',
+        'hu': 'hungarian',
+        'it': 'italian',
+        'nl': 'dutch',
+        'no': 'norwegian',
+        'pt': 'portuguese',
+        'ro': 'romanian',
+        'ru': 'russian',
+        'sv': 'swedish',
+        'tr': 'turkish',
+    }
+)
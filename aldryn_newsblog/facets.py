@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Min
+from django.db.models.functions import TruncMonth
+from django.utils import translation
+from django.utils.timezone import now
+
+from .constants import TRANSLATE_IS_PUBLISHED
+from .models import Article, ArticleFacetCount, ArticleFacetQueue
+
+FRESH_KEY = 'aldryn_newsblog-facets-fresh-{0}-{1}'
+
+M2M_FACETS = (
+    ('category', 'categories'),
+    ('location', 'locations'),
+    ('service', 'services'),
+)
+FK_FACETS = (
+    ('author', 'author'),
+    ('medium', 'medium'),
+)
+
+
+def get_facet_language(language=None):
+    """
+    Counts only depend on the language when publishing is per translation.
+    """
+    if not TRANSLATE_IS_PUBLISHED:
+        return ''
+    return language or translation.get_language()
+
+
+def get_facet_languages():
+    """
+    Returns the languages in which the counts of a namespace are stored.
+    """
+    if not TRANSLATE_IS_PUBLISHED:
+        return ['']
+    return [code for code, __ in settings.LANGUAGES]
+
+
+def month_key(value):
+    return '{0:04d}-{1:02d}'.format(value.year, value.month)
+
+
+def count_facets(namespace, language=''):
+    """
+    Yields (facet, key, count) for all facets of the published articles in
+    the given namespace, using one grouped query per facet.
+    """
+    with translation.override(language or translation.get_language()):
+        articles = Article.objects.published().namespace(namespace)
+    article_pks = articles.values('pk')
+
+    for facet, field_name in M2M_FACETS:
+        field = Article._meta.get_field(field_name)
+        target = field.m2m_reverse_field_name()
+        counts = field.remote_field.through._base_manager.filter(**{
+            '{0}__in'.format(field.m2m_field_name()): article_pks,
+        }).values_list(target).annotate(count=Count('pk')).order_by()
+        for key, count in counts:
+            yield facet, str(key), count
+
+    for facet, field_name in FK_FACETS:
+        counts = articles.exclude(**{field_name: None}).values_list(
+            field_name).annotate(count=Count('pk')).order_by()
+        for key, count in counts:
+            yield facet, str(key), count
+
+    counts = articles.annotate(
+        month=TruncMonth('publishing_date')).values_list('month').annotate(
+            count=Count('pk')).order_by()
+    for month, count in counts:
+        yield 'month', month_key(month), count
+
+
+def get_fresh_timeout(namespace):
+    """
+    Counts must be recomputed when the next scheduled article of the
+    namespace goes live, even though nothing has been saved.
+    """
+    next_date = Article.all_objects.namespace(namespace).filter(
+        publishing_date__gt=now()).aggregate(
+            next_date=Min('publishing_date'))['next_date']
+    if next_date is None:
+        return None
+    return max(int((next_date - now()).total_seconds()) + 1, 1)
+
+
+def refresh_facet_counts(namespace, language=None):
+    """
+    Replaces the stored facet counts of the given namespace (and language,
+    if publishing is per translation) with freshly computed ones.
+    """
+    language = get_facet_language(language)
+    rows = [
+        ArticleFacetCount(
+            namespace=namespace, language_code=language,
+            facet=facet, key=key, count=count)
+        for facet, key, count in count_facets(namespace, language)]
+    try:
+        with transaction.atomic():
+            ArticleFacetCount.objects.filter(
+                namespace=namespace, language_code=language).delete()
+            ArticleFacetCount.objects.bulk_create(rows)
+    except IntegrityError:
+        # a concurrent refresh got there first, its rows are just as fresh
+        return
+    cache.set(
+        FRESH_KEY.format(namespace, language), True,
+        get_fresh_timeout(namespace))
+
+
+def refresh_namespace_facet_counts(namespace):
+    """
+    Recounts the facets of the given namespace in all languages. Called by
+    the facet queue (see ArticleFacetQueue) for the namespaces whose
+    articles changed.
+    """
+    for language in get_facet_languages():
+        refresh_facet_counts(namespace, language)
+
+
+def is_fresh(namespace, language):
+    return cache.get(FRESH_KEY.format(namespace, language)) is not None
+
+
+def get_facet_counts(namespace, facet, language=None):
+    """
+    Returns the [(key, count), ...] of the given facet and namespace, most
+    frequent first (newest first for months), with a single query. Changes
+    of the articles are recounted through the facet queue. Counts that were
+    never made, or expired because a scheduled article went live, are queued
+    for the process_facet_queue command, and the stored ones are served
+    meanwhile.
+    """
+    language = get_facet_language(language)
+    if not is_fresh(namespace, language):
+        ArticleFacetQueue.objects.enqueue(
+            [namespace], process_on_commit=False)
+        # queued once, until the recount sets its own expiry
+        cache.set(FRESH_KEY.format(namespace, language), True, None)
+    ordering = '-key' if facet == 'month' else '-count'
+    return list(ArticleFacetCount.objects.filter(
+        namespace=namespace, language_code=language, facet=facet,
+    ).order_by(ordering, 'key').values_list('key', 'count'))
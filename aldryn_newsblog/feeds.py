@@ -1,7 +1,9 @@
 # -*- coding: utf-8 -*-
 
-from django.contrib.sites.models import Site
+import hashlib
+
 from django.contrib.syndication.views import Feed
+from django.core.cache import cache
 try:
     from django.contrib.sites.shortcuts import get_current_site
 except ImportError:
@@ -12,11 +14,19 @@ try:
 except ImportError:
     # Django 2.0
     from django.urls import reverse
+from django.http import HttpResponse
 from django.utils.translation import get_language_from_request, ugettext as _
 
 from aldryn_apphooks_config.utils import get_app_instance
 from aldryn_categories.models import Category
+from aldryn_newsblog.constants import CONDITIONAL_GET, FEED_CACHE_TIMEOUT
 from aldryn_newsblog.models import Article
+from aldryn_newsblog.utils.http import (
+    get_not_modified,
+    get_validators,
+    set_validators,
+    use_conditional_get,
+)
 from aldryn_newsblog.utils.utilities import get_valid_languages
 try:
     from custom.aldryn_newsblog.feeds import CustomFeedMixin
@@ -24,29 +34,105 @@ except ImportError:
     class CustomFeedMixin(object):
         pass
 
+FEED_CACHE_KEY = 'aldryn_newsblog-feed-{0}'
+# the headers of the feed response kept with its content
+FEED_CACHE_HEADERS = ('Content-Type', 'Last-Modified')
+
+
 class LatestArticlesFeed(Feed):
+    conditional_get = CONDITIONAL_GET
+    cache_timeout = FEED_CACHE_TIMEOUT
 
     def __call__(self, request, *args, **kwargs):
         self.namespace, self.config = get_app_instance(request)
-        language = get_language_from_request(request)
-        site_id = getattr(get_current_site(request), 'id', None)
+        language = get_language_from_request(request, check_path=True)
+        self.site = get_current_site(request)
+        site_id = getattr(self.site, 'id', None)
         self.valid_languages = get_valid_languages(
             self.namespace,
             language_code=language,
             site_id=site_id)
-        return super(LatestArticlesFeed, self).__call__(
+        validators = None
+        last_modified = None
+        if (self.conditional_get or self.cache_timeout) and (
+                use_conditional_get(request)):
+            last_modified = self.get_last_modified()
+        if last_modified is not None:
+            validators = get_validators(
+                last_modified, type(self).__name__, language)
+        if validators and self.conditional_get:
+            # feed readers poll, answer them before building the feed
+            not_modified = get_not_modified(request, *validators)
+            if not_modified is not None:
+                return not_modified
+        if validators and self.cache_timeout:
+            key = self.get_cache_key(
+                request, validators[0], language, site_id, *args, **kwargs)
+            response = self.get_cached_response(
+                key, request, *args, **kwargs)
+        else:
+            response = super(LatestArticlesFeed, self).__call__(
+                request, *args, **kwargs)
+        if validators and self.conditional_get and (
+                response.status_code == 200):
+            set_validators(response, *validators)
+        return response
+
+    def get_cache_key(self, request, etag, language, site_id, *args,
+                      **kwargs):
+        """
+        Returns the cache key of the feed document, which depends on its
+        ETag: any change of the articles listed gives it a new one.
+        """
+        bits = [
+            type(self).__name__, self.namespace,
+            getattr(self.config, 'pk', None), language, site_id,
+            request.is_secure(), etag,
+        ] + list(args) + sorted(kwargs.items())
+        return FEED_CACHE_KEY.format(hashlib.md5(
+            repr(bits).encode('utf-8')).hexdigest())
+
+    def get_cached_response(self, key, request, *args, **kwargs):
+        """
+        Returns the feed document cached under the given key, building and
+        caching it first if needed.
+        """
+        cached = cache.get(key)
+        if cached is not None:
+            content, headers = cached
+            response = HttpResponse(content)
+            for header, value in headers:
+                response[header] = value
+            return response
+        response = super(LatestArticlesFeed, self).__call__(
             request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = [
+                (header, response[header]) for header in FEED_CACHE_HEADERS
+                if response.has_header(header)]
+            cache.set(key, (response.content, headers), self.cache_timeout)
+        return response
+
+    def get_last_modified(self):
+        """
+        Returns the last change of the feed's section and the latest
+        publishing date of its live articles.
+        """
+        if not self.config:
+            return None
+        return Article.all_objects.get_last_modified(
+            self.config.last_modified, app_config=self.config)
 
     def link(self):
         return reverse('{0}:article-list-feed'.format(self.namespace))
 
     def title(self):
-        msgformat = {'site_name': Site.objects.get_current().name}
+        msgformat = {'site_name': self.site.name}
         return _('Articles on %(site_name)s') % msgformat
 
     def get_queryset(self):
         qs = Article.objects.published().namespace(self.namespace).translated(
-            *self.valid_languages)
+            *self.valid_languages).light_translations().with_urls()
         return qs
 
     def items(self, obj):
@@ -82,9 +168,15 @@ class CustomFeed(CustomFeedMixin, LatestArticlesFeed):
     def title(self):
         return str(self.config)
 
+    def get_last_modified(self):
+        if not self.config:
+            return None
+        return Article.all_objects.get_last_modified(
+            self.config.last_modified, feeds=self.config)
+
     def get_queryset(self):
         qs = self.config.article_set.published().translated(
-            *self.valid_languages)
+            *self.valid_languages).light_translations().with_urls()
         return qs
 
     def items(self, obj):
@@ -9,9 +9,12 @@ from aldryn_people.models import Person
 from js_services.models import Service, ServicesConfig
 from js_locations.models import Location
 import django_filters
+from django_filters.constants import EMPTY_VALUES
 import datetime
 from . import models, default_medium
 from .cms_appconfig import NewsBlogConfig
+from .facets import get_facet_counts
+from .search import get_search_backend
 
 class NoneMixin(object):
     pass
@@ -36,21 +39,61 @@ if IS_THERE_COMPANIES:
 
 class SearchFilter(django_filters.Filter):
     def filter(self, qs, values):
-        values = values or ''
-        if len(values) > 0:
-            for value in values.strip().split():
-                value = value.strip()
-                if value:
-                    qs = qs.filter(translations__search_data__icontains=value)
+        values = (values or '').strip()
+        if values:
+            qs = get_search_backend().filter_words(qs, values)
         return qs
 
 
+class TitleSearchFilter(django_filters.CharFilter):
+    def filter(self, qs, value):
+        value = (value or '').strip()
+        if value:
+            qs = get_search_backend().filter_title(qs, value)
+        return qs
+
+
+class ExistsFilterMixin(object):
+    """
+    Applies the filter through ArticleQuerySet.filter_exists() on the
+    multi-valued relation named by the first part of field_name, instead of
+    joining it. The filtered queryset needs no DISTINCT.
+    """
+    def filter(self, qs, value):
+        if value in EMPTY_VALUES:
+            return qs
+        relation, __, lookup = self.field_name.partition('__')
+        lookup = lookup or 'pk'
+        if self.lookup_expr != 'exact':
+            lookup = '%s__%s' % (lookup, self.lookup_expr)
+        return qs.filter_exists(relation, **{lookup: value})
+
+
+class ExistsCharFilter(ExistsFilterMixin, django_filters.CharFilter):
+    pass
+
+
+class ExistsModelChoiceFilter(ExistsFilterMixin, django_filters.ModelChoiceFilter):
+    pass
+
+
+class ExistsModelMultipleChoiceFilter(ExistsFilterMixin, django_filters.ModelMultipleChoiceFilter):
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('lookup_expr', 'in')
+        super(ExistsModelMultipleChoiceFilter, self).__init__(*args, **kwargs)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return super(ExistsModelMultipleChoiceFilter, self).filter(qs, value)
+
+
 class ArticleFilters(CustomFilterMixin, django_filters.FilterSet):
-    q = django_filters.CharFilter('translations__title', 'icontains', label='Search the directory')
+    q = TitleSearchFilter(label='Search the directory')
     medium = django_filters.ModelChoiceFilter('medium', label='medium', empty_label='by medium', queryset=models.ArticleMedium.objects.exclude(title=default_medium).exclude(**ADDITIONAL_EXCLUDE.get('medium', {})))
-    location = django_filters.ModelChoiceFilter('locations', label='location', empty_label='by location', queryset=Location.objects.published().exclude(**ADDITIONAL_EXCLUDE.get('location', {})))
-    category = django_filters.ModelChoiceFilter('categories', label='category', empty_label='by category', queryset=Category.objects.exclude(**ADDITIONAL_EXCLUDE.get('category', {})))
-    service = django_filters.ModelChoiceFilter('services', label='service', empty_label='by service', queryset=Service.objects.published().exclude(**ADDITIONAL_EXCLUDE.get('service', {})))
+    location = ExistsModelChoiceFilter('locations', label='location', empty_label='by location', queryset=Location.objects.published().exclude(**ADDITIONAL_EXCLUDE.get('location', {})))
+    category = ExistsModelChoiceFilter('categories', label='category', empty_label='by category', queryset=Category.objects.exclude(**ADDITIONAL_EXCLUDE.get('category', {})))
+    service = ExistsModelChoiceFilter('services', label='service', empty_label='by service', queryset=Service.objects.published().exclude(**ADDITIONAL_EXCLUDE.get('service', {})))
     section = django_filters.ModelChoiceFilter('app_config', label='section', empty_label='by section', queryset=NewsBlogConfig.objects.filter(show_in_listing=True).exclude(namespace=NewsBlogConfig.default_namespace).exclude(**ADDITIONAL_EXCLUDE.get('section', {})))
 
 
@@ -65,13 +108,13 @@ class ArticleFilters(CustomFilterMixin, django_filters.FilterSet):
 
         selects = ['medium', 'location', 'category', 'service', 'section']
         if IS_THERE_COMPANIES:
-            self.filters['company'] = django_filters.ModelChoiceFilter('companies', label='company', empty_label='by company', queryset=Company.objects.exclude(**ADDITIONAL_EXCLUDE.get('company', {})).order_by('name'))
+            self.filters['company'] = ExistsModelChoiceFilter('companies', label='company', empty_label='by company', queryset=Company.objects.exclude(**ADDITIONAL_EXCLUDE.get('company', {})).order_by('name'))
             selects.append('company')
         if ADD_FILTERED_CATEGORIES:
             for category in ADD_FILTERED_CATEGORIES:
                 qs = Category.objects.filter(translations__slug=category[0])[0].get_children().exclude(**ADDITIONAL_EXCLUDE.get(category[0], {})).order_by('translations__name') if Category.objects.filter(translations__slug=category[0]).exists() else Category.objects.none()
                 name = category[0].replace('-', '_')
-                self.filters[name] = django_filters.ModelChoiceFilter('categories', label=category[1], queryset=qs)
+                self.filters[name] = ExistsModelChoiceFilter('categories', label=category[1], queryset=qs)
                 self.filters[name].extra.update({'empty_label': 'by %s' % category[1]})
                 selects.append(name)
 
@@ -99,7 +142,75 @@ def hash_dict(obj):
         ret +='-%s-%s' % (key, value)
     return ret
 
+
+def get_facet_items(namespace, facet, queryset, **extra):
+    """
+    Returns the objects of queryset with published articles in the
+    namespace, with their counts and the given extra keys, most frequent
+    first.
+    """
+    counts = dict(get_facet_counts(namespace, facet))
+    output = [dict(extra, item=item, count=counts[str(item.pk)])
+              for item in queryset.filter(pk__in=counts)]
+    output.sort(key=lambda k: k['count'], reverse=True)
+    return output
+
+
 def get_services(namespace, **filters):
+    if filters:
+        return count_services(namespace, **filters)
+    return get_facet_items(
+        namespace, 'service', Service.objects.published(),
+        url_name='%s:article-list-by-service' % namespace)
+
+
+def get_categories(namespace):
+    return get_facet_items(
+        namespace, 'category', Category.objects.all(),
+        url_name='%s:article-list-by-category' % namespace)
+
+
+# locations and mediums have no list views, they are ArticleFilters fields
+def get_locations(namespace):
+    return get_facet_items(
+        namespace, 'location', Location.objects.published(),
+        param='location')
+
+
+def get_mediums(namespace):
+    return get_facet_items(
+        namespace, 'medium', models.ArticleMedium.objects.all(),
+        param='medium')
+
+
+def get_authors(namespace, **filters):
+    if filters:
+        return count_authors(namespace, **filters)
+    return get_facet_items(
+        namespace, 'author', Person.objects.all(),
+        url_name='%s:article-list-by-author' % namespace)
+
+
+def get_archive(namespace, **filters):
+    if filters:
+        return count_archive(namespace, **filters)
+    output = []
+    for key, count in get_facet_counts(namespace, 'month'):
+        year, month = key.split('-')
+        date = datetime.date(int(year), int(month), 1)
+        output.append({
+            'item': datetime.datetime.strftime(date, '%B %Y'),
+            'count': count,
+            'url_name': '%s:article-list-by-month' % namespace,
+            'year': date.year,
+            'month': month,
+        })
+    return output
+
+
+# The count_* variants count on the fly. They back the helpers above when
+# extra filters are given, which the facet store can't answer.
+def count_services(namespace, **filters):
     key = 'services-for-artlces-by-namespace-%s' % namespace
     if filters:
         key += hash_dict(filters)
@@ -120,7 +231,7 @@ def get_services(namespace, **filters):
         cache.set(key, output, 3600)
     return output
 
-def get_authors(namespace, **filters):
+def count_authors(namespace, **filters):
     key = 'authors-for-artlces-by-namespace-%s' % namespace
     if filters:
         key += hash_dict(filters)
@@ -146,7 +257,7 @@ def get_authors(namespace, **filters):
     return output
 
 
-def get_archive(namespace, **filters):
+def count_archive(namespace, **filters):
     key = 'archive-for-artlces-by-namespace-%s' % namespace
     if filters:
         key += hash_dict(filters)
@@ -195,10 +306,10 @@ class RelatedArticlesFilters(django_filters.FilterSet):
     is_featured = django_filters.BooleanFilter('is_featured', label='is featured')
     exclude_current = NoneFilter(label='exclude current article')
     mediums = django_filters.ModelMultipleChoiceFilter('medium', label='medium', queryset=models.ArticleMedium.objects.all())
-    locations = django_filters.ModelMultipleChoiceFilter('locations', label='location', queryset=Location.objects.all())
-    categories = django_filters.ModelMultipleChoiceFilter('categories', label='category', queryset=Category.objects.all())
-    services = django_filters.ModelMultipleChoiceFilter('services', label='service', queryset=Service.objects.all())
-    service_sections = django_filters.ModelMultipleChoiceFilter('services__sections', label='service section', queryset=ServicesConfig.objects.all())
+    locations = ExistsModelMultipleChoiceFilter('locations', label='location', queryset=Location.objects.all())
+    categories = ExistsModelMultipleChoiceFilter('categories', label='category', queryset=Category.objects.all())
+    services = ExistsModelMultipleChoiceFilter('services', label='service', queryset=Service.objects.all())
+    service_sections = ExistsModelMultipleChoiceFilter('services__sections', label='service section', queryset=ServicesConfig.objects.all())
     sections = django_filters.ModelMultipleChoiceFilter('app_config', label='section', queryset=NewsBlogConfig.objects.all())
     authors = django_filters.ModelMultipleChoiceFilter('author', label='author', queryset=Person.objects.all())
     image = NoneFilter(label='image')
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from aldryn_newsblog.models import ArticleSearchDataQueue
+
+
+class Command(BaseCommand):
+    help = ('Recomputes the search data of the articles queued after '
+            'their plugins were edited.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of queue entries processed per run.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, polling the queue every INTERVAL seconds.',
+        )
+
+    def handle(self, *args, **options):
+        interval = options.get('interval')
+        while True:
+            count = ArticleSearchDataQueue.objects.process(
+                limit=options.get('limit'))
+            if count:
+                self.stdout.write(
+                    'Recomputed the search data of {0} translations.'.format(
+                        count))
+            if not interval:
+                break
+            time.sleep(interval)
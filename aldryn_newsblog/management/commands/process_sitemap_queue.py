@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aldryn_newsblog.constants import SITEMAP_PROTOCOL, SITEMAP_ROOT
+from aldryn_newsblog.models import ArticleSitemapQueue
+
+
+class Command(BaseCommand):
+    help = ('Rewrites the sitemap files of the sections queued after their '
+            'articles were published, unpublished, moved or renamed.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            default=SITEMAP_ROOT,
+            help='Directory of the sitemaps, ARTICLES_SITEMAP_ROOT by default.',
+        )
+        parser.add_argument(
+            '--protocol',
+            default=SITEMAP_PROTOCOL,
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of queue entries processed per run.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=None,
+            help='Keep running, polling the queue every INTERVAL seconds.',
+        )
+
+    def handle(self, *args, **options):
+        root = options.get('root')
+        if not root:
+            raise CommandError(
+                'Either pass --root or set ARTICLES_SITEMAP_ROOT.')
+        interval = options.get('interval')
+        while True:
+            count = ArticleSitemapQueue.objects.process(
+                limit=options.get('limit'), root=root,
+                protocol=options.get('protocol'))
+            if count:
+                self.stdout.write(
+                    'Rewrote the sitemap files of {0} sections.'.format(count))
+            if not interval:
+                break
+            time.sleep(interval)
@@ -1,11 +1,128 @@
 # -*- coding: utf-8 -*-
-from aldryn_newsblog.models import Article
+from __future__ import unicode_literals
+
+import json
+import multiprocessing
+import os
+import time
+
+import django
+from django.apps import apps
 from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, transaction
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.timezone import get_current_timezone, is_naive, make_aware
+from parler.cache import _delete_cached_translation
 from parler.utils.context import switch_language
 
+from aldryn_newsblog.models import Article
+from aldryn_newsblog.search import update_search_vectors
+from aldryn_newsblog.utils import get_request
+
+
+def get_shards(pks, batch_size):
+    """
+    Splits the sorted list of pks into [(first pk, last pk), ...] ranges of
+    at most batch_size articles.
+    """
+    return [
+        (pks[i], pks[min(i + batch_size, len(pks)) - 1])
+        for i in range(0, len(pks), batch_size)]
+
+
+def rebuild_shard(shard, languages, include_unpublished=False, since=None):
+    """
+    Recomputes the search_data of the translations in the given languages of
+    the articles with a pk in the shard range (and modified since the given
+    datetime, if any). Returns (shard, count).
+    """
+    first, last = shard
+    manager = Article.all_objects if include_unpublished else Article.objects
+    translation_model = Article._parler_meta.root_model
+    articles = manager.filter(pk__gte=first, pk__lte=last)
+    if not include_unpublished:
+        articles = articles.published()
+    if since is not None:
+        articles = articles.filter(last_modified__gte=since)
+    articles = articles.prefetch_related(
+        'translations', 'categories__translations', 'services__translations')
+    requests = dict(
+        (language, get_request(language=language)) for language in languages)
+
+    changed = []
+    count = 0
+    for article in articles:
+        # the prefetched translations become parler's cache, so that
+        # switching languages does not hit the database
+        translations = dict(
+            (trans.language_code, trans)
+            for trans in article.translations.all())
+        article._translations_cache[translation_model] = translations
+        for language, translation in translations.items():
+            if language not in requests:
+                continue
+            with switch_language(article, language_code=language):
+                translation.search_data = article.get_search_data(
+                    language=language, request=requests[language])
+            changed.append(translation)
+        count += 1
+
+    with transaction.atomic():
+        translation_model.objects.bulk_update(changed, ['search_data'])
+        # bulk_update() bypasses the post_save receivers
+        update_search_vectors(translation_model.objects.filter(
+            pk__in=[translation.pk for translation in changed]))
+    for translation in changed:
+        _delete_cached_translation(translation)
+    return shard, count
+
+
+def _rebuild_shard(args):
+    return rebuild_shard(*args)
+
+
+def _init_worker():
+    if not apps.ready:
+        django.setup()
+
+
+class Checkpoint(object):
+    """
+    The shards already rebuilt by a run, stored as json so that an
+    interrupted run started again with the same options resumes where it
+    stopped. Shards of a run with different options are ignored.
+    """
+
+    def __init__(self, path, options):
+        self.path = path
+        self.options = options
+        self.done = set()
+        if path and os.path.exists(path):
+            with open(path) as checkpoint:
+                data = json.load(checkpoint)
+            if data.get('options') == options:
+                self.done = set(tuple(shard) for shard in data['done'])
+
+    def add(self, shard):
+        self.done.add(tuple(shard))
+        if not self.path:
+            return
+        tmp_path = '{0}.tmp'.format(self.path)
+        with open(tmp_path, 'w') as checkpoint:
+            json.dump({
+                'options': self.options,
+                'done': sorted(self.done),
+            }, checkpoint)
+        os.replace(tmp_path, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
 
 class Command(BaseCommand):
+    help = 'Rebuilds the search data of the articles translations.'
     can_import_settings = True
 
     def add_arguments(self, parser):
@@ -16,6 +133,48 @@ class Command(BaseCommand):
             dest='languages',
             default=None,
         )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Number of worker processes (1 rebuilds in this process).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of articles per shard.',
+        )
+        parser.add_argument(
+            '--since',
+            default=None,
+            help='Only rebuild articles modified since this date or '
+                 'datetime (ISO 8601).',
+        )
+        parser.add_argument(
+            '--include-unpublished',
+            action='store_true',
+            default=False,
+            help='Also rebuild unpublished and scheduled articles.',
+        )
+        parser.add_argument(
+            '--checkpoint',
+            default=None,
+            help='File recording the progress, to resume an interrupted run.',
+        )
+
+    def get_since(self, value):
+        if not value:
+            return None
+        since = parse_datetime(value)
+        if since is None:
+            date = parse_date(value)
+            if date is None:
+                raise CommandError('Invalid --since value: {0}'.format(value))
+            since = parse_datetime('{0}T00:00:00'.format(date.isoformat()))
+        if settings.USE_TZ and is_naive(since):
+            since = make_aware(since, get_current_timezone())
+        return since
 
     def handle(self, *args, **options):
         languages = options.get('languages')
@@ -23,26 +182,63 @@ class Command(BaseCommand):
         if languages is None:
             languages = [language[0] for language in settings.LANGUAGES]
 
-        # ArticleTranslation
-        translation_model = Article._parler_meta.root_model
+        workers = max(options.get('workers') or 1, 1)
+        batch_size = max(options.get('batch_size') or 100, 1)
+        include_unpublished = options.get('include_unpublished', False)
+        since = self.get_since(options.get('since'))
 
-        for article in Article.objects.published():
-            translations = article.translations.filter(
-                language_code__in=languages
-            )
+        if include_unpublished:
+            articles = Article.all_objects.all()
+        else:
+            articles = Article.objects.published()
+        if since is not None:
+            articles = articles.filter(last_modified__gte=since)
+        pks = list(articles.order_by('pk').values_list(
+            'pk', flat=True).distinct())
 
-            # build internal parler cache
-            parler_cache = dict(
-                (trans.language_code, trans) for trans in translations)
+        checkpoint = Checkpoint(options.get('checkpoint'), {
+            'languages': sorted(languages),
+            'since': options.get('since'),
+            'include_unpublished': include_unpublished,
+            'batch_size': batch_size,
+        })
+        shards = [
+            shard for shard in get_shards(pks, batch_size)
+            if shard not in checkpoint.done]
+        if checkpoint.done:
+            self.stdout.write('Resuming, {0} shards already done.'.format(
+                len(checkpoint.done)))
 
-            # set internal parler cache
-            # to avoid parler hitting db for every language
-            article._translations_cache[translation_model] = parler_cache
+        args = [
+            (shard, languages, include_unpublished, since)
+            for shard in shards]
+        total = len(shards)
+        rebuilt = 0
+        started = time.time()
+        if workers == 1 or total < 2:
+            results = (_rebuild_shard(arg) for arg in args)
+            pool = None
+        else:
+            # forked workers must not share the parent's connections
+            connections.close_all()
+            pool = multiprocessing.Pool(
+                min(workers, total), initializer=_init_worker)
+            results = pool.imap_unordered(_rebuild_shard, args)
 
-            for translation in translations:
-                language = translation.language_code
+        try:
+            for done, (shard, count) in enumerate(results, 1):
+                checkpoint.add(shard)
+                rebuilt += count
+                elapsed = time.time() - started
+                self.stdout.write(
+                    '{0}/{1} shards, {2} articles, {3:.1f} articles/s'.format(
+                        done, total, rebuilt, rebuilt / elapsed
+                        if elapsed else rebuilt))
+        finally:
+            if pool is not None:
+                pool.terminate()
+                pool.join()
 
-                with switch_language(article, language_code=language):
-                    translation.search_data = article.get_search_data()
-                    # make sure to only update the search_data field
-                    translation.save(update_fields=["search_data"])
+        checkpoint.remove()
+        self.stdout.write('Rebuilt the search data of {0} articles.'.format(
+            rebuilt))
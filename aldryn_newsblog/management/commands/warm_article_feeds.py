@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sites.models import Site
+from django.core.management.base import BaseCommand, CommandError
+try:
+    from django.core.urlresolvers import NoReverseMatch, reverse
+except ImportError:
+    # Django 2.0
+    from django.urls import NoReverseMatch, reverse
+from django.test import RequestFactory
+from django.utils.translation import override
+
+from aldryn_categories.models import Category
+from cms.models import Page
+
+from aldryn_newsblog.constants import FEED_CACHE_TIMEOUT
+from aldryn_newsblog.feeds import CategoryFeed, CustomFeed, LatestArticlesFeed
+from aldryn_newsblog.models import Article
+
+# apphook name: (url name of its feed, feed class)
+FEED_APPS = {
+    'NewsBlogApp': ('article-list-feed', LatestArticlesFeed),
+    'NewsBlogFeedApp': ('articles-feed', CustomFeed),
+}
+
+
+class Command(BaseCommand):
+    help = ('Builds the cached documents of the article feeds of the '
+            'current site, so that feed readers never wait for them.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-l',
+            '--language',
+            action='append',
+            dest='languages',
+            default=None,
+        )
+        parser.add_argument(
+            '--categories',
+            action='store_true',
+            default=False,
+            help='Also build the feeds of the categories of each section.',
+        )
+        parser.add_argument(
+            '--http',
+            action='store_true',
+            default=False,
+            help='Build the documents served over http instead of https.',
+        )
+
+    def get_request(self, url, language, page, secure):
+        request = RequestFactory().get(url, secure=secure)
+        request.session = {}
+        request.LANGUAGE_CODE = language
+        request.current_page = page
+        request.user = AnonymousUser()
+        return request
+
+    def warm(self, feed_class, url, language, page, secure, **kwargs):
+        # kwargs as the url patterns pass them, or the cache keys differ
+        response = feed_class()(
+            self.get_request(url, language, page, secure), **kwargs)
+        if response.status_code != 200:
+            self.stderr.write('{0}: {1}'.format(url, response.status_code))
+            return 0
+        self.stdout.write(url)
+        return 1
+
+    def handle(self, *args, **options):
+        if not FEED_CACHE_TIMEOUT:
+            raise CommandError(
+                'Feeds are not cached, ARTICLES_FEED_CACHE_TIMEOUT is 0.')
+        languages = options.get('languages')
+        if languages is None:
+            languages = [language[0] for language in settings.LANGUAGES]
+        secure = not options.get('http')
+
+        pages = Page.objects.public().on_site(Site.objects.get_current())
+        count = 0
+        for page in pages.filter(application_urls__in=list(FEED_APPS)):
+            namespace = page.application_namespace
+            url_name, feed_class = FEED_APPS[page.application_urls]
+            for language in page.get_languages():
+                if language not in languages:
+                    continue
+                with override(language):
+                    try:
+                        url = reverse('{0}:{1}'.format(namespace, url_name))
+                    except NoReverseMatch:
+                        continue
+                    count += self.warm(feed_class, url, language, page, secure)
+                    if not options.get('categories') or (
+                            feed_class is not LatestArticlesFeed):
+                        continue
+                    categories = Category.objects.language(
+                        language).translated(language).filter(
+                            article__in=Article.objects.published().namespace(
+                                namespace)).distinct()
+                    for category in categories:
+                        url = reverse(
+                            '{0}:article-list-by-category-feed'.format(
+                                namespace), args=[category.slug])
+                        count += self.warm(
+                            CategoryFeed, url, language, page, secure,
+                            category=category.slug)
+        self.stdout.write('Built {0} feed documents.'.format(count))
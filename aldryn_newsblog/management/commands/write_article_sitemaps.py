@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+from __future__ import unicode_literals
+
+from django.core.management.base import BaseCommand, CommandError
+
+from aldryn_newsblog.constants import SITEMAP_PROTOCOL, SITEMAP_ROOT
+from aldryn_newsblog.sitemaps import write_sitemap_files
+
+
+class Command(BaseCommand):
+    help = ('Writes the gzipped xml sitemaps of the articles of each section '
+            'and language.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--root',
+            default=SITEMAP_ROOT,
+            help='Directory of the sitemaps, ARTICLES_SITEMAP_ROOT by default.',
+        )
+        parser.add_argument(
+            '-n',
+            '--namespace',
+            action='append',
+            dest='namespaces',
+            default=None,
+        )
+        parser.add_argument(
+            '-l',
+            '--language',
+            action='append',
+            dest='languages',
+            default=None,
+        )
+        parser.add_argument(
+            '--protocol',
+            default=SITEMAP_PROTOCOL,
+        )
+
+    def handle(self, *args, **options):
+        root = options.get('root')
+        if not root:
+            raise CommandError(
+                'Either pass --root or set ARTICLES_SITEMAP_ROOT.')
+        paths = write_sitemap_files(
+            root, namespaces=options.get('namespaces'),
+            languages=options.get('languages'),
+            protocol=options.get('protocol'))
+        for path in paths:
+            self.stdout.write(path)
@@ -2,26 +2,106 @@
 
 from __future__ import unicode_literals
 
-try:
-    from collections import Counter
-except ImportError:
-    from backport_collections import Counter
-
 import datetime
 from operator import attrgetter
 
-from django.db import models
+from django import VERSION as DJANGO_VERSION
+from django.core.cache import cache
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, OuterRef, Prefetch, Q
+from django.db.models.functions import TruncMonth
+from django.utils import timezone, translation
+from django.utils.module_loading import import_string
 from django.utils.timezone import now
 
 from aldryn_apphooks_config.managers.base import ManagerMixin, QuerySetMixin
 from aldryn_people.models import Person
+from cms.utils.i18n import get_current_language
 from parler.managers import TranslatableManager, TranslatableQuerySet
+from parler.utils.i18n import get_active_language_choices
 
 from .constants import (
+    DEFERRED_TRANSLATION_FIELDS,
+    LIST_PREFETCH_PLANS,
+    MONTHS_CACHE_TIMEOUT,
+    NEIGHBOURS_CACHE_TIMEOUT,
+    SEARCH_DATA_QUEUE,
     TRANSLATE_IS_PUBLISHED,
 )
+from .utils.cache import get_months_generation
+
+MONTHS_CACHE_KEY = 'aldryn_newsblog-months-{0}-{1}-{2}-{3}'
+NEIGHBOURS_CACHE_KEY = 'aldryn_newsblog-neighbours-{0}-{1}-{2}-{3}'
+
+
+def is_edit_mode(request):
+    return bool(
+        request and getattr(request, 'toolbar', None) and
+        request.toolbar.edit_mode_active)
+
 
 class ArticleQuerySet(QuerySetMixin, TranslatableQuerySet):
+    _url_languages = ()
+    _light_translations = False
+
+    def _clone(self, *args, **kwargs):
+        clone = super(ArticleQuerySet, self)._clone(*args, **kwargs)
+        clone._url_languages = self._url_languages
+        clone._light_translations = self._light_translations
+        return clone
+
+    def _fetch_all(self):
+        fetched = self._result_cache is None
+        super(ArticleQuerySet, self)._fetch_all()
+        if not (fetched and self._result_cache and
+                isinstance(self._result_cache[0], self.model)):
+            return
+        if self._light_translations:
+            # hand the prefetched translations to parler directly, it would
+            # otherwise load the deferred fields to cache them
+            translation_model = self.model._parler_meta.root_model
+            for article in self._result_cache:
+                translations = article._prefetched_objects_cache.get(
+                    'translations', ())
+                translations_cache = article._translations_cache[
+                    translation_model]
+                for trans in translations:
+                    translations_cache.setdefault(trans.language_code, trans)
+        for language in self._url_languages:
+            self.model.set_absolute_urls(self._result_cache, language)
+
+    def light_translations(self):
+        """
+        Prefetches the translations without their bulky text fields (see
+        DEFERRED_TRANSLATION_FIELDS), which lists, menus, feeds and sitemaps
+        don't show. They are still loaded on access, one query each.
+        """
+        translation_model = self.model._parler_meta.root_model
+        prefetch = Prefetch(
+            'translations',
+            queryset=translation_model._base_manager.defer(
+                *DEFERRED_TRANSLATION_FIELDS))
+        clone = self.prefetch_related(None)
+        # before the lookups through translations, replacing a plain one
+        clone = clone.prefetch_related(prefetch, *[
+            lookup for lookup in self._prefetch_related_lookups
+            if getattr(lookup, 'prefetch_to', lookup) != 'translations'])
+        clone._light_translations = True
+        return clone
+
+    def with_urls(self, *languages):
+        """
+        Computes the permalinks of the articles in the given languages (the
+        current one by default) as the queryset is evaluated, for all of them
+        at once (see Article.set_absolute_urls), so that get_absolute_url()
+        is free.
+        """
+        clone = self.select_related('app_config')
+        clone._url_languages = tuple(
+            language for language in languages if language) or (
+                get_current_language(),)
+        return clone
+
     def published(self):
         """
         Returns articles that are published AND have a publishing_date that
@@ -34,9 +114,70 @@ class ArticleQuerySet(QuerySetMixin, TranslatableQuerySet):
 
     def published_one_of_trans(self):
         if TRANSLATE_IS_PUBLISHED:
-            return self.filter(publishing_date__lte=now(), translations__is_published_trans=True)
+            return self.filter(publishing_date__lte=now()).filter_exists(
+                'translations', is_published_trans=True)
         return self.published()
 
+    def filter_exists(self, relation, *args, **kwargs):
+        """
+        Filters on a multi-valued relation (M2M or reverse FK such as
+        'translations') through a correlated EXISTS subquery instead of a
+        join, so the result has no duplicate rows and needs no DISTINCT.
+
+        The lookups in args/kwargs are relative to the related model, e.g.::
+
+            qs.filter_exists('categories', pk__in=categories)
+            qs.filter_exists('services', sections__in=sections)
+            qs.filter_exists('translations', title__icontains='foo')
+
+        Each call adds its own EXISTS clause, which matches the semantics of
+        chaining .filter() calls over the same multi-valued relation.
+        """
+        field = self.model._meta.get_field(relation)
+        if not (field.many_to_many or field.one_to_many):
+            return self.filter(*args, **kwargs)
+        if field.concrete and field.many_to_many and not args:
+            # forward M2M with plain lookups: stay on the through table, so
+            # filtering by pk doesn't even join the related model
+            target = field.m2m_reverse_field_name()
+            subquery = field.remote_field.through._base_manager.filter(**dict(
+                [(field.m2m_field_name(), OuterRef('pk'))] +
+                [('%s__%s' % (target, key), value)
+                 for key, value in kwargs.items()]))
+        else:
+            if field.concrete:
+                outer_name = field.related_query_name()
+            else:
+                outer_name = field.field.name
+            subquery = field.related_model._base_manager.filter(
+                *args, **kwargs).filter(**{outer_name: OuterRef('pk')})
+        subquery = subquery.values('pk')
+        if DJANGO_VERSION >= (3, 0):
+            return self.filter(Exists(subquery))
+        # Django < 3.0 can only filter on an annotated Exists()
+        alias = '_exists_{0}'.format(len(self.query.annotations))
+        return self.annotate(
+            **{alias: Exists(subquery)}).filter(**{alias: True})
+
+    def prefetch_plan(self, name=None):
+        """
+        Applies the named list prefetch plan (see LIST_PREFETCH_PLANS), so
+        the relations used by the list templates are loaded in a fixed number
+        of queries for whatever slice of the queryset is evaluated. Unknown
+        plan names fall back to the 'default' plan.
+        """
+        plan = LIST_PREFETCH_PLANS.get(
+            name or 'default', LIST_PREFETCH_PLANS['default'])
+        qs = self
+        if plan.get('select_related'):
+            qs = qs.select_related(*plan['select_related'])
+        if plan.get('prefetch_related'):
+            qs = qs.prefetch_related(*[
+                lookup for lookup in plan['prefetch_related']
+                if not (self._light_translations and lookup == 'translations')
+            ])
+        return qs
+
 
 class AllManager(ManagerMixin, TranslatableManager):
     def get_queryset(self):
@@ -49,6 +190,12 @@ class AllManager(ManagerMixin, TranslatableManager):
     def published_one_of_trans(self):
         return self.get_queryset().published_one_of_trans()
 
+    def with_urls(self, *languages):
+        return self.get_queryset().with_urls(*languages)
+
+    def light_translations(self):
+        return self.get_queryset().light_translations()
+
     def get_months(self, request, namespace):
         """
         Get months and years with articles count for given request and namespace
@@ -57,38 +204,132 @@ class AllManager(ManagerMixin, TranslatableManager):
         The request is required, because logged-in content managers may get
         different counts.
 
-        Return list of dictionaries ordered by article publishing date of the
-        following format:
+        Articles are grouped by the month of their publishing date in the
+        current time zone, in a single query. Return list of dictionaries
+        ordered by article publishing date (newest first) of the following
+        format:
         [
             {
-                'date': date(YEAR, MONTH, ARBITRARY_DAY),
+                'date': date(YEAR, MONTH, 1),
                 'num_articles': NUM_ARTICLES
             },
             ...
         ]
         """
-
-        # TODO: check if this limitation still exists in Django 1.6+
-        # This is done in a naive way as Django is having tough time while
-        # aggregating on date fields
-        if (request and hasattr(request, 'toolbar') and
-                request.toolbar and request.toolbar.edit_mode_active):
+        if is_edit_mode(request):
             articles = self.namespace(namespace)
         else:
             articles = self.published().namespace(namespace)
-        dates = articles.values_list('publishing_date', flat=True)
-        dates = [(x.year, x.month) for x in dates]
-        date_counter = Counter(dates)
-        dates = set(dates)
-        dates = sorted(dates, reverse=True)
-        months = [
-            # Use day=3 to make sure timezone won't affect this hacks'
-            # month value. There are UTC+14 and UTC-12 timezones!
-            {'date': datetime.date(year=year, month=month, day=3),
-             'num_articles': date_counter[(year, month)]}
-            for year, month in dates]
+        months = articles.annotate(
+            month=TruncMonth('publishing_date')).values_list('month').annotate(
+                num_articles=models.Count('pk')).order_by('-month')
+        return [
+            {'date': datetime.date(month.year, month.month, 1),
+             'num_articles': num_articles}
+            for month, num_articles in months]
+
+    def get_months_cached(self, request, namespace, timeout=None):
+        """
+        Same as get_months(), but served from the cache for visitors. The
+        cached months are invalidated whenever an article is published,
+        unpublished, re-dated or moved to another namespace, and expire when
+        the next scheduled article of the namespace goes live.
+        """
+        if is_edit_mode(request):
+            return self.get_months(request, namespace)
+        key = MONTHS_CACHE_KEY.format(
+            namespace,
+            translation.get_language() if TRANSLATE_IS_PUBLISHED else '',
+            timezone.get_current_timezone_name(),
+            get_months_generation())
+        months = cache.get(key)
+        if months is None:
+            months = self.get_months(request, namespace)
+            if timeout is None:
+                timeout = MONTHS_CACHE_TIMEOUT
+            cache.set(key, months, self.get_publication_timeout(
+                timeout, namespace=namespace))
         return months
 
+    def get_publication_timeout(self, timeout, **filters):
+        """
+        Returns the given timeout, shortened so that it expires when the next
+        scheduled article matching the filters goes live.
+        """
+        next_date = self.filter(
+            publishing_date__gt=now(), **filters).aggregate(
+                next_date=models.Min('publishing_date'))['next_date']
+        if next_date is not None:
+            until_next = int((next_date - now()).total_seconds()) + 1
+            timeout = max(min(timeout, until_next), 1)
+        return timeout
+
+    def get_last_modified(self, *timestamps, **filters):
+        """
+        Returns the latest of the given timestamps (None are ignored) and of
+        the publishing dates of the articles matching the filters which are
+        live by now, so that scheduled articles going live count as changes.
+        """
+        latest = self.filter(publishing_date__lte=now(), **filters).aggregate(
+            latest=models.Max('publishing_date'))['latest']
+        timestamps = [
+            timestamp for timestamp in timestamps + (latest,)
+            if timestamp is not None]
+        return max(timestamps) if timestamps else None
+
+    def get_neighbours(self, article, language=None, edit_mode=False):
+        """
+        Returns the (previous, next) articles of the given one in its
+        namespace, ordered by publishing date and then pk, so that articles
+        published at the same time are not skipped. Only published articles
+        available in the language are considered, unless in edit mode.
+
+        Both are fetched in one query using the (app_config,
+        publishing_date, id) index. Their pks are cached until an article
+        is published, unpublished or re-dated, like the months.
+        """
+        language = language or translation.get_language()
+        key = NEIGHBOURS_CACHE_KEY.format(
+            article.pk, language, int(bool(edit_mode)),
+            get_months_generation())
+        date, pk = article.publishing_date, article.pk
+        pks = cache.get(key)
+        if pks is not None:
+            neighbours = self.get_queryset().filter(
+                pk__in=[neighbour for neighbour in pks if neighbour])
+        else:
+            articles = self.get_queryset().filter(
+                app_config_id=article.app_config_id).filter_exists(
+                    'translations',
+                    language_code__in=get_active_language_choices(language))
+            if not edit_mode:
+                articles = articles.published()
+            previous = articles.filter(
+                models.Q(publishing_date__lt=date) |
+                models.Q(publishing_date=date, pk__lt=pk)
+            ).order_by('-publishing_date', '-pk').values('pk')[:1]
+            following = articles.filter(
+                models.Q(publishing_date__gt=date) |
+                models.Q(publishing_date=date, pk__gt=pk)
+            ).order_by('publishing_date', 'pk').values('pk')[:1]
+            neighbours = self.get_queryset().filter(
+                models.Q(pk=models.Subquery(previous)) |
+                models.Q(pk=models.Subquery(following)))
+        neighbours = list(neighbours.language(
+            language).light_translations().with_urls(language))
+
+        result = [None, None]
+        for neighbour in neighbours:
+            after = (neighbour.publishing_date, neighbour.pk) > (date, pk)
+            result[after] = neighbour
+        if pks is None:
+            cache.set(
+                key, tuple(n.pk if n else None for n in result),
+                self.get_publication_timeout(
+                    NEIGHBOURS_CACHE_TIMEOUT,
+                    app_config_id=article.app_config_id))
+        return tuple(result)
+
     def get_authors(self, namespace):
         """
         Get authors with articles count for given namespace string.
@@ -116,3 +357,117 @@ class SearchManager(AllManager):
         qs = ArticleQuerySet(self.model, using=self.db)
         qs = qs.filter(app_config__search_indexed=True)
         return qs#.select_related('featured_image')
+
+
+class SearchDataQueueManager(models.Manager):
+
+    def enqueue(self, article_ids, language):
+        """
+        Marks the search data of the given articles in the given language as
+        dirty. Repeated calls for the same translation share one queue entry.
+        """
+        keys = []
+        for article_id in article_ids:
+            try:
+                with transaction.atomic():
+                    self.update_or_create(
+                        article_id=article_id, language_code=language)
+            except IntegrityError:
+                # queued concurrently, which is just as good
+                pass
+            keys.append((article_id, language))
+        if keys and SEARCH_DATA_QUEUE == 'on_commit':
+            transaction.on_commit(lambda: self.process(keys))
+
+    def process(self, keys=None, limit=None):
+        """
+        Recomputes the search data of the queued translations, oldest first,
+        or only of the given (article id, language) keys if they are still
+        queued, and removes them from the queue. Returns how many were
+        processed.
+        """
+        queued = self.order_by('queued_at')
+        if keys is not None:
+            match = Q(pk__in=[])
+            for article_id, language in keys:
+                match |= Q(article_id=article_id, language_code=language)
+            queued = queued.filter(match)
+        if limit:
+            queued = queued[:limit]
+
+        articles = self.model._meta.get_field('article').related_model
+        count = 0
+        for entry in list(queued):
+            with transaction.atomic():
+                # an entry that was re-queued meanwhile is left for later
+                deleted, __ = self.filter(
+                    pk=entry.pk, queued_at=entry.queued_at).delete()
+                if not deleted:
+                    continue
+                article = articles.all_objects.language(
+                    entry.language_code).filter(pk=entry.article_id).first()
+                if (article is None or
+                        not article.has_translation(entry.language_code)):
+                    continue
+                article.refresh_search_data()
+            count += 1
+        return count
+
+
+class NamespaceQueueManager(models.Manager):
+    """
+    Queue of the namespaces whose derived data (facet counts, sitemap
+    files) must be rebuilt because their articles changed. Repeated calls
+    for the same namespace share one entry. Processing an entry calls the
+    function at the dotted path `refresh` with the namespace.
+    """
+
+    def __init__(self, refresh, process_on_commit=False):
+        super(NamespaceQueueManager, self).__init__()
+        self.refresh = refresh
+        self.process_on_commit = process_on_commit
+
+    def enqueue(self, namespaces, process_on_commit=None):
+        """
+        Queues the given namespaces, and processes them once the transaction
+        commits if process_on_commit (the manager's by default) is set.
+        """
+        if process_on_commit is None:
+            process_on_commit = self.process_on_commit
+        namespaces = set(namespaces)
+        for namespace in namespaces:
+            try:
+                with transaction.atomic():
+                    self.update_or_create(namespace=namespace)
+            except IntegrityError:
+                # queued concurrently, which is just as good
+                pass
+        if namespaces and process_on_commit:
+            transaction.on_commit(lambda: self.process(namespaces))
+
+    def process(self, namespaces=None, limit=None, **kwargs):
+        """
+        Refreshes the queued namespaces, oldest first, or only the given ones
+        if they are still queued, and removes them from the queue. Returns
+        how many were processed. The kwargs are passed to the refresh
+        function.
+        """
+        # imported late, the refresh functions import the models
+        refresh = import_string(self.refresh)
+        queued = self.order_by('queued_at')
+        if namespaces is not None:
+            queued = queued.filter(namespace__in=namespaces)
+        if limit:
+            queued = queued[:limit]
+
+        count = 0
+        for entry in list(queued):
+            with transaction.atomic():
+                # an entry that was re-queued meanwhile is left for later
+                deleted, __ = self.filter(
+                    pk=entry.pk, queued_at=entry.queued_at).delete()
+                if not deleted:
+                    continue
+                refresh(entry.namespace, **kwargs)
+            count += 1
+        return count
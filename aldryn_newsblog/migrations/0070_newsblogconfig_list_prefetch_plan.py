@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0069_articletranslation_summary'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsblogconfig',
+            name='list_prefetch_plan',
+            field=models.CharField(blank=True, default='default', help_text='Which related objects are loaded up-front for the articles of a list page. Leave the default unless a custom plan has been configured for this section.', max_length=32, verbose_name='List prefetch plan'),
+        ),
+    ]
@@ -0,0 +1,16 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0070_newsblogconfig_list_prefetch_plan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsblogconfig',
+            name='pagination_type',
+            field=models.CharField(choices=[('numbers', 'Numbered pages'), ('keyset', 'Previous / next only (faster on large sections)')], default='numbers', help_text='Previous / next pagination skips counting the articles and stays fast on deep pages, but shows no page numbers. Numbered links (?page=N) keep working.', max_length=10, verbose_name='Pagination type'),
+        ),
+    ]
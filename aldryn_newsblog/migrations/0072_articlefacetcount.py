@@ -0,0 +1,27 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0071_newsblogconfig_pagination_type'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleFacetCount',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=100, verbose_name='namespace')),
+                ('language_code', models.CharField(blank=True, default='', max_length=15, verbose_name='language')),
+                ('facet', models.CharField(choices=[('author', 'author'), ('category', 'category'), ('location', 'location'), ('medium', 'medium'), ('month', 'month'), ('service', 'service')], max_length=16, verbose_name='facet')),
+                ('key', models.CharField(max_length=32, verbose_name='key')),
+                ('count', models.PositiveIntegerField(default=0, verbose_name='count')),
+            ],
+            options={
+                'verbose_name': 'article facet count',
+                'verbose_name_plural': 'article facet counts',
+                'unique_together': {('namespace', 'language_code', 'facet', 'key')},
+            },
+        ),
+    ]
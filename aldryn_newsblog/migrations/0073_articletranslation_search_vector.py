@@ -0,0 +1,78 @@
+import django.contrib.postgres.search
+from django.db import migrations
+
+
+# the default ARTICLES_SEARCH_CONFIGS when this migration was written, the
+# rebuild_article_search_data command applies customised ones
+SEARCH_CONFIGS = (
+    ('da', 'danish'),
+    ('de', 'german'),
+    ('en', 'english'),
+    ('es', 'spanish'),
+    ('fi', 'finnish'),
+    ('fr', 'french'),
+    ('hu', 'hungarian'),
+    ('it', 'italian'),
+    ('nl', 'dutch'),
+    ('no', 'norwegian'),
+    ('pt', 'portuguese'),
+    ('ro', 'romanian'),
+    ('ru', 'russian'),
+    ('sv', 'swedish'),
+    ('tr', 'turkish'),
+)
+
+UPDATE_SEARCH_VECTORS = """
+UPDATE aldryn_newsblog_article_translation SET search_vector =
+    setweight(to_tsvector(config, COALESCE(title, '')), 'A') ||
+    setweight(to_tsvector(config, COALESCE(lead_in, '')), 'B') ||
+    setweight(to_tsvector(config, COALESCE(search_data, '')), 'C')
+FROM (
+    SELECT id AS translation_id, (
+        CASE split_part(language_code, '-', 1) {0} ELSE 'simple' END
+    )::regconfig AS config
+    FROM aldryn_newsblog_article_translation
+) AS configs
+WHERE id = configs.translation_id
+""".format(' '.join(
+    "WHEN '{0}' THEN '{1}'".format(code, config)
+    for code, config in SEARCH_CONFIGS))
+
+
+def create_search_index(apps, schema_editor):
+    # GIN indexes only exist on postgres, the other databases search with
+    # icontains
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(
+        'CREATE INDEX aldryn_newsblog_search_gin ON '
+        'aldryn_newsblog_article_translation USING gin (search_vector)')
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute('DROP INDEX IF EXISTS aldryn_newsblog_search_gin')
+
+
+def update_search_vectors(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    schema_editor.execute(UPDATE_SEARCH_VECTORS)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0072_articlefacetcount'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='articletranslation',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+        migrations.RunPython(update_search_vectors, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+TRIGRAM_INDEXES = (
+    # for trigram_similar
+    ('aldryn_newsblog_title_trgm', 'title'),
+    # icontains lookups compile to UPPER(column::text) LIKE UPPER(...),
+    # which only a trigram index on that expression can serve
+    ('aldryn_newsblog_title_up_trgm', 'UPPER(title::text)'),
+    ('aldryn_newsblog_lead_in_up_trgm', 'UPPER(lead_in::text)'),
+)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    # pg_trgm only exists on postgres, the trigram search mode is optional
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, expression in TRIGRAM_INDEXES:
+        schema_editor.execute(
+            'CREATE INDEX {0} ON aldryn_newsblog_article_translation '
+            'USING gin (({1}) gin_trgm_ops)'.format(name, expression))
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for name, __ in TRIGRAM_INDEXES:
+        schema_editor.execute('DROP INDEX IF EXISTS {0}'.format(name))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0073_articletranslation_search_vector'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0075_article_last_modified'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchDataQueue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language_code', models.CharField(max_length=15, verbose_name='language')),
+                ('queued_at', models.DateTimeField(auto_now=True, verbose_name='queued at')),
+                ('article', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='aldryn_newsblog.Article')),
+            ],
+            options={
+                'verbose_name': 'search data queue entry',
+                'verbose_name_plural': 'search data queue',
+                'unique_together': {('article', 'language_code')},
+            },
+        ),
+    ]
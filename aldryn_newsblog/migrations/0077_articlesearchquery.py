@@ -0,0 +1,34 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0076_articlesearchdataqueue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSearchQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('query', models.CharField(max_length=255, verbose_name='query')),
+                ('language_code', models.CharField(blank=True, default='', max_length=15, verbose_name='language')),
+                ('namespace', models.CharField(blank=True, default='', max_length=100, verbose_name='namespace')),
+                ('searches', models.PositiveIntegerField(default=0, verbose_name='searches')),
+                ('zero_results', models.PositiveIntegerField(default=0, verbose_name='searches without results')),
+                ('slow_searches', models.PositiveIntegerField(default=0, verbose_name='slow searches')),
+                ('last_results', models.PositiveIntegerField(default=0, verbose_name='results')),
+                ('total_time', models.FloatField(default=0, verbose_name='total database time')),
+                ('max_time', models.FloatField(default=0, verbose_name='slowest database time')),
+                ('slow_sql', models.TextField(blank=True, default='', verbose_name='slowest SQL query')),
+                ('last_searched', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='last searched')),
+            ],
+            options={
+                'verbose_name': 'search query',
+                'verbose_name_plural': 'search queries',
+                'unique_together': {('query', 'language_code', 'namespace')},
+            },
+        ),
+    ]
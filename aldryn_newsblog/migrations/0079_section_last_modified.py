@@ -0,0 +1,24 @@
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0078_article_nav_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newsblogconfig',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='last modified'),
+            preserve_default=False,
+        ),
+        migrations.AddField(
+            model_name='newsblogfeed',
+            name='last_modified',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='last modified'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('aldryn_newsblog', '0080_articlefacetqueue'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArticleSitemapQueue',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('namespace', models.CharField(max_length=100, unique=True, verbose_name='namespace')),
+                ('queued_at', models.DateTimeField(auto_now=True, verbose_name='queued at')),
+            ],
+            options={
+                'verbose_name': 'sitemap queue entry',
+                'verbose_name_plural': 'sitemap queue',
+            },
+        ),
+    ]
@@ -11,18 +11,28 @@ from aldryn_people.models import Person
 from aldryn_translation_tools.models import TranslatedAutoSlugifyMixin, TranslationHelperMixin
 from cms.models.fields import PlaceholderField
 from cms.models.pluginmodel import CMSPlugin
+from cms.signals import post_publish, post_unpublish, urls_need_reloading
 from cms.utils.i18n import get_current_language, get_redirect_on_fallback
 from django.conf import settings
 from django.contrib.contenttypes.models import ContentType
 from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import setting_changed
 try:
-    from django.core.urlresolvers import reverse
+    from django.core.urlresolvers import NoReverseMatch
 except ImportError:
     # Django 2.0
-    from django.urls import reverse
+    from django.urls import NoReverseMatch
 from django.contrib.postgres.fields import JSONField
+from django.contrib.postgres.search import SearchVectorField
 from django.db import connection, models
-from django.db.models.signals import post_save
+from django.db.models import F, Value
+from django.db.models.signals import (
+    m2m_changed,
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
 from django.dispatch import receiver
 from django.utils.functional import cached_property
 from django.utils.timezone import now
@@ -32,12 +42,27 @@ from djangocms_icon.fields import Icon
 from djangocms_text_ckeditor.fields import HTMLField
 from filer.fields.image import FilerImageField
 from filer.fields.file import FilerFileField
+from parler import appsettings as parler_appsettings
 from parler.models import TranslatableModel, TranslatedFields
 from sortedm2m.fields import SortedManyToManyField
 
 from .cms_appconfig import NewsBlogConfig, NewsBlogFeed
-from .managers import RelatedManager, AllManager, SearchManager
-from .utils import get_plugin_index_data, get_request, strip_tags
+from .managers import (
+    AllManager,
+    NamespaceQueueManager,
+    RelatedManager,
+    SearchDataQueueManager,
+    SearchManager,
+)
+from .utils import (
+    bump_article_version,
+    mark_months_stale,
+    get_plugins_index_data,
+    get_request,
+    strip_tags,
+)
+from .search import update_search_vectors
+from .utils.urls import clear_resolver_caches, reverse_article_detail
 
 try:
     from django.utils.encoding import force_unicode
@@ -48,8 +73,11 @@ except ImportError:
         def force_unicode(value):
             return value.decode()
 
+from . import default_medium as DEFAULT_MEDIUM
 from .constants import (
+    FACETS_QUEUE,
     IS_THERE_COMPANIES,
+    SITEMAP_ROOT,
     TRANSLATE_IS_PUBLISHED,
     TRANSLATE_AUTHORS,
 )
@@ -154,9 +182,15 @@ class Article(CustomArticleMixin,
             verbose_name=_('meta description'), blank=True, default=''),
         meta_keywords=models.TextField(
             verbose_name=_('meta keywords'), blank=True, default=''),
+        # the GIN indexes of the search backends only exist on postgres, see
+        # migrations 0073 and 0074
         meta={'unique_together': (('language_code', 'slug', ), )},
 
         search_data=models.TextField(blank=True, editable=False),
+        # full text index of title, lead_in and search_data, maintained on
+        # save, see aldryn_newsblog.search. Its GIN index is only created on
+        # postgres, by migration 0073.
+        search_vector=SearchVectorField(null=True, editable=False),
 
         author_trans = models.ForeignKey(Person, on_delete=models.SET_NULL,
             related_name='articles_trans', null=True, blank=True,
@@ -213,6 +247,8 @@ class Article(CustomArticleMixin,
                                    blank=True)
     publishing_date = models.DateTimeField(_('publishing date'),
                                            default=now)
+    last_modified = models.DateTimeField(
+        _('last modified'), auto_now=True, db_index=True)
     is_published = models.BooleanField(_('is published'), default=False,
                                        db_index=True)
     is_featured = models.BooleanField(_('is featured'), default=False,
@@ -291,6 +327,32 @@ class Article(CustomArticleMixin,
 
     class Meta:
         ordering = ['-publishing_date']
+        indexes = [
+            # previous / next navigation, see AllManager.get_neighbours
+            models.Index(fields=['app_config', 'publishing_date', 'id'],
+                         name='aldryn_newsblog_article_nav'),
+        ]
+
+    # fields whose changes move the article in or out of the month archive
+    PUBLICATION_FIELDS = ('is_published', 'publishing_date', 'app_config_id')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super(Article, cls).from_db(db, field_names, values)
+        instance._loaded_publication = instance.get_publication_state()
+        return instance
+
+    def get_publication_state(self):
+        return tuple(
+            self.__dict__.get(name) for name in self.PUBLICATION_FIELDS)
+
+    def publication_changed(self):
+        """
+        Returns True if the article was not loaded from the database, or if
+        any of PUBLICATION_FIELDS changed since.
+        """
+        loaded = getattr(self, '_loaded_publication', None)
+        return loaded is None or loaded != self.get_publication_state()
 
     def get_class(self):
         '''Return class name'''
@@ -358,6 +420,20 @@ class Article(CustomArticleMixin,
         """Returns the url for this Article in the selected permalink format."""
         if not language:
             language = get_current_language()
+        urls = self.__dict__.get('_absolute_urls')
+        if urls and language in urls:
+            return urls[language]
+        slug = slug_language = None
+        if 's' in self.cached_type.permalink_type:
+            slug, slug_language = self.known_translation_getter(
+                'slug', default=None, language_code=language)
+        return self.build_absolute_url(language, slug, slug_language)
+
+    def build_absolute_url(self, language, slug=None, slug_language=None):
+        """
+        Returns the url for this Article in the given language, using the
+        given slug (found in slug_language) if the permalink type has one.
+        """
         kwargs = {}
         permalink_type = self.cached_type.permalink_type
         if 'y' in permalink_type:
@@ -369,25 +445,67 @@ class Article(CustomArticleMixin,
         if 'i' in permalink_type:
             kwargs.update(pk=self.pk)
         if 's' in permalink_type:
-            slug, lang = self.known_translation_getter(
-                'slug', default=None, language_code=language)
-            if slug and lang:
+            if slug and slug_language:
                 site_id = getattr(settings, 'SITE_ID', None)
                 if get_redirect_on_fallback(language, site_id):
-                    language = lang
+                    language = slug_language
                 kwargs.update(slug=slug)
 
-        if self.cached_type.namespace:
-            namespace = self.cached_type.namespace
-            try:
-                reverse('{0}:article-list'.format(namespace))
-            except:
-                namespace = NewsBlogConfig.default_namespace
-        else:
-            namespace = NewsBlogConfig.default_namespace
+        namespace = (
+            self.cached_type.namespace or NewsBlogConfig.default_namespace)
+        return reverse_article_detail(namespace, language, kwargs)
 
-        with override(language):
-            return reverse('{0}:article-detail'.format(namespace), kwargs=kwargs)
+    @classmethod
+    def set_absolute_urls(cls, articles, language):
+        """
+        Computes the urls of all given articles in the given language at
+        once, so that their get_absolute_url(language) needs no queries and
+        no url resolving. The slugs are taken from the prefetched
+        translations, or read with a single query, following the same
+        fallback languages as known_translation_getter().
+        """
+        articles = [
+            article for article in articles
+            if '_absolute_urls' not in article.__dict__ or
+            language not in article._absolute_urls]
+        languages = [language] + [
+            code for code in
+            parler_appsettings.PARLER_LANGUAGES.get_fallback_languages(
+                language)
+            if code != language]
+        slugs = {}
+        with_slugs = []
+        for article in articles:
+            if 's' not in article.cached_type.permalink_type:
+                continue
+            prefetched = getattr(
+                article, '_prefetched_objects_cache', {}).get('translations')
+            if prefetched is None:
+                with_slugs.append(article.pk)
+                continue
+            for translation in prefetched:
+                if translation.language_code in languages:
+                    slugs[(article.pk, translation.language_code)] = (
+                        translation.slug)
+        if with_slugs:
+            slugs.update(
+                ((master_id, code), slug) for master_id, code, slug in
+                cls._parler_meta.root_model.objects.filter(
+                    master__in=with_slugs, language_code__in=languages,
+                ).values_list('master_id', 'language_code', 'slug'))
+        for article in articles:
+            slug = slug_language = None
+            for code in languages:
+                if (article.pk, code) in slugs:
+                    slug, slug_language = slugs[(article.pk, code)], code
+                    break
+            try:
+                url = article.build_absolute_url(language, slug, slug_language)
+            except NoReverseMatch:
+                # get_absolute_url() raises it again when it's asked for
+                continue
+            article.__dict__.setdefault('_absolute_urls', {})[language] = url
+        return articles
 
     def get_public_url(self, language=None):
         if not language:
@@ -423,27 +541,14 @@ class Article(CustomArticleMixin,
         text_bits.append('=c=o=n=t=e=n=t=')
         if self.content:
             plugins = self.content.cmsplugin_set.filter(language=language)
-            for base_plugin in plugins:
-                plugin_text_content = ' '.join(
-                    get_plugin_index_data(base_plugin, request))
-                text_bits.append(plugin_text_content)
+            for plugin_text_bits in get_plugins_index_data(plugins, request):
+                text_bits.append(' '.join(plugin_text_bits))
         return ' '.join(text_bits)
 
     def save(self, *args, **kwargs):
         # Update the search index
         if self.update_search_on_save:
-            self.search_data = self.get_search_data()
-            auto_read_time = getattr(
-                settings,
-                'ALDRYN_NEWSBLOG_AUTO_CALCULATE_READ_TIME',
-                False
-            )
-            if callable(auto_read_time):
-                auto_read_time = auto_read_time(self)
-            if auto_read_time and self.app_config.auto_read_time:
-                read_time = self.get_read_time()
-                if read_time:
-                    self.read_time = read_time
+            self.update_search_fields()
         # Ensure there is an owner.
         if self.app_config.create_authors and self.owner and self.author is None:
             if hasattr(Person, 'first_name') and hasattr(Person, 'last_name'):
@@ -465,6 +570,33 @@ class Article(CustomArticleMixin,
             #self.medium = ArticleMedium.objects.first()
         super(Article, self).save(*args, **kwargs)
 
+    def update_search_fields(self):
+        """
+        Recomputes the search_data, and read_time if it is calculated
+        automatically, of the current translation.
+        """
+        self.search_data = self.get_search_data()
+        auto_read_time = getattr(
+            settings,
+            'ALDRYN_NEWSBLOG_AUTO_CALCULATE_READ_TIME',
+            False
+        )
+        if callable(auto_read_time):
+            auto_read_time = auto_read_time(self)
+        if auto_read_time and self.app_config.auto_read_time:
+            read_time = self.get_read_time()
+            if read_time:
+                self.read_time = read_time
+
+    def refresh_search_data(self):
+        """
+        Recomputes the search fields of the current translation and saves
+        only those, without saving the article itself.
+        """
+        self.update_search_fields()
+        self.get_translation(self.get_current_language()).save(
+            update_fields=['search_data', 'read_time'])
+
     def get_read_time(self):
         if '=c=o=n=t=e=n=t=' in self.search_data:
            read_time_function = getattr(settings,
@@ -484,13 +616,15 @@ class Article(CustomArticleMixin,
         return self.safe_translation_getter('title', any_language=True)
 
     def get_related_articles_by_services(self, article_category=None):
-        articles = self.__class__.objects.published().filter(services__in=self.services.all()).distinct().exclude(id=self.id)
+        articles = self.__class__.objects.published().filter_exists(
+            'services', pk__in=self.services.all()).exclude(id=self.id)
         if article_category:
             return articles.namespace(article_category)
         return articles
 
     def get_related_articles_by_categories(self, article_category=None):
-        articles = self.__class__.objects.published().filter(categories__in=self.categories.all()).distinct().exclude(id=self.id)
+        articles = self.__class__.objects.published().filter_exists(
+            'categories', pk__in=self.categories.all()).exclude(id=self.id)
         if article_category:
             return articles.namespace(article_category)
         return articles
@@ -508,6 +642,137 @@ class Article(CustomArticleMixin,
         return self.get_related_articles_by_categories(self.app_config.namespace)
 
 
+class ArticleFacetCount(models.Model):
+    """
+    Materialised number of published articles per facet value and namespace,
+    backing the counter filters of the list views. Rows are recounted per
+    namespace by aldryn_newsblog.facets when its articles have changed, see
+    ArticleFacetQueue.
+    """
+    FACET_CHOICES = (
+        ('author', _('author')),
+        ('category', _('category')),
+        ('location', _('location')),
+        ('medium', _('medium')),
+        ('month', _('month')),
+        ('service', _('service')),
+    )
+
+    namespace = models.CharField(_('namespace'), max_length=100)
+    language_code = models.CharField(
+        _('language'), max_length=15, blank=True, default='')
+    facet = models.CharField(_('facet'), max_length=16, choices=FACET_CHOICES)
+    key = models.CharField(_('key'), max_length=32)
+    count = models.PositiveIntegerField(_('count'), default=0)
+
+    class Meta:
+        unique_together = (('namespace', 'language_code', 'facet', 'key'), )
+        verbose_name = _('article facet count')
+        verbose_name_plural = _('article facet counts')
+
+    def __str__(self):
+        return '{0} {1}={2}: {3}'.format(
+            self.namespace, self.facet, self.key, self.count)
+
+
+class ArticleFacetQueue(models.Model):
+    """
+    Namespaces whose facet counts must be recounted because their articles
+    changed. Repeated changes share one entry, see NamespaceQueueManager.
+    """
+    namespace = models.CharField(_('namespace'), max_length=100, unique=True)
+    queued_at = models.DateTimeField(_('queued at'), auto_now=True)
+
+    objects = NamespaceQueueManager(
+        'aldryn_newsblog.facets.refresh_namespace_facet_counts',
+        process_on_commit=FACETS_QUEUE == 'on_commit')
+
+    class Meta:
+        verbose_name = _('facet queue entry')
+        verbose_name_plural = _('facet queue')
+
+    def __str__(self):
+        return self.namespace
+
+
+class ArticleSitemapQueue(models.Model):
+    """
+    Namespaces whose sitemap files (see ARTICLES_SITEMAP_ROOT) must be
+    rewritten, drained by the process_sitemap_queue command. Repeated changes
+    share one entry, see NamespaceQueueManager.
+    """
+    namespace = models.CharField(_('namespace'), max_length=100, unique=True)
+    queued_at = models.DateTimeField(_('queued at'), auto_now=True)
+
+    objects = NamespaceQueueManager(
+        'aldryn_newsblog.sitemaps.write_namespace_sitemap_files')
+
+    class Meta:
+        verbose_name = _('sitemap queue entry')
+        verbose_name_plural = _('sitemap queue')
+
+    def __str__(self):
+        return self.namespace
+
+
+class ArticleSearchQuery(models.Model):
+    """
+    Statistics of the searches made with the same normalised query in the
+    same language and namespace, recorded by aldryn_newsblog.analytics
+    when ARTICLES_SEARCH_ANALYTICS is on.
+    """
+    query = models.CharField(_('query'), max_length=255)
+    language_code = models.CharField(
+        _('language'), max_length=15, blank=True, default='')
+    namespace = models.CharField(
+        _('namespace'), max_length=100, blank=True, default='')
+    searches = models.PositiveIntegerField(_('searches'), default=0)
+    zero_results = models.PositiveIntegerField(
+        _('searches without results'), default=0)
+    slow_searches = models.PositiveIntegerField(_('slow searches'), default=0)
+    last_results = models.PositiveIntegerField(_('results'), default=0)
+    total_time = models.FloatField(_('total database time'), default=0)
+    max_time = models.FloatField(_('slowest database time'), default=0)
+    slow_sql = models.TextField(
+        _('slowest SQL query'), blank=True, default='')
+    last_searched = models.DateTimeField(
+        _('last searched'), default=now, db_index=True)
+
+    class Meta:
+        unique_together = (('query', 'language_code', 'namespace'), )
+        verbose_name = _('search query')
+        verbose_name_plural = _('search queries')
+
+    def __str__(self):
+        return self.query
+
+    @property
+    def average_time(self):
+        return self.total_time / self.searches if self.searches else 0
+
+
+class ArticleSearchDataQueue(models.Model):
+    """
+    Article translations whose search_data and read_time must be recomputed
+    because plugins of their content changed. Repeated edits of the same
+    translation share one entry, see SearchDataQueueManager.
+    """
+    article = models.ForeignKey(
+        Article, on_delete=models.CASCADE, related_name='+')
+    language_code = models.CharField(_('language'), max_length=15)
+    queued_at = models.DateTimeField(_('queued at'), auto_now=True)
+
+    objects = SearchDataQueueManager()
+
+    class Meta:
+        unique_together = (('article', 'language_code'), )
+        verbose_name = _('search data queue entry')
+        verbose_name_plural = _('search data queue')
+
+    def __str__(self):
+        return '{0} ({1})'.format(self.article_id, self.language_code)
+
+
 class PluginEditModeMixin(object):
     def get_edit_mode(self, request):
         """
@@ -617,7 +882,7 @@ class NewsBlogRelatedPlugin(PluginEditModeMixin, AdjustableCacheModelMixin,
             article.app_config.namespace, request)
         if self.language not in languages:
             return Article.objects.none()
-        qs = article.related.translated(*languages)
+        qs = article.related.translated(*languages).light_translations()
         if not self.get_edit_mode(request):
             qs = qs.published()
         return qs
@@ -661,6 +926,66 @@ class NewsBlogJSRelatedPlugin(PluginEditModeMixin, AdjustableCacheModelMixin,
         if IS_THERE_COMPANIES:
             self.related_companies.set(oldinstance.related_companies.all())
 
+    SELECTION_FIELDS = (
+        'related_types',
+        'related_mediums',
+        'related_categories',
+        'related_service_sections',
+        'related_services',
+        'related_authors',
+    ) + (('related_companies', ) if IS_THERE_COMPANIES else ())
+
+    # the column of the related objects loaded with the selections
+    SELECTION_LABELS = {
+        'related_types': 'namespace',
+        'related_mediums': 'title',
+    }
+
+    def get_selections(self):
+        """
+        Returns a dict with the pks selected in each of SELECTION_FIELDS (in
+        their sorted order), the namespace of the first related type (or
+        None), and whether the default medium is among the related mediums.
+        Everything is loaded with a single UNION ALL of the through tables,
+        which is done only once per instance.
+        """
+        if '_selections' in self.__dict__:
+            return self._selections
+
+        rows = None
+        for index, name in enumerate(self.SELECTION_FIELDS):
+            field = self._meta.get_field(name)
+            target = field.m2m_reverse_field_name()
+            label = self.SELECTION_LABELS.get(name)
+            if label:
+                label = F('{0}__{1}'.format(target, label))
+            else:
+                label = Value('', output_field=models.CharField())
+            # unordered, SQLite allows no ORDER BY in compound members
+            branch = field.remote_field.through._base_manager.filter(**{
+                field.m2m_field_name(): self.pk,
+            }).order_by().annotate(
+                relation=Value(index, output_field=models.IntegerField()),
+                label=label,
+            ).values_list(
+                'relation', '{0}_id'.format(target),
+                field.sort_value_field_name, 'label')
+            rows = branch if rows is None else rows.union(branch, all=True)
+
+        selections = dict((name, []) for name in self.SELECTION_FIELDS)
+        selections['related_types_first'] = None
+        selections['default_medium'] = False
+        for index, pk, __, label in sorted(
+                rows, key=lambda row: (row[0], row[2])):
+            name = self.SELECTION_FIELDS[index]
+            if name == 'related_types' and not selections[name]:
+                selections['related_types_first'] = label
+            elif name == 'related_mediums' and label == DEFAULT_MEDIUM:
+                selections['default_medium'] = True
+            selections[name].append(pk)
+        self._selections = selections
+        return self._selections
+
     # def get_articles(self, article, request):
     #     """
     #     Returns a queryset of articles that are related to the given article.
@@ -678,24 +1003,321 @@ class NewsBlogJSRelatedPlugin(PluginEditModeMixin, AdjustableCacheModelMixin,
         return ugettext('Related articles')
 
 
+def get_plugin_article_filters(plugin, model=Article):
+    """
+    Returns the filter kwargs that select the Article (or instance of the
+    given model) holding the given CMS plugin in one of its placeholders, or
+    None if the plugin doesn't live on one.
+    """
+    placeholder = (getattr(plugin, '_placeholder_cache', None) or
+                   plugin.placeholder)
+    if hasattr(placeholder, '_attached_model_cache') and hasattr(placeholder, '_attached_field_cache'):
+        field = placeholder._attached_field_cache
+        attached_model = placeholder._attached_model_cache
+        if field and attached_model == model:
+            return {field.name: placeholder.pk}
+    return None
+
+
+def touch_sections(article_pks, timestamp=None):
+    """
+    Sets the last_modified of the sections and feeds of the given articles,
+    on which the conditional GET of the list views and feeds relies.
+    """
+    timestamp = timestamp or now()
+    NewsBlogConfig.objects.filter(article__pk__in=article_pks).update(
+        last_modified=timestamp)
+    NewsBlogFeed.objects.filter(article__pk__in=article_pks).update(
+        last_modified=timestamp)
+
+
+def touch_articles(article_pks, timestamp=None):
+    """
+    Sets the last_modified of the given articles, and of their sections and
+    feeds, for changes which don't save the articles themselves.
+    """
+    timestamp = timestamp or now()
+    Article.all_objects.filter(pk__in=article_pks).update(
+        last_modified=timestamp)
+    touch_sections(article_pks, timestamp)
+
+
 @receiver(post_save, dispatch_uid='article_update_search_data')
 def update_search_data(sender, instance, **kwargs):
     """
     Upon detecting changes in a plugin used in an Article's content
-    (PlaceholderField), update the article's search_index so that we can
-    perform simple searches even without Haystack, etc.
+    (PlaceholderField), queue the article's search_index for an update so
+    that we can perform simple searches even without Haystack, etc.
+    Consecutive edits only recompute it once, see ARTICLES_SEARCH_DATA_QUEUE.
     """
     is_cms_plugin = issubclass(instance.__class__, CMSPlugin)
 
     if Article.update_search_on_save and is_cms_plugin:
-        placeholder = (getattr(instance, '_placeholder_cache', None) or
-                       instance.placeholder)
-        if hasattr(placeholder, '_attached_model_cache') and hasattr(placeholder, '_attached_field_cache'):
-            field = placeholder._attached_field_cache
-            model = placeholder._attached_model_cache
-            if field and model == Article:
-                placeholder.clear_cache(instance.language)
-                filters = {}
-                filters[field.name] = placeholder.pk
-                obj = model.objects.language(instance.language).get(**filters)
-                obj.save()
+        filters = get_plugin_article_filters(instance)
+        if filters:
+            placeholder = (getattr(instance, '_placeholder_cache', None) or
+                           instance.placeholder)
+            placeholder.clear_cache(instance.language)
+            ArticleSearchDataQueue.objects.enqueue(
+                Article.all_objects.filter(**filters).values_list(
+                    'pk', flat=True),
+                instance.language)
+
+
+@receiver(post_save, dispatch_uid='article_bump_version')
+@receiver(post_delete, dispatch_uid='article_bump_version_on_delete')
+def bump_version(sender, instance, **kwargs):
+    """
+    Bumps the version stamp of an article whenever it, one of its
+    translations or a plugin in one of its placeholders changes, so cached
+    fragments rendered from the old state are no longer used.
+    """
+    if isinstance(instance, Article):
+        bump_article_version(instance.pk)
+    elif isinstance(instance, Article._parler_meta.root_model):
+        bump_article_version(instance.master_id)
+    elif isinstance(instance, CMSPlugin):
+        filters = get_plugin_article_filters(instance)
+        if filters:
+            for pk in Article.all_objects.filter(**filters).values_list(
+                    'pk', flat=True):
+                bump_article_version(pk)
+
+
+@receiver(m2m_changed, dispatch_uid='article_bump_version_on_m2m')
+def bump_version_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Bumps the version stamp of the articles on either side of a changed
+    Article M2M relation (categories, services, locations, ...).
+    """
+    if not action.startswith('post_'):
+        return
+    if isinstance(instance, Article) and not reverse:
+        bump_article_version(instance.pk)
+    elif reverse and kwargs.get('model') is Article:
+        for pk in pk_set or ():
+            bump_article_version(pk)
+
+
+@receiver(post_save, dispatch_uid='article_touch_last_modified')
+@receiver(pre_delete, dispatch_uid='article_touch_last_modified_on_delete')
+def touch_last_modified(sender, instance, raw=False, **kwargs):
+    """
+    Bumps the last_modified of the articles, sections and feeds displaying
+    a changed article, translation or placeholder plugin. Connected before
+    months_stale, which forgets the previous section of a moved article.
+    """
+    if raw:
+        return
+    timestamp = now()
+    if isinstance(instance, Article):
+        # auto_now took care of the article itself
+        touch_sections([instance.pk], timestamp)
+        loaded = getattr(instance, '_loaded_publication', None)
+        if loaded and loaded[-1] != instance.app_config_id:
+            NewsBlogConfig.objects.filter(pk=loaded[-1]).update(
+                last_modified=timestamp)
+    elif isinstance(instance, Article._parler_meta.root_model):
+        touch_articles([instance.master_id], timestamp)
+    elif isinstance(instance, CMSPlugin):
+        filters = get_plugin_article_filters(instance)
+        if filters:
+            touch_articles(Article.all_objects.filter(**filters).values_list(
+                'pk', flat=True), timestamp)
+        filters = get_plugin_article_filters(instance, NewsBlogConfig)
+        if filters:
+            NewsBlogConfig.objects.filter(**filters).update(
+                last_modified=timestamp)
+
+
+@receiver(m2m_changed, dispatch_uid='article_touch_last_modified_on_m2m')
+def touch_last_modified_on_m2m(sender, instance, action, reverse, pk_set,
+                               **kwargs):
+    """
+    Bumps the last_modified of the articles on either side of a changed
+    Article M2M relation, and of their sections and feeds.
+    """
+    if isinstance(instance, Article) and not reverse:
+        article_pks = [instance.pk]
+    elif reverse and kwargs.get('model') is Article:
+        article_pks = list(pk_set or ())
+    else:
+        return
+    timestamp = now()
+    if action.startswith('post_'):
+        touch_articles(article_pks, timestamp)
+        if isinstance(instance, NewsBlogFeed):
+            NewsBlogFeed.objects.filter(pk=instance.pk).update(
+                last_modified=timestamp)
+    elif action in ('pre_remove', 'pre_clear') and (
+            sender is Article.feeds.through):
+        # the feeds an article leaves are only known before the rows go
+        touch_sections(article_pks, timestamp)
+
+
+def get_article_namespaces(article_pks):
+    return NewsBlogConfig.objects.filter(
+        article__pk__in=article_pks).values_list('namespace', flat=True)
+
+
+@receiver(post_save, sender=Article, dispatch_uid='article_sitemap_files')
+@receiver(post_delete, sender=Article,
+          dispatch_uid='article_sitemap_files_on_delete')
+def sitemap_files_stale(sender, instance, raw=False, **kwargs):
+    """
+    Queues the rewrite of the sitemap files of the sections of an article
+    which was published, unpublished, re-dated, moved or deleted, and of the
+    default namespace (see ARTICLES_SITEMAP_ROOT). Connected before
+    months_stale, which forgets the previous publication state.
+    """
+    if not SITEMAP_ROOT or raw:
+        return
+    if 'created' in kwargs and not (
+            kwargs['created'] or instance.publication_changed()):
+        return
+    config_ids = {instance.app_config_id}
+    loaded = getattr(instance, '_loaded_publication', None)
+    if loaded:
+        config_ids.add(loaded[-1])
+    namespaces = set(NewsBlogConfig.objects.filter(
+        pk__in=config_ids).values_list('namespace', flat=True))
+    namespaces.add(NewsBlogConfig.default_namespace)
+    ArticleSitemapQueue.objects.enqueue(namespaces)
+
+
+def get_sitemap_state(translation):
+    # the slug is in the urls, is_published_trans decides which are listed
+    if TRANSLATE_IS_PUBLISHED:
+        return (translation.slug, translation.is_published_trans)
+    return (translation.slug, )
+
+
+@receiver(pre_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_sitemap_state')
+def translation_sitemap_state(sender, instance, raw=False, **kwargs):
+    if not SITEMAP_ROOT or raw or instance.pk is None:
+        return
+    loaded = sender._base_manager.filter(pk=instance.pk).only(
+        'slug', 'is_published_trans').first()
+    instance._sitemap_changed = (
+        loaded is None or
+        get_sitemap_state(loaded) != get_sitemap_state(instance))
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_sitemap_files')
+@receiver(post_delete, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_sitemap_files_on_delete')
+def translation_sitemap_files_stale(sender, instance, raw=False, **kwargs):
+    """
+    Queues the rewrite of the sitemap files listing a translation which was
+    added, deleted, or whose slug (or is_published_trans) changed.
+    """
+    if not SITEMAP_ROOT or raw:
+        return
+    if not kwargs.get('created', True) and not getattr(
+            instance, '_sitemap_changed', True):
+        return
+    namespaces = set(get_article_namespaces([instance.master_id]))
+    namespaces.add(NewsBlogConfig.default_namespace)
+    ArticleSitemapQueue.objects.enqueue(namespaces)
+
+
+@receiver(post_save, sender=Article, dispatch_uid='article_facets_stale')
+@receiver(post_delete, sender=Article, dispatch_uid='article_facets_stale_on_delete')
+def facets_stale(sender, instance, raw=False, **kwargs):
+    """
+    Queues the recount of the facets of the section of a changed article,
+    and of its previous one if it was moved. Connected before months_stale,
+    which forgets the previous section.
+    """
+    if raw:
+        return
+    config_ids = {instance.app_config_id}
+    loaded = getattr(instance, '_loaded_publication', None)
+    if loaded:
+        config_ids.add(loaded[-1])
+    ArticleFacetQueue.objects.enqueue(NewsBlogConfig.objects.filter(
+        pk__in=config_ids).values_list('namespace', flat=True))
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_facets_stale')
+@receiver(post_delete, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_facets_stale_on_delete')
+def translation_facets_stale(sender, instance, raw=False, **kwargs):
+    # is_published_trans and the translated authors live on the translation
+    if raw or not (TRANSLATE_IS_PUBLISHED or TRANSLATE_AUTHORS):
+        return
+    ArticleFacetQueue.objects.enqueue(
+        get_article_namespaces([instance.master_id]))
+
+
+@receiver(m2m_changed, sender=Article.services.through,
+          dispatch_uid='article_facets_stale_on_m2m')
+def facets_stale_on_m2m(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Queues the recount of the facets of the sections of the articles whose
+    services changed, the only M2M relation with facet counts.
+    """
+    field = Article.services.field
+    if not reverse and action.startswith('post_'):
+        article_pks = [instance.pk]
+    elif reverse and action in ('post_add', 'post_remove'):
+        article_pks = list(pk_set or ())
+    elif reverse and action == 'pre_clear':
+        # the articles losing the service are only known before the rows go
+        article_pks = list(sender._base_manager.filter(**{
+            field.m2m_reverse_field_name(): instance.pk,
+        }).values_list(field.m2m_field_name(), flat=True))
+    else:
+        return
+    ArticleFacetQueue.objects.enqueue(get_article_namespaces(article_pks))
+
+
+@receiver(post_save, sender=Article, dispatch_uid='article_months_stale')
+def months_stale(sender, instance, created, raw, **kwargs):
+    if raw or not (created or instance.publication_changed()):
+        return
+    mark_months_stale()
+    instance._loaded_publication = instance.get_publication_state()
+
+
+@receiver(post_delete, sender=Article, dispatch_uid='article_months_stale_on_delete')
+def months_stale_on_delete(sender, instance, **kwargs):
+    mark_months_stale()
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_months_stale')
+@receiver(post_delete, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_months_stale_on_delete')
+def translation_months_stale(sender, instance, **kwargs):
+    if TRANSLATE_IS_PUBLISHED:
+        mark_months_stale()
+
+
+@receiver(urls_need_reloading, dispatch_uid='article_clear_resolver_caches')
+@receiver(post_publish, dispatch_uid='article_clear_resolver_caches_on_publish')
+@receiver(post_unpublish, dispatch_uid='article_clear_resolver_caches_on_unpublish')
+@receiver(post_save, sender=NewsBlogConfig,
+          dispatch_uid='article_clear_resolver_caches_on_config')
+@receiver(post_delete, sender=NewsBlogConfig,
+          dispatch_uid='article_clear_resolver_caches_on_config_delete')
+def resolver_caches_stale(sender, **kwargs):
+    clear_resolver_caches()
+
+
+@receiver(setting_changed, dispatch_uid='article_clear_resolver_caches_on_setting')
+def resolver_caches_setting_changed(sender, setting, **kwargs):
+    if setting in ('CMS_LANGUAGES', 'LANGUAGES', 'ROOT_URLCONF', 'SITE_ID'):
+        clear_resolver_caches()
+
+
+@receiver(post_save, sender=Article._parler_meta.root_model,
+          dispatch_uid='article_translation_search_vector')
+def translation_search_vector(sender, instance, raw=False, **kwargs):
+    if not raw:
+        update_search_vectors(
+            sender._base_manager.filter(pk=instance.pk),
+            instance.language_code)
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import base64
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.encoding import force_bytes, force_text
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(article):
+    """
+    Returns an opaque, url-safe cursor for the (publishing_date, id) position
+    of the given article.
+    """
+    value = '{0}|{1}'.format(article.publishing_date.isoformat(), article.pk)
+    return force_text(base64.urlsafe_b64encode(force_bytes(value)))
+
+
+def decode_cursor(cursor):
+    """
+    Returns the (publishing_date, id) tuple encoded in the given cursor.
+    Raises InvalidCursor for anything encode_cursor() wouldn't produce.
+    """
+    try:
+        value = force_text(base64.urlsafe_b64decode(force_bytes(cursor)))
+        publishing_date, pk = value.rsplit('|', 1)
+        publishing_date = parse_datetime(publishing_date)
+        pk = int(pk)
+    except (TypeError, ValueError, UnicodeDecodeError):
+        raise InvalidCursor(cursor)
+    if publishing_date is None:
+        raise InvalidCursor(cursor)
+    return publishing_date, pk
+
+
+class KeysetPage(object):
+    """
+    A page of a KeysetPaginator. Mimics the parts of django's Page that make
+    sense without page numbers.
+    """
+    is_keyset = True
+    number = None
+    next_url = None
+    previous_url = None
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __repr__(self):
+        return '<KeysetPage of {0} objects>'.format(len(self))
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return encode_cursor(self.object_list[-1])
+        return None
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return encode_cursor(self.object_list[0])
+        return None
+
+
+class KeysetPaginator(object):
+    """
+    Seek ("keyset") pagination over (publishing_date, id), newest first.
+
+    Unlike django's Paginator this never counts the queryset, and the cost of
+    a page does not depend on how deep it is, as each page is selected by a
+    range condition on the index instead of an OFFSET. Ties on
+    publishing_date are broken by id, so no article is skipped or repeated.
+    """
+    ordering = ('-publishing_date', '-pk')
+
+    def __init__(self, queryset, per_page):
+        self.queryset = queryset.order_by(*self.ordering)
+        self.per_page = int(per_page)
+
+    def page(self, after=None, before=None):
+        """
+        Returns the page following the `after` cursor, or the one preceding
+        the `before` cursor, or the first page if neither is given.
+        """
+        qs = self.queryset
+        if before:
+            publishing_date, pk = decode_cursor(before)
+            qs = qs.filter(
+                Q(publishing_date__gt=publishing_date) |
+                Q(publishing_date=publishing_date, pk__gt=pk)
+            ).order_by('publishing_date', 'pk')
+            object_list = list(qs[:self.per_page + 1])
+            has_previous = len(object_list) > self.per_page
+            object_list = object_list[:self.per_page]
+            object_list.reverse()
+            # a page past the newest article has nothing to link from
+            return KeysetPage(
+                object_list, self, bool(object_list), has_previous)
+
+        if after:
+            publishing_date, pk = decode_cursor(after)
+            qs = qs.filter(
+                Q(publishing_date__lt=publishing_date) |
+                Q(publishing_date=publishing_date, pk__lt=pk))
+        object_list = list(qs[:self.per_page + 1])
+        has_previous = bool(after and object_list)
+        has_next = len(object_list) > self.per_page
+        return KeysetPage(
+            object_list[:self.per_page], self, has_next, has_previous)
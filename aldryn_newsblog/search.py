@@ -0,0 +1,324 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import re
+
+from django.conf import settings
+from django.contrib.postgres.lookups import TrigramSimilar
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVector,
+    TrigramSimilarity,
+)
+from django.db import connection
+from django.db.models import (
+    Case,
+    CharField,
+    F,
+    FloatField,
+    Func,
+    OuterRef,
+    Q,
+    Subquery,
+    TextField,
+    Value,
+    When,
+)
+from django.db.models.functions import Greatest, StrIndex, Substr, Upper
+from django.utils.html import escape
+from django.utils.module_loading import import_string
+from django.utils.safestring import mark_safe
+
+from .constants import SEARCH_BACKEND, SEARCH_CONFIGS
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+# marks the start of the content in search_data, see Article.get_search_data
+CONTENT_MARKER = '=c=o=n=t=e=n=t='
+# delimit the matches in snippets until they are escaped
+START_SEL = '\ue000'
+STOP_SEL = '\ue001'
+
+# django.contrib.postgres registers it only if it is installed, the trigram
+# backend needs it either way
+CharField.register_lookup(TrigramSimilar)
+
+
+def get_search_config(language_code):
+    """
+    Returns the postgres text search configuration (dictionary) used for
+    the given language, 'simple' if there is none.
+    """
+    language_code = language_code or ''
+    return SEARCH_CONFIGS.get(
+        language_code,
+        SEARCH_CONFIGS.get(language_code.split('-')[0], 'simple'))
+
+
+def get_config_groups():
+    """
+    Returns [(config, [language codes]), ...] for the configured languages.
+    """
+    groups = {}
+    for code, __ in settings.LANGUAGES:
+        groups.setdefault(get_search_config(code), []).append(code)
+    return sorted(groups.items())
+
+
+def format_snippet(text, words=None):
+    """
+    Returns the given search_data excerpt as safe HTML, with the matches in
+    <mark> elements. They are either delimited by START_SEL and STOP_SEL
+    already, or found here as prefixes of the given words.
+    """
+    text = ' '.join(text.replace(CONTENT_MARKER, ' ').split())
+    if words:
+        pattern = re.compile(
+            r'\b(?:{0})\w*'.format('|'.join(re.escape(w) for w in words)),
+            re.IGNORECASE | re.UNICODE)
+        text = pattern.sub(
+            lambda match: START_SEL + match.group(0) + STOP_SEL, text)
+    return mark_safe(escape(text).replace(
+        START_SEL, '<mark>').replace(STOP_SEL, '</mark>'))
+
+
+class TsHeadline(Func):
+    """
+    Postgres' ts_headline(), SearchHeadline only exists as of django 3.1.
+    """
+    function = 'ts_headline'
+    output_field = TextField()
+
+    def __init__(self, expression, query, config, options):
+        super(TsHeadline, self).__init__(
+            Value(config), expression, query, Value(options))
+
+
+class IContainsSearchBackend(object):
+    """
+    Searches with icontains lookups, works on every database.
+    """
+    ranks = False
+    # characters of search_data around the first match used for snippets
+    snippet_window = 240
+
+    def search(self, queryset, query):
+        """
+        Returns the articles of queryset with the query in the title, lead
+        in or search data of one of their translations.
+        """
+        return queryset.filter_exists(
+            'translations',
+            Q(title__icontains=query) |
+            Q(lead_in__icontains=query) |
+            Q(search_data__icontains=query)
+        )
+
+    def filter_words(self, queryset, query):
+        """
+        Returns the articles of queryset having all words of the query in
+        the search data of one of their translations.
+        """
+        for value in query.split():
+            queryset = queryset.filter_exists(
+                'translations', search_data__icontains=value)
+        return queryset
+
+    def filter_title(self, queryset, query):
+        """
+        Returns the articles of queryset with the query in the title of one
+        of their translations (the `q` filter of the article directory).
+        """
+        return queryset.filter_exists('translations', title__icontains=query)
+
+    def get_translations(self, articles, language_code):
+        translation_model = articles[0]._parler_meta.root_model
+        return translation_model._base_manager.filter(
+            master__in=[article.pk for article in articles],
+            language_code=language_code)
+
+    def get_snippets(self, articles, query, language_code):
+        """
+        Returns {article pk: snippet} for the given articles (the current
+        page of results): the part of the search data of their translation
+        in the given language around the first word of the query, as safe
+        HTML with the words highlighted. Only that part of the search data
+        is loaded.
+        """
+        words = TOKEN_RE.findall(query)
+        if not articles or not words:
+            return {}
+        position = StrIndex(Upper('search_data'), Value(words[0].upper()))
+        start = Greatest(position - self.snippet_window // 3, Value(1))
+        rows = self.get_translations(articles, language_code).annotate(
+            snippet=Substr('search_data', start, self.snippet_window),
+            snippet_start=start,
+        ).values_list('master_id', 'snippet', 'snippet_start')
+        snippets = {}
+        for pk, snippet, snippet_start in rows:
+            snippet = snippet or ''
+            # drop the words cut by the window
+            if snippet_start > 1 and ' ' in snippet:
+                snippet = '... ' + snippet.split(' ', 1)[1]
+            if len(snippet) == self.snippet_window and ' ' in snippet:
+                snippet = snippet.rsplit(' ', 1)[0] + ' ...'
+            snippets[pk] = format_snippet(snippet, words)
+        return snippets
+
+
+class PostgresSearchBackend(IContainsSearchBackend):
+    """
+    Full text search on ArticleTranslation.search_vector, which is kept up
+    to date on save (see update_search_vectors) and GIN indexed. Words match
+    as prefixes, in the text search configuration of each translation's
+    language, and results are ordered by ts_rank.
+    """
+    ranks = True
+
+    def get_raw_query(self, query):
+        words = TOKEN_RE.findall(query)
+        return ' & '.join('{0}:*'.format(word) for word in words)
+
+    def get_match(self, raw_query):
+        match = Q()
+        for config, codes in get_config_groups():
+            match |= Q(language_code__in=codes, search_vector=SearchQuery(
+                raw_query, config=config, search_type='raw'))
+        return match
+
+    def get_rank(self, raw_query):
+        return Case(*[
+            When(language_code__in=codes, then=SearchRank(
+                F('search_vector'),
+                SearchQuery(raw_query, config=config, search_type='raw')))
+            for config, codes in get_config_groups()
+        ], default=Value(0.0), output_field=FloatField())
+
+    def search(self, queryset, query):
+        raw_query = self.get_raw_query(query)
+        if not raw_query:
+            return queryset.none()
+        match = self.get_match(raw_query)
+        translations = queryset.model._parler_meta.root_model._base_manager
+        rank = translations.filter(match, master=OuterRef('pk')).annotate(
+            rank=self.get_rank(raw_query)).order_by('-rank').values('rank')
+        return queryset.filter_exists('translations', match).annotate(
+            search_rank=Subquery(rank[:1], output_field=FloatField()),
+        ).order_by('-search_rank', '-publishing_date')
+
+    def filter_words(self, queryset, query):
+        raw_query = self.get_raw_query(query)
+        if not raw_query:
+            return queryset
+        return queryset.filter_exists('translations', self.get_match(raw_query))
+
+    def get_snippets(self, articles, query, language_code):
+        """
+        Computes the snippets with ts_headline(), which picks the fragments
+        of the search data matching best.
+        """
+        raw_query = self.get_raw_query(query)
+        if not articles or not raw_query:
+            return {}
+        config = get_search_config(language_code)
+        options = (
+            'StartSel="{0}", StopSel="{1}", MaxWords=35, MinWords=15, '
+            'MaxFragments=2, FragmentDelimiter=" ... "'.format(
+                START_SEL, STOP_SEL))
+        headline = TsHeadline(
+            F('search_data'),
+            SearchQuery(raw_query, config=config, search_type='raw'),
+            config, options)
+        rows = self.get_translations(articles, language_code).annotate(
+            snippet=headline).values_list('master_id', 'snippet')
+        return dict(
+            (pk, format_snippet(snippet or '')) for pk, snippet in rows)
+
+
+class TrigramSearchBackend(IContainsSearchBackend):
+    """
+    Typo tolerant search for search-as-you-type, using pg_trgm and the GIN
+    trigram indexes on title and lead_in: matches titles similar to the
+    query, and titles or lead ins containing it, ordered by the similarity
+    of the title. filter_words() still uses icontains on search_data.
+    """
+    ranks = True
+
+    def get_match(self, query):
+        return (
+            Q(title__trigram_similar=query) |
+            Q(title__icontains=query) |
+            Q(lead_in__icontains=query))
+
+    def search(self, queryset, query):
+        query = query.strip()
+        if not query:
+            return queryset.none()
+        translations = queryset.model._parler_meta.root_model._base_manager
+        similarity = translations.filter(master=OuterRef('pk')).annotate(
+            similarity=TrigramSimilarity('title', query),
+        ).order_by('-similarity').values('similarity')
+        return queryset.filter_exists(
+            'translations', self.get_match(query)).annotate(
+                search_rank=Subquery(similarity[:1], output_field=FloatField()),
+        ).order_by('-search_rank', '-publishing_date')
+
+    def filter_title(self, queryset, query):
+        return queryset.filter_exists(
+            'translations',
+            Q(title__trigram_similar=query) | Q(title__icontains=query))
+
+
+BACKENDS = {
+    'icontains': IContainsSearchBackend,
+    'postgres': PostgresSearchBackend,
+    'trigram': TrigramSearchBackend,
+}
+
+
+def get_search_backend():
+    """
+    Returns the search backend selected by ARTICLES_SEARCH_BACKEND: one of
+    BACKENDS, the dotted path of a backend class, or 'auto' for postgres
+    on PostgreSQL and icontains elsewhere.
+    """
+    name = SEARCH_BACKEND
+    if name == 'auto':
+        name = 'postgres' if connection.vendor == 'postgresql' else 'icontains'
+    if name in BACKENDS:
+        return BACKENDS[name]()
+    return import_string(name)()
+
+
+def get_search_vector(language_code):
+    """
+    Returns the expression that computes the search_vector of translations
+    in the given language: title weighs most, then lead in, then the
+    rendered content.
+    """
+    config = get_search_config(language_code)
+    return (
+        SearchVector('title', config=config, weight='A') +
+        SearchVector('lead_in', config=config, weight='B') +
+        SearchVector('search_data', config=config, weight='C'))
+
+
+def update_search_vectors(translations, language_code=None):
+    """
+    Recomputes the search_vector of the given translations queryset, with
+    one UPDATE per language, or a single one if they are all in the given
+    language. Does nothing on other databases than postgres.
+    """
+    if connection.vendor != 'postgresql':
+        return
+    if language_code:
+        translations.update(search_vector=get_search_vector(language_code))
+        return
+    known_codes = []
+    for config, codes in get_config_groups():
+        translations.filter(language_code__in=codes).update(
+            search_vector=get_search_vector(codes[0]))
+        known_codes.extend(codes)
+    translations.exclude(language_code__in=known_codes).update(
+        search_vector=get_search_vector(None))
@@ -2,6 +2,7 @@
 from __future__ import unicode_literals
 
 from django.conf import settings
+from django.db.models import Prefetch
 
 from haystack.constants import DEFAULT_ALIAS
 
@@ -25,6 +26,7 @@ class ArticleIndex(get_index_base()):
     def get_url(self, obj):
         using = getattr(self, '_backend_alias', DEFAULT_ALIAS)
         language = self.get_current_language(using=using, obj=obj)
+        # computed for the whole batch by get_index_queryset()
         return obj.get_absolute_url(language)
 
     def get_description(self, obj):
@@ -41,8 +43,22 @@ class ArticleIndex(get_index_base()):
         return kwargs
 
     def get_index_queryset(self, language):
+        """
+        update_index indexes this queryset in slices of --batch-size
+        articles, each of which takes a fixed number of queries: the
+        articles with their app_config, their translation in the language
+        and their urls.
+        """
         queryset = super(ArticleIndex, self).get_index_queryset(language)
-        return queryset.published().language(language)
+        translations = Article._parler_meta.root_model.objects.filter(
+            language_code=language)
+        return queryset.published().language(language).prefetch_related(
+            Prefetch('translations', queryset=translations),
+        ).with_urls(language).order_by('pk')
+
+    def get_updated_field(self):
+        # allows update_index --age
+        return 'last_modified'
 
     def get_model(self):
         return Article
@@ -53,5 +69,10 @@ class ArticleIndex(get_index_base()):
     def should_update(self, instance, **kwargs):
         using = getattr(self, '_backend_alias', DEFAULT_ALIAS)
         language = self.get_current_language(using=using, obj=instance)
+        prefetched = getattr(instance, '_prefetched_objects_cache', {})
+        if 'translations' in prefetched:
+            return any(
+                translation.language_code == language
+                for translation in prefetched['translations'])
         translations = instance.get_available_languages()
         return translations.filter(language_code=language).exists()
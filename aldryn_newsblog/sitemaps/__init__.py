@@ -1 +1,8 @@
 from .sitemap import NewsBlogSitemap  # NOQA
+from .streaming import (  # NOQA
+    get_sitemap_path,
+    streaming_sitemap,
+    write_namespace_sitemap_files,
+    write_sitemap_file,
+    write_sitemap_files,
+)
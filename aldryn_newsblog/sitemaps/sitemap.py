@@ -4,14 +4,21 @@ from __future__ import unicode_literals
 
 from aldryn_translation_tools.sitemaps import I18NSitemap
 
-from ..models import Article, NewsBlogConfig
-from ..constants import SITEMAP_CHANGEFREQ, SITEMAP_PRIORITY, TRANSLATE_IS_PUBLISHED
+from ..managers import ArticleQuerySet
+from ..models import LANGUAGE_CODES, Article, NewsBlogConfig
+from ..constants import (
+    SITEMAP_CHANGEFREQ,
+    SITEMAP_CHUNK_SIZE,
+    SITEMAP_PRIORITY,
+    TRANSLATE_IS_PUBLISHED,
+)
 
 
 class NewsBlogSitemap(I18NSitemap):
 
     changefreq = SITEMAP_CHANGEFREQ
     priority = SITEMAP_PRIORITY
+    chunk_size = SITEMAP_CHUNK_SIZE
 
     def __init__(self, *args, **kwargs):
         self.namespace = kwargs.pop('namespace', None)
@@ -21,9 +28,9 @@ class NewsBlogSitemap(I18NSitemap):
         super(NewsBlogSitemap, self).__init__(*args, **kwargs)
 
     def items(self):
-        qs = Article.objects.published()
+        qs = Article.objects.published().light_translations()
         if self.language is not None:
-            qs = qs.language(self.language)
+            qs = qs.language(self.language).with_urls(self.language)
         if self.namespace is not None:
             qs = qs.filter(app_config__namespace=self.namespace)
         if self.sitemap_type == 'html':
@@ -35,17 +42,70 @@ class NewsBlogSitemap(I18NSitemap):
     def lastmod(self, obj):
         return obj.publishing_date
 
+    def iter_items(self):
+        """
+        Yields the items ordered by pk, loading chunk_size of them at a time
+        with keyset (pk greater than the last one) queries instead of the
+        OFFSETs of paginated sitemaps. The permalinks of each chunk are
+        resolved in bulk (see ArticleQuerySet.with_urls).
+        """
+        items = self.items().order_by('pk')
+        chunk = list(items[:self.chunk_size])
+        while chunk:
+            for item in chunk:
+                yield item
+            if len(chunk) < self.chunk_size:
+                return
+            chunk = list(items.filter(pk__gt=chunk[-1].pk)[:self.chunk_size])
+
+    def iter_urls(self, domain, protocol='https'):
+        """
+        Yields the urls of all items, as get_urls() does for a page.
+        """
+        for item in self.iter_items():
+            yield {
+                'location': '{0}://{1}{2}'.format(
+                    protocol, domain, self.location(item)),
+                'lastmod': self.lastmod(item),
+                'changefreq': self.changefreq,
+                'priority': self.priority,
+            }
+
+    def with_alternates(self, queryset):
+        """
+        Prepares an article queryset for sitemaps with alternates: evaluating
+        a page of it prefetches the translations (without their bulky
+        fields), from which published_languages() reads, and computes the
+        permalinks in every language at once, so the hreflang urls need no
+        further queries.
+        """
+        return queryset.light_translations().with_urls(*LANGUAGE_CODES)
+
+    def published_languages(self, obj):
+        """
+        Returns the languages in which the article is published, read from
+        its prefetched translations.
+        """
+        return [
+            translation.language_code
+            for translation in obj.translations.all()
+            if translation.is_published_trans]
+
 try:
     from js_sitemap.alt_sitemap import SitemapAlt
     class NewsBlogSitemapAlt(SitemapAlt, NewsBlogSitemap):
         def get_queryset(self):
             if TRANSLATE_IS_PUBLISHED:
-                return Article.objects.published_one_of_trans().prefetch_related('translations').distinct()
-            return super(NewsBlogSitemapAlt, self).get_queryset()
+                return self.with_alternates(
+                    Article.objects.published_one_of_trans())
+            qs = super(NewsBlogSitemapAlt, self).get_queryset()
+            if isinstance(qs, ArticleQuerySet):
+                qs = self.with_alternates(qs)
+            return qs
 
         def languages(self, obj):
             if TRANSLATE_IS_PUBLISHED:
-                return obj.translations.filter(is_published_trans=True).values_list('language_code', flat=True)
+                return self.published_languages(obj)
             return super(NewsBlogSitemapAlt, self).languages(obj)
 except:
     pass
@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import gzip
+import os
+import tempfile
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.contrib.sites.models import Site
+try:
+    from django.contrib.sites.shortcuts import get_current_site
+except ImportError:
+    # Django 1.6
+    from django.contrib.sites.models import get_current_site
+from django.http import StreamingHttpResponse
+from django.utils.translation import get_language
+
+from ..cms_appconfig import NewsBlogConfig
+from ..constants import SITEMAP_PROTOCOL, SITEMAP_ROOT
+from .sitemap import NewsBlogSitemap
+
+SITEMAP_HEADER = (
+    '<?xml version="1.0" encoding="UTF-8"?>\n'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+SITEMAP_FOOTER = '</urlset>\n'
+SITEMAP_FILENAME = 'sitemap-{0}-{1}.xml.gz'
+
+
+def render_url(url):
+    bits = ['<url><loc>', escape(url['location']), '</loc>']
+    if url['lastmod']:
+        bits += ['<lastmod>', url['lastmod'].strftime('%Y-%m-%d'), '</lastmod>']
+    if url['changefreq']:
+        bits += ['<changefreq>', url['changefreq'], '</changefreq>']
+    if url['priority'] is not None:
+        bits += ['<priority>', str(url['priority']), '</priority>']
+    bits.append('</url>\n')
+    return ''.join(bits)
+
+
+def iter_sitemap_xml(sitemap, domain, protocol):
+    """
+    Yields the xml sitemap of all items of the given NewsBlogSitemap, one
+    chunk of urls at a time.
+    """
+    yield SITEMAP_HEADER
+    lines = []
+    for url in sitemap.iter_urls(domain, protocol):
+        lines.append(render_url(url))
+        if len(lines) >= sitemap.chunk_size:
+            yield ''.join(lines)
+            lines = []
+    yield ''.join(lines) + SITEMAP_FOOTER
+
+
+def streaming_sitemap(request, namespace=None, language=None):
+    """
+    Streams the xml sitemap of the articles of the namespace (all of them
+    by default) in the language (the current one by default), without
+    paginating it. Hook it in the project's urls, e.g.:
+
+        url(r'^sitemap-news.xml$', streaming_sitemap,
+            {'namespace': 'news', 'language': 'en'})
+    """
+    newsblog_sitemap = NewsBlogSitemap(
+        namespace=namespace, language=language or get_language())
+    site = get_current_site(request)
+    protocol = newsblog_sitemap.protocol or request.scheme
+    return StreamingHttpResponse(
+        iter_sitemap_xml(newsblog_sitemap, site.domain, protocol),
+        content_type='application/xml')
+
+
+def get_sitemap_path(root, namespace, language):
+    return os.path.join(root, SITEMAP_FILENAME.format(namespace, language))
+
+
+def write_sitemap_file(root, namespace, language, domain=None,
+                       protocol=SITEMAP_PROTOCOL):
+    """
+    Writes the gzipped xml sitemap of the articles of the namespace in the
+    language to root, replacing the previous file at once. Returns its path.
+    """
+    newsblog_sitemap = NewsBlogSitemap(namespace=namespace, language=language)
+    domain = domain or Site.objects.get_current().domain
+    path = get_sitemap_path(root, namespace, language)
+    fd, tmp_path = tempfile.mkstemp(dir=root, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as tmp_file:
+            with gzip.GzipFile(fileobj=tmp_file, mode='wb') as sitemap_file:
+                for chunk in iter_sitemap_xml(
+                        newsblog_sitemap, domain, protocol):
+                    sitemap_file.write(chunk.encode('utf-8'))
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+    except Exception:
+        os.remove(tmp_path)
+        raise
+    return path
+
+
+def write_sitemap_files(root, namespaces=None, languages=None, **kwargs):
+    """
+    Writes the sitemap files of the given namespaces (all sections and the
+    default namespace, which lists all articles, by default) in the given
+    languages (all of them by default). Returns their paths.
+    """
+    if namespaces is None:
+        namespaces = set(NewsBlogConfig.objects.values_list(
+            'namespace', flat=True))
+        namespaces.add(NewsBlogConfig.default_namespace)
+    if languages is None:
+        languages = [language[0] for language in settings.LANGUAGES]
+    if not os.path.isdir(root):
+        os.makedirs(root)
+    return [
+        write_sitemap_file(root, namespace, language, **kwargs)
+        for namespace in sorted(namespaces) for language in languages]
+
+
+def write_namespace_sitemap_files(namespace, root=SITEMAP_ROOT, **kwargs):
+    """
+    Writes the sitemap files of the namespace in all languages, see
+    ArticleSitemapQueue.
+    """
+    return write_sitemap_files(root, [namespace], **kwargs)
@@ -0,0 +1,212 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import os
+import random
+import sys
+import timeit
+from unittest import TestCase, skipUnless
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from aldryn_newsblog.models import LANGUAGE_CODES, Article
+from aldryn_newsblog.search import TrigramSearchBackend, update_search_vectors
+from aldryn_newsblog.sitemaps import NewsBlogSitemap
+from aldryn_newsblog.utils.urls import clear_resolver_caches
+from aldryn_newsblog.utils.utilities import (
+    get_cleaned_bits,
+    get_valid_languages,
+)
+
+from . import NewsBlogTestCase
+from .test_utils import TEXT_PLUGIN_BODIES, legacy_cleaned_bits
+
+# the benchmarks time hot paths over large corpora, they only run with
+# NEWSBLOG_BENCHMARKS=1
+RUN_BENCHMARKS = bool(os.environ.get('NEWSBLOG_BENCHMARKS'))
+benchmark = skipUnless(
+    RUN_BENCHMARKS, 'set NEWSBLOG_BENCHMARKS=1 to run the benchmarks')
+# size of the generated article corpus, set it to 50000 for the reference
+# numbers of the search benchmarks
+CORPUS_SIZE = int(os.environ.get('NEWSBLOG_BENCHMARK_ARTICLES', 2000))
+# articles of the sitemap page of the alternates benchmark
+SITEMAP_PAGE_SIZE = 5000
+CORPUS_WORDS = (
+    'market', 'energy', 'policy', 'health', 'research', 'climate',
+    'finance', 'quarterly', 'report', 'digital', 'transport', 'water',
+    'industry', 'analysis', 'security', 'education', 'innovation',
+    'infrastructure', 'community', 'strategy', 'regional', 'outlook',
+)
+
+
+def create_corpus(app_config, language, size=CORPUS_SIZE, seed=0):
+    """
+    Bulk creates `size` published articles with random titles and lead ins
+    built from CORPUS_WORDS, and returns their pks.
+    """
+    rng = random.Random(seed)
+    published = now()
+    articles = Article.all_objects.bulk_create([
+        Article(app_config=app_config, publishing_date=published,
+                is_published=True)
+        for _ in range(size)])
+    if not all(article.pk for article in articles):
+        # only postgres returns the pks of bulk created rows
+        articles = list(Article.all_objects.order_by('-pk')[:size])
+    translation_model = Article._parler_meta.root_model
+    translation_model.objects.bulk_create([
+        translation_model(
+            master_id=article.pk, language_code=language,
+            is_published_trans=True,
+            slug='benchmark-{0}'.format(article.pk),
+            title=' '.join(rng.sample(CORPUS_WORDS, 4)).capitalize(),
+            lead_in=' '.join(rng.choice(CORPUS_WORDS) for _ in range(30)))
+        for article in articles], batch_size=1000)
+    update_search_vectors(translation_model.objects.filter(
+        master__in=[article.pk for article in articles]))
+    return [article.pk for article in articles]
+
+
+class BenchmarkMixin(object):
+    """
+    Micro-benchmarks of hot paths. Each one compares the previous and the
+    current implementation of the same call and writes both timings to
+    stderr. Decorate them with @benchmark.
+    """
+    repeat = 200
+
+    def measure(self, func, setup=None):
+        """
+        Returns the best time per call of func, in microseconds.
+        """
+        def run():
+            if setup is not None:
+                setup()
+            func()
+        times = timeit.repeat(run, number=self.repeat, repeat=3)
+        return min(times) / self.repeat * 1e6
+
+    def report(self, name, before, after):
+        sys.stderr.write('\n{0}: {1:.1f}us -> {2:.1f}us per call\n'.format(
+            name, before, after))
+
+
+@benchmark
+class BenchmarkTextExtraction(BenchmarkMixin, TestCase):
+    repeat = 50
+
+    def test_get_cleaned_bits(self):
+        def run(extract):
+            for body in TEXT_PLUGIN_BODIES:
+                list(extract(body))
+
+        legacy = self.measure(lambda: run(legacy_cleaned_bits))
+        current = self.measure(lambda: run(get_cleaned_bits))
+        self.report('get_cleaned_bits', legacy, current)
+        self.assertLess(current, legacy)
+
+
+@benchmark
+class BenchmarkValidLanguages(BenchmarkMixin, NewsBlogTestCase):
+
+    def test_get_valid_languages(self):
+        namespace = self.app_config.namespace
+
+        def call():
+            get_valid_languages(namespace, self.language)
+
+        uncached = self.measure(call, setup=clear_resolver_caches)
+        cached = self.measure(call)
+        self.report('get_valid_languages', uncached, cached)
+
+
+@benchmark
+@skipUnless(connection.vendor == 'postgresql', 'needs postgres and pg_trgm')
+class BenchmarkTrigramSearch(BenchmarkMixin, NewsBlogTestCase):
+    """
+    Search-as-you-type latency of the trigram backend over the generated
+    corpus (see CORPUS_SIZE). The target is 50ms per query at 50k articles,
+    compare the reported timings with it on the hardware at hand.
+    """
+    repeat = 5
+    queries = ('infrastr', 'climte report', 'quartely', 'regional outlook')
+
+    def test_search_as_you_type(self):
+        create_corpus(self.app_config, self.language)
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE aldryn_newsblog_article_translation')
+        backend = TrigramSearchBackend()
+        articles = Article.objects.published()
+        for query in self.queries:
+            search = lambda: list(backend.search(articles, query)[:10])
+            elapsed = self.measure(search)
+            sys.stderr.write(
+                '\ntrigram search {0!r} over {1} articles: {2:.1f}ms\n'.format(
+                    query, CORPUS_SIZE, elapsed / 1000))
+
+
+@benchmark
+class BenchmarkSitemapAlternates(BenchmarkMixin, NewsBlogTestCase):
+    """
+    Queries and time needed for the alternates (published languages and
+    hreflang urls) of a sitemap page of SITEMAP_PAGE_SIZE articles, half of
+    them published in a second language. test_sitemaps checks the query
+    count on a few articles.
+    """
+    repeat = 1
+
+    def setUp(self):
+        super(BenchmarkSitemapAlternates, self).setUp()
+        pks = create_corpus(
+            self.app_config, self.language, size=SITEMAP_PAGE_SIZE)
+        other_language = [
+            code for code in LANGUAGE_CODES if code != self.language][0]
+        translation_model = Article._parler_meta.root_model
+        translation_model.objects.bulk_create([
+            translation_model(
+                master_id=pk, language_code=other_language,
+                is_published_trans=bool(pk % 2),
+                slug='benchmark-{0}-{1}'.format(other_language, pk),
+                title='Benchmark {0}'.format(pk))
+            for pk in pks], batch_size=1000)
+        self.page = Article.objects.published_one_of_trans().order_by('pk')
+
+    def legacy_alternates(self):
+        alternates = {}
+        page = self.page.prefetch_related('translations')[:SITEMAP_PAGE_SIZE]
+        for article in page:
+            alternates[article.pk] = [
+                (language, article.get_absolute_url(language))
+                for language in article.translations.filter(
+                    is_published_trans=True).values_list(
+                        'language_code', flat=True).order_by('language_code')]
+        return alternates
+
+    def alternates(self):
+        sitemap = NewsBlogSitemap()
+        alternates = {}
+        page = sitemap.with_alternates(self.page)[:SITEMAP_PAGE_SIZE]
+        for article in page:
+            alternates[article.pk] = [
+                (language, article.get_absolute_url(language))
+                for language in sorted(sitemap.published_languages(article))]
+        return alternates
+
+    def test_alternates(self):
+        with CaptureQueriesContext(connection) as legacy_queries:
+            expected = self.legacy_alternates()
+        with CaptureQueriesContext(connection) as queries:
+            alternates = self.alternates()
+        self.assertEqual(alternates, expected)
+        sys.stderr.write(
+            '\nsitemap alternates of {0} articles: {1} -> {2} '
+            'queries\n'.format(
+                SITEMAP_PAGE_SIZE, len(legacy_queries), len(queries)))
+
+        legacy = self.measure(self.legacy_alternates)
+        current = self.measure(self.alternates)
+        self.report('sitemap alternates', legacy, current)
+        self.assertLess(current, legacy)
@@ -2,8 +2,22 @@
 
 from __future__ import unicode_literals
 
+import json
+import os
+import tempfile
+from datetime import timedelta
+
 from django.core.management import call_command
-from django.utils.translation import activate
+try:
+    from django.core.urlresolvers import reverse
+except ImportError:
+    # Django 2.0
+    from django.urls import reverse
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+from django.utils.translation import activate, override
+from six import StringIO
 
 from aldryn_newsblog.models import Article
 
@@ -34,3 +48,99 @@ class TestCommands(NewsBlogTestCase):
         call_command('rebuild_article_search_data', languages=[self.language])
         # now verify the article's search_data has been updated.
         self.assertEqual(article.search_data, search_data)
+
+    def test_rebuild_search_data_options(self):
+        activate(self.language)
+        published = [self.create_article() for __ in range(3)]
+        unpublished = self.create_article(is_published=False)
+        articles = published + [unpublished]
+        translations = Article._parler_meta.root_model.objects.filter(
+            master__in=articles, language_code=self.language)
+        translations.update(search_data='')
+
+        def rebuilt():
+            return set(translations.exclude(search_data='').values_list(
+                'master_id', flat=True))
+
+        call_command(
+            'rebuild_article_search_data', languages=[self.language],
+            batch_size=2, stdout=StringIO())
+        self.assertEqual(rebuilt(), set(a.pk for a in published))
+
+        translations.update(search_data='')
+        call_command(
+            'rebuild_article_search_data', languages=[self.language],
+            include_unpublished=True, stdout=StringIO())
+        self.assertEqual(rebuilt(), set(a.pk for a in articles))
+
+        translations.update(search_data='')
+        since = now() + timedelta(minutes=1)
+        Article.all_objects.filter(pk=published[0].pk).update(
+            last_modified=since)
+        call_command(
+            'rebuild_article_search_data', languages=[self.language],
+            since=since.isoformat(), stdout=StringIO())
+        self.assertEqual(rebuilt(), {published[0].pk})
+
+    def test_rebuild_search_data_resumes_from_checkpoint(self):
+        activate(self.language)
+        articles = sorted(
+            (self.create_article() for __ in range(4)), key=lambda a: a.pk)
+        translations = Article._parler_meta.root_model.objects.filter(
+            master__in=articles, language_code=self.language)
+        translations.update(search_data='')
+        checkpoint = os.path.join(tempfile.mkdtemp(), 'checkpoint.json')
+        # a previous run stopped after the first shard
+        with open(checkpoint, 'w') as f:
+            json.dump({
+                'options': {
+                    'languages': [self.language],
+                    'since': None,
+                    'include_unpublished': False,
+                    'batch_size': 2,
+                },
+                'done': [[articles[0].pk, articles[1].pk]],
+            }, f)
+
+        call_command(
+            'rebuild_article_search_data', languages=[self.language],
+            batch_size=2, checkpoint=checkpoint, stdout=StringIO())
+        self.assertEqual(
+            set(translations.exclude(search_data='').values_list(
+                'master_id', flat=True)),
+            {articles[2].pk, articles[3].pk})
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_warm_article_feeds(self):
+        article = self.create_article()
+        article.categories.add(self.category1)
+        out = StringIO()
+        call_command(
+            'warm_article_feeds', languages=[self.language], categories=True,
+            stdout=out)
+        with override(self.language):
+            feed_url = reverse(
+                '{0}:article-list-feed'.format(self.app_config.namespace))
+        self.assertIn(feed_url, out.getvalue())
+        self.assertIn('feed documents.', out.getvalue())
+
+        # served from the cache, without loading the articles
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(feed_url, secure=True)
+        self.assertContains(response, article.title)
+        translations_table = Article._parler_meta.root_model._meta.db_table
+        for query in queries:
+            self.assertNotIn(translations_table, query['sql'])
+
+        # category feeds are warmed under the keys of real requests too
+        with override(self.language):
+            category_feed_url = reverse(
+                '{0}:article-list-by-category-feed'.format(
+                    self.app_config.namespace),
+                kwargs={'category': self.category1.slug})
+        self.assertIn(category_feed_url, out.getvalue())
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(category_feed_url, secure=True)
+        self.assertContains(response, article.title)
+        for query in queries:
+            self.assertNotIn(translations_table, query['sql'])
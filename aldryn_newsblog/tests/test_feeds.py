@@ -56,3 +56,41 @@ class TestFeeds(NewsBlogTestsMixin, TransactionTestCase):
 
             self.assertContains(feed, article.title)
             self.assertNotContains(feed, different_category_article.title)
+
+    def test_conditional_get(self):
+        self.create_article()
+        url = reverse(
+            '{0}:article-list-feed'.format(self.app_config.namespace)
+        )
+        self.request = self.get_request('en', url)
+        self.request.current_page = self.page
+        feed = LatestArticlesFeed()(self.request)
+        self.assertEqual(feed.status_code, 200)
+
+        self.request.META['HTTP_IF_NONE_MATCH'] = feed['ETag']
+        not_modified = LatestArticlesFeed()(self.request)
+        self.assertEqual(not_modified.status_code, 304)
+
+        article = self.create_article()
+        changed = LatestArticlesFeed()(self.request)
+        self.assertContains(changed, article.title)
+        self.assertNotEqual(changed['ETag'], feed['ETag'])
+
+    def test_cached_document(self):
+        article = self.create_article()
+        url = reverse(
+            '{0}:article-list-feed'.format(self.app_config.namespace)
+        )
+        self.request = self.get_request('en', url)
+        self.request.current_page = self.page
+        feed = LatestArticlesFeed()(self.request)
+
+        cached = LatestArticlesFeed()(self.request)
+        self.assertEqual(cached.content, feed.content)
+        self.assertEqual(cached['Content-Type'], feed['Content-Type'])
+        self.assertEqual(cached['ETag'], feed['ETag'])
+
+        article.title = 'changed'
+        article.save()
+        changed = LatestArticlesFeed()(self.request)
+        self.assertContains(changed, 'changed')
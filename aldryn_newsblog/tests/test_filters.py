@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+from datetime import datetime, timedelta
+
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils.timezone import make_aware, now
+
+from aldryn_newsblog.cms_appconfig import NewsBlogConfig
+from aldryn_newsblog.facets import (
+    FRESH_KEY,
+    get_facet_counts,
+    get_facet_language,
+    get_fresh_timeout,
+)
+from aldryn_newsblog.filters import (
+    ArticleFilters,
+    RelatedArticlesFilters,
+    get_archive,
+    get_authors,
+    get_categories,
+)
+from aldryn_newsblog.models import Article, ArticleFacetQueue
+
+from . import NewsBlogTestCase
+
+
+class TestExistsFilters(NewsBlogTestCase):
+    """
+    filter_exists() and the Exists* filters must select exactly the same
+    articles as the join + distinct() pattern they replace.
+    """
+
+    def setUp(self):
+        super(TestExistsFilters, self).setUp()
+        self.both = self.create_article(title='apple banana')
+        self.both.categories.add(self.category1, self.category2)
+        self.first = self.create_article(title='apple cherry')
+        self.first.categories.add(self.category1)
+        self.second = self.create_article(title='banana')
+        self.second.categories.add(self.category2)
+        self.none = self.create_article(title='cherry')
+        self.second.create_translation('de', title='apfel', slug='apfel')
+
+    def assertSameArticles(self, joined, exists):
+        joined = list(joined.distinct().order_by('pk'))
+        exists = list(exists.order_by('pk'))
+        self.assertEqual(joined, exists)
+        # no duplicates without distinct()
+        self.assertEqual(len(exists), len(set(exists)))
+
+    def test_m2m_single_value(self):
+        qs = Article.objects.all()
+        self.assertSameArticles(
+            qs.filter(categories=self.category1),
+            qs.filter_exists('categories', pk=self.category1.pk))
+
+    def test_m2m_multiple_values(self):
+        qs = Article.objects.all()
+        categories = [self.category1, self.category2]
+        self.assertSameArticles(
+            qs.filter(categories__in=categories),
+            qs.filter_exists('categories', pk__in=categories))
+
+    def test_m2m_chained(self):
+        qs = Article.objects.all()
+        self.assertSameArticles(
+            qs.filter(categories=self.category1).filter(
+                categories=self.category2),
+            qs.filter_exists('categories', pk=self.category1.pk).filter_exists(
+                'categories', pk=self.category2.pk))
+
+    def test_translated_fields(self):
+        qs = Article.objects.all()
+        for query in ('apple', 'apfel', 'an', 'missing'):
+            self.assertSameArticles(
+                qs.filter(translations__title__icontains=query),
+                qs.filter_exists('translations', title__icontains=query))
+        self.assertSameArticles(
+            qs.filter(
+                Q(translations__title__icontains='cherry') |
+                Q(translations__title__icontains='apfel')),
+            qs.filter_exists(
+                'translations',
+                Q(title__icontains='cherry') | Q(title__icontains='apfel')))
+
+    def test_non_multivalued_relation_falls_back_to_filter(self):
+        qs = Article.objects.all()
+        self.assertSameArticles(
+            qs.filter(app_config=self.app_config),
+            qs.filter_exists('app_config', pk=self.app_config.pk))
+
+    def test_article_filters(self):
+        qs = Article.objects.all()
+        filterset = ArticleFilters(
+            {'category': self.category1.pk}, queryset=qs)
+        self.assertSameArticles(
+            qs.filter(categories=self.category1), filterset.qs)
+        filterset = ArticleFilters({'q': 'apple'}, queryset=qs)
+        self.assertSameArticles(
+            qs.filter(translations__title__icontains='apple'), filterset.qs)
+
+    def test_related_articles_filters(self):
+        qs = Article.objects.all()
+        filterset = RelatedArticlesFilters({
+            'count': 10,
+            'categories': [self.category1.pk, self.category2.pk],
+        }, queryset=qs)
+        self.assertSameArticles(
+            qs.filter(categories__in=[self.category1, self.category2]),
+            filterset.qs)
+
+
+class TestFacetCounts(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestFacetCounts, self).setUp()
+        self.namespace = self.app_config.namespace
+        self.author = self.create_person()
+        self.articles = [
+            self.create_article(
+                author=self.author,
+                publishing_date=make_aware(datetime(2019, month, 10)))
+            for month in (1, 1, 2)]
+        self.articles[0].categories.add(self.category1)
+        self.create_article(is_published=False, author=self.author)
+        self.other_config = NewsBlogConfig.objects.create(namespace='other')
+        # the callbacks only run on commit, which TestCase never does
+        ArticleFacetQueue.objects.process()
+
+    def test_counts(self):
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'author'),
+            [(str(self.author.pk), 3)])
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'month'),
+            [('2019-02', 1), ('2019-01', 2)])
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'category'),
+            [(str(self.category1.pk), 1)])
+
+    def test_reads_queue_expired_counts(self):
+        cache.delete(FRESH_KEY.format(self.namespace, get_facet_language()))
+        # the stored counts are served, the recount is left to the queue
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'month'),
+            [('2019-02', 1), ('2019-01', 2)])
+        self.assertEqual(
+            list(ArticleFacetQueue.objects.values_list(
+                'namespace', flat=True)), [self.namespace])
+        # queued once
+        with self.assertNumQueries(1):
+            get_facet_counts(self.namespace, 'author')
+
+    def test_changes_queue_their_namespaces(self):
+        get_facet_counts(self.namespace, 'month')
+        self.articles[0].is_published = False
+        self.articles[0].save()
+        self.assertEqual(
+            list(ArticleFacetQueue.objects.values_list(
+                'namespace', flat=True)), [self.namespace])
+        # the stored counts are served until the queue is processed
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'month'),
+            [('2019-02', 1), ('2019-01', 2)])
+        self.assertEqual(ArticleFacetQueue.objects.process(), 1)
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'month'),
+            [('2019-02', 1), ('2019-01', 1)])
+
+    def test_moved_articles_queue_both_namespaces(self):
+        self.articles[2].app_config = self.other_config
+        self.articles[2].save()
+        self.assertEqual(
+            set(ArticleFacetQueue.objects.values_list(
+                'namespace', flat=True)), {self.namespace, 'other'})
+        ArticleFacetQueue.objects.process()
+        self.assertEqual(
+            get_facet_counts(self.namespace, 'month'), [('2019-01', 2)])
+        self.assertEqual(get_facet_counts('other', 'month'), [('2019-02', 1)])
+
+    def test_other_namespaces_are_not_recounted(self):
+        get_facet_counts(self.namespace, 'author')
+        self.create_article(app_config=self.other_config)
+        self.assertEqual(
+            list(ArticleFacetQueue.objects.values_list(
+                'namespace', flat=True)), ['other'])
+        # still fresh: a single query reads the stored counts
+        with self.assertNumQueries(1):
+            get_facet_counts(self.namespace, 'author')
+
+    def test_counts_expire_when_scheduled_articles_go_live(self):
+        self.assertIsNone(get_fresh_timeout(self.namespace))
+        self.create_article(publishing_date=now() + timedelta(minutes=5))
+        timeout = get_fresh_timeout(self.namespace)
+        self.assertTrue(0 < timeout <= 5 * 60 + 1)
+
+    def test_helpers_read_the_store(self):
+        get_authors(self.namespace)
+        with self.assertNumQueries(2):
+            authors = get_authors(self.namespace)
+        self.assertEqual(authors[0]['item'], self.author)
+        self.assertEqual(authors[0]['count'], 3)
+        archive = get_archive(self.namespace)
+        self.assertEqual(
+            [(item['year'], item['month'], item['count']) for item in archive],
+            [(2019, '02', 1), (2019, '01', 2)])
+        categories = get_categories(self.namespace)
+        self.assertEqual(
+            [(item['item'], item['count']) for item in categories],
+            [(self.category1, 1)])
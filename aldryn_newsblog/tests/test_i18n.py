@@ -9,6 +9,8 @@ except ImportError:
     from django.urls import NoReverseMatch
 from django.utils.translation import override
 
+from aldryn_newsblog.models import Article
+
 from . import NewsBlogTestCase
 
 
@@ -47,3 +49,22 @@ class TestI18N(NewsBlogTestCase):
         # not available either (should raise NoReverseMatch)
         with self.assertRaises(NoReverseMatch):
             article.get_absolute_url(language='it')
+
+    def test_bulk_absolute_url_fallback(self):
+        with override('en'):
+            article = self.create_article(
+                title='God Save the Queen!', slug='god-save-queen')
+        article.create_translation('de',
+            title='Einigkeit und Recht und Freiheit!',
+            slug='einigkeit-und-recht-und-freiheit')
+
+        for language in ('en', 'de', 'fr'):
+            expected = self.reload(article).get_absolute_url(language=language)
+            article = Article.objects.with_urls(language).get(pk=article.pk)
+            with self.assertNumQueries(0):
+                self.assertEquals(
+                    article.get_absolute_url(language=language), expected)
+
+        article = Article.objects.with_urls('it').get(pk=article.pk)
+        with self.assertRaises(NoReverseMatch):
+            article.get_absolute_url(language='it')
@@ -2,6 +2,12 @@
 
 from __future__ import unicode_literals
 
+from datetime import date, datetime
+
+from django.utils import timezone
+from django.utils.timezone import make_aware
+
+from aldryn_newsblog.cms_appconfig import NewsBlogConfig
 from aldryn_newsblog.models import Article
 
 from . import NewsBlogTestCase
@@ -24,3 +30,146 @@ class TestManagers(NewsBlogTestCase):
         article_url = article.get_absolute_url()
         response = self.client.get(article_url)
         self.assertEqual(response.status_code, 404)
+
+
+class TestMonths(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestMonths, self).setUp()
+        self.namespace = self.app_config.namespace
+        self.articles = [
+            self.create_article(
+                publishing_date=make_aware(datetime(2019, month, day)))
+            for month, day in ((1, 1), (1, 31), (2, 15))]
+
+    def get_months(self):
+        return [
+            (month['date'], month['num_articles'])
+            for month in Article.objects.get_months_cached(
+                request=None, namespace=self.namespace)]
+
+    def test_months_are_bucketed_in_current_timezone(self):
+        with timezone.override('Pacific/Kiritimati'):  # UTC+14
+            self.create_article(
+                publishing_date=make_aware(datetime(2019, 3, 1, 2)))
+            months = Article.objects.get_months(
+                request=None, namespace=self.namespace)
+        self.assertEqual(months[0], {
+            'date': date(2019, 3, 1), 'num_articles': 1})
+        with timezone.override('Pacific/Pago_Pago'):  # UTC-11
+            months = Article.objects.get_months(
+                request=None, namespace=self.namespace)
+        self.assertEqual(months[0], {
+            'date': date(2019, 2, 1), 'num_articles': 2})
+
+    def test_cached_months(self):
+        self.assertEqual(self.get_months(), [
+            (date(2019, 2, 1), 1), (date(2019, 1, 1), 2)])
+        with self.assertNumQueries(0):
+            self.get_months()
+
+    def test_cached_months_are_invalidated(self):
+        self.get_months()
+        article = Article.objects.get(pk=self.articles[2].pk)
+        article.is_published = False
+        article.save()
+        self.assertEqual(self.get_months(), [(date(2019, 1, 1), 2)])
+
+        article.is_published = True
+        article.publishing_date = make_aware(datetime(2019, 1, 20))
+        article.save()
+        self.assertEqual(self.get_months(), [(date(2019, 1, 1), 3)])
+
+        self.articles[0].delete()
+        self.assertEqual(self.get_months(), [(date(2019, 1, 1), 2)])
+
+    def test_unrelated_changes_keep_cached_months(self):
+        self.get_months()
+        article = Article.objects.get(pk=self.articles[0].pk)
+        article.lead_in = 'changed'
+        article.save()
+        with self.assertNumQueries(0):
+            self.get_months()
+
+
+class TestLightTranslations(NewsBlogTestCase):
+
+    def test_heavy_fields_are_deferred(self):
+        for _ in range(3):
+            self.create_article(lead_in='lead in', summary='long summary')
+        with self.assertNumQueries(2):
+            articles = list(Article.objects.language(
+                self.language).light_translations())
+        with self.assertNumQueries(0):
+            for article in articles:
+                self.assertEqual(article.lead_in, 'lead in')
+        translation = articles[0].get_translation(self.language)
+        self.assertIn('search_data', translation.get_deferred_fields())
+        with self.assertNumQueries(1):
+            self.assertEqual(articles[0].summary, 'long summary')
+
+    def test_combines_with_prefetch_plan(self):
+        self.create_article(lead_in='lead in')
+        for qs in (
+                Article.objects.prefetch_plan().light_translations(),
+                Article.objects.light_translations().prefetch_plan()):
+            articles = list(qs.language(self.language))
+            with self.assertNumQueries(0):
+                self.assertEqual(articles[0].lead_in, 'lead in')
+
+
+class TestNeighbours(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestNeighbours, self).setUp()
+        same_date = make_aware(datetime(2019, 1, 2))
+        self.articles = [
+            self.create_article(publishing_date=make_aware(datetime(2019, 1, 1))),
+            self.create_article(publishing_date=same_date),
+            self.create_article(publishing_date=same_date),
+            self.create_article(publishing_date=same_date),
+            self.create_article(publishing_date=make_aware(datetime(2019, 1, 3))),
+        ]
+        # neither of these is a neighbour
+        self.create_article(
+            publishing_date=same_date, is_published=False)
+        self.create_article(
+            publishing_date=same_date,
+            app_config=NewsBlogConfig.objects.create(namespace='another'))
+
+    def get_neighbours(self, article, **kwargs):
+        return Article.all_objects.get_neighbours(
+            article, self.language, **kwargs)
+
+    def test_navigation_visits_every_article(self):
+        article = self.articles[0]
+        self.assertEqual(self.get_neighbours(article)[0], None)
+        visited = [article]
+        while True:
+            following = self.get_neighbours(article)[1]
+            if following is None:
+                break
+            self.assertEqual(self.get_neighbours(following)[0], article)
+            visited.append(following)
+            article = following
+        self.assertEqual(visited, self.articles)
+
+    def test_neighbours_are_cached_until_publication_changes(self):
+        article = self.articles[2]
+        self.get_neighbours(article)
+        # the neighbours and their translations, the urls are resolved
+        with self.assertNumQueries(3):
+            previous, following = self.get_neighbours(article)
+        self.assertEqual(previous, self.articles[1])
+        self.articles[1].is_published = False
+        self.articles[1].save()
+        previous, following = self.get_neighbours(article)
+        self.assertEqual(previous, self.articles[0])
+        self.assertEqual(following, self.articles[3])
+
+    def test_edit_mode_includes_unpublished_articles(self):
+        self.articles[1].is_published = False
+        self.articles[1].save()
+        previous, following = self.get_neighbours(
+            self.articles[2], edit_mode=True)
+        self.assertEqual(previous, self.articles[1])
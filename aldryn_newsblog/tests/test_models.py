@@ -3,13 +3,24 @@
 from __future__ import unicode_literals
 
 import os
+from datetime import timedelta
 
 from django.conf import settings
+try:
+    from django.core.urlresolvers import reverse
+except ImportError:
+    # Django 2.0
+    from django.urls import reverse
 from django.utils.timezone import now
 from django.utils.translation import activate, override
 
-from aldryn_newsblog.models import Article
+from aldryn_newsblog.cms_appconfig import NewsBlogFeed
+from aldryn_newsblog.models import Article, ArticleSearchDataQueue
+from aldryn_newsblog.utils import get_article_versions
+from aldryn_newsblog.utils.urls import get_resolver_cache
+from aldryn_newsblog.views import ArticleListBase
 from cms import api
+from cms.signals import urls_need_reloading
 
 from . import NewsBlogTestCase, NewsBlogTransactionTestCase, TESTS_STATIC_ROOT
 
@@ -199,8 +210,256 @@ class TestModels(NewsBlogTestCase):
         self.assertEquals(article.slug, initial_slug)
 
 
+class TestArticleVersions(NewsBlogTestCase):
+
+    def get_version(self, article):
+        return get_article_versions([article.pk])[article.pk]
+
+    def test_versions_are_stable(self):
+        article = self.create_article()
+        self.assertEqual(self.get_version(article), self.get_version(article))
+
+    def test_save_bumps_version(self):
+        article = self.create_article()
+        version = self.get_version(article)
+        article.title = self.rand_str()
+        article.save()
+        self.assertNotEqual(self.get_version(article), version)
+
+    def test_m2m_change_bumps_version(self):
+        article = self.create_article()
+        version = self.get_version(article)
+        article.categories.add(self.category1)
+        self.assertNotEqual(self.get_version(article), version)
+        version = self.get_version(article)
+        self.category1.article_set.remove(article)
+        self.assertNotEqual(self.get_version(article), version)
+
+    def test_plugin_change_bumps_version(self):
+        article = self.create_article()
+        # the attached model is resolved by the CMS when editing placeholders
+        article.content._get_attached_model()
+        version = self.get_version(article)
+        api.add_plugin(article.content, 'TextPlugin', self.language,
+                       body=self.rand_str())
+        self.assertNotEqual(self.get_version(article), version)
+
+    def test_list_items_are_cached_by_version(self):
+        article = self.create_article()
+        old_title = article.title
+        new_title = self.rand_str()
+        url = reverse('{0}:article-list'.format(self.app_config.namespace))
+        ArticleListBase.item_cache_timeout = 60
+        try:
+            self.assertContains(self.client.get(url), old_title)
+            # no signals, so the cached fragment is still used
+            article.translations.update(title=new_title)
+            self.assertContains(self.client.get(url), old_title)
+            article = self.reload(article)
+            article.save()
+            self.assertContains(self.client.get(url), new_title)
+        finally:
+            ArticleListBase.item_cache_timeout = 0
+
+
+class TestLastModified(NewsBlogTestCase):
+
+    def assertTouched(self, instance, previous):
+        instance = self.reload(instance)
+        self.assertGreater(instance.last_modified, previous.last_modified)
+        return instance
+
+    def test_translation_change_touches_article_and_section(self):
+        article = self.create_article()
+        config = self.reload(self.app_config)
+        article.title = self.rand_str()
+        article.save_translations()
+        self.assertTouched(article, article)
+        self.assertTouched(self.app_config, config)
+
+    def test_m2m_change_touches_article(self):
+        article = self.reload(self.create_article())
+        article.categories.add(self.category1)
+        article = self.assertTouched(article, article)
+        self.category1.article_set.remove(article)
+        self.assertTouched(article, article)
+
+    def test_plugin_change_touches_article(self):
+        article = self.create_article()
+        # the attached model is resolved by the CMS when editing placeholders
+        article.content._get_attached_model()
+        article = self.reload(article)
+        api.add_plugin(article.content, 'TextPlugin', self.language,
+                       body=self.rand_str())
+        self.assertTouched(article, article)
+
+    def test_feeds_are_touched_when_articles_leave(self):
+        feed = NewsBlogFeed.objects.create(namespace='feed')
+        article = self.create_article()
+        article.feeds.add(feed)
+        feed = self.assertTouched(feed, feed)
+        article.feeds.remove(feed)
+        feed = self.assertTouched(feed, feed)
+        article.feeds.add(feed)
+        feed = self.reload(feed)
+        article.delete()
+        self.assertTouched(feed, feed)
+
+
+class TestArticleUrls(NewsBlogTestCase):
+
+    def get_reversed_url(self, article):
+        kwargs = {}
+        permalink_type = article.app_config.permalink_type
+        if 'y' in permalink_type:
+            kwargs['year'] = article.publishing_date.year
+        if 'm' in permalink_type:
+            kwargs['month'] = '%02d' % article.publishing_date.month
+        if 'd' in permalink_type:
+            kwargs['day'] = '%02d' % article.publishing_date.day
+        if 'i' in permalink_type:
+            kwargs['pk'] = article.pk
+        if 's' in permalink_type:
+            kwargs['slug'] = article.slug
+        return reverse('{0}:article-detail'.format(
+            article.app_config.namespace), kwargs=kwargs)
+
+    def test_urls_match_reverse(self):
+        articles = [self.create_article() for _ in range(3)]
+        for permalink_type in ('s', 'ys', 'yms', 'ymds', 'ymdi'):
+            self.app_config.permalink_type = permalink_type
+            self.app_config.save()
+            for article in Article.objects.with_urls(self.language).filter(
+                    pk__in=[article.pk for article in articles]):
+                with self.assertNumQueries(0):
+                    url = article.get_absolute_url(self.language)
+                self.assertEqual(url, self.get_reversed_url(article))
+                self.assertEqual(
+                    self.reload(article).get_absolute_url(self.language), url)
+
+    def test_urls_are_computed_in_one_query(self):
+        for _ in range(5):
+            self.create_article()
+        # resolve the namespace's prefix once
+        self.create_article().get_absolute_url(self.language)
+        # app_config is joined, the slugs take one more query
+        with self.assertNumQueries(2):
+            articles = list(Article.objects.with_urls(self.language))
+        with self.assertNumQueries(0):
+            for article in articles:
+                article.get_absolute_url(self.language)
+
+    def test_urls_use_prefetched_translations(self):
+        for _ in range(5):
+            self.create_article()
+        self.create_article().get_absolute_url(self.language)
+        # app_config is joined, the slugs come with the translations
+        with self.assertNumQueries(2):
+            articles = list(Article.objects.light_translations().with_urls(
+                self.language, 'de'))
+        with self.assertNumQueries(0):
+            urls = [
+                article.get_absolute_url(self.language)
+                for article in articles]
+        self.assertEqual(urls, [
+            self.reload(article).get_absolute_url(self.language)
+            for article in articles])
+
+    def test_url_prefixes_are_cleared_on_reload(self):
+        article = self.create_article()
+        article.get_absolute_url(self.language)
+        self.assertTrue(get_resolver_cache('url_prefixes'))
+        urls_need_reloading.send(sender=None)
+        self.assertFalse(get_resolver_cache('url_prefixes'))
+
+
+class TestSearchDataQueue(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestSearchDataQueue, self).setUp()
+        self.update_search_on_save = Article.update_search_on_save
+        Article.update_search_on_save = True
+        self.article = self.create_article()
+        # the attached model is resolved by the CMS when editing placeholders
+        self.article.content._get_attached_model()
+
+    def tearDown(self):
+        Article.update_search_on_save = self.update_search_on_save
+        super(TestSearchDataQueue, self).tearDown()
+
+    def get_search_data(self):
+        return self.article.translations.get(
+            language_code=self.language).search_data
+
+    def test_plugin_edits_are_coalesced(self):
+        bodies = [self.rand_str() for _ in range(3)]
+        for body in bodies:
+            api.add_plugin(
+                self.article.content, 'TextPlugin', self.language, body=body)
+        # the callbacks only run on commit, which TestCase never does
+        self.assertEqual(ArticleSearchDataQueue.objects.count(), 1)
+        self.assertEqual(ArticleSearchDataQueue.objects.process(), 1)
+        self.assertFalse(ArticleSearchDataQueue.objects.exists())
+        search_data = self.get_search_data()
+        for body in bodies:
+            self.assertIn(body, search_data)
+
+    def test_process_only_given_keys(self):
+        body = self.rand_str()
+        api.add_plugin(
+            self.article.content, 'TextPlugin', self.language, body=body)
+        self.assertEqual(ArticleSearchDataQueue.objects.process(
+            keys=[(self.article.pk + 1, self.language)]), 0)
+        self.assertNotIn(body, self.get_search_data())
+        self.assertEqual(ArticleSearchDataQueue.objects.process(
+            keys=[(self.article.pk, self.language)]), 1)
+        self.assertIn(body, self.get_search_data())
+
+
+class TestPluginIndexCache(NewsBlogTestCase):
+
+    def test_only_changed_plugins_are_rendered(self):
+        article = self.create_article()
+        plugin = api.add_plugin(
+            article.content, 'TextPlugin', self.language, body='first')
+        self.assertIn('first', article.get_search_data(self.language))
+        # no change date update, so the cached text is used
+        type(plugin).objects.filter(pk=plugin.pk).update(body='second')
+        self.assertIn('first', article.get_search_data(self.language))
+        plugin = type(plugin).objects.get(pk=plugin.pk)
+        plugin.save()
+        self.assertIn('second', article.get_search_data(self.language))
+
+    def test_child_changes_are_picked_up(self):
+        article = self.create_article()
+        parent = api.add_plugin(
+            article.content, 'TextPlugin', self.language, body='parent')
+        child = api.add_plugin(
+            article.content, 'TextPlugin', self.language, target=parent,
+            body='child')
+        article.get_search_data(self.language)
+        type(child).objects.filter(pk=child.pk).update(
+            body='updated', changed_date=child.changed_date + timedelta(1))
+        self.assertIn('updated', article.get_search_data(self.language))
+
+
 class TestModelsTransactions(NewsBlogTransactionTestCase):
 
+    def test_search_data_is_recomputed_on_commit(self):
+        update_search_on_save = Article.update_search_on_save
+        Article.update_search_on_save = True
+        try:
+            article = self.create_article()
+            article.content._get_attached_model()
+            body = self.rand_str()
+            api.add_plugin(
+                article.content, 'TextPlugin', self.language, body=body)
+            self.assertIn(body, article.translations.get(
+                language_code=self.language).search_data)
+            self.assertFalse(ArticleSearchDataQueue.objects.exists())
+        finally:
+            Article.update_search_on_save = update_search_on_save
+
     def test_duplicate_title_and_language(self):
         """
         Test that if user attempts to create an article with the same name and
@@ -7,6 +7,8 @@ import datetime
 import pytz
 
 from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 try:
     from django.core.urlresolvers import reverse
 except ImportError:
@@ -14,7 +16,8 @@ except ImportError:
     from django.urls import reverse
 from django.utils.translation import force_text, override
 
-from aldryn_newsblog.models import NewsBlogConfig
+from aldryn_newsblog import default_medium
+from aldryn_newsblog.models import ArticleMedium, NewsBlogConfig
 from cms import api
 from cms.models import StaticPlaceholder
 
@@ -389,3 +392,84 @@ class TestRelatedArticlesPlugin(TestPluginLanguageHelperMixin,
             self.create_article() for _ in range(2)]
         main_article.related.add(related_article)
         self._test_plugin_languages_with_article(related_article)
+
+
+class TestJSRelatedArticlesPlugin(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestJSRelatedArticlesPlugin, self).setUp()
+        self.placeholder = self.plugin_page.placeholders.all()[0]
+        self.author = self.create_person()
+        self.article = self.create_article(author=self.author)
+        self.article.categories.add(self.category1)
+
+    def add_plugin(self, **relations):
+        plugin = api.add_plugin(
+            self.placeholder, 'NewsBlogJSRelatedPlugin', self.language,
+            number_of_articles=5, layout='default')
+        for name, values in relations.items():
+            getattr(plugin, name).set(values)
+        return plugin
+
+    def render(self, plugin):
+        context = plugin.get_plugin_class_instance().render(
+            {'request': None}, plugin, self.placeholder)
+        return list(context['related_articles']), context
+
+    def test_selections(self):
+        plugin = self.add_plugin(
+            related_types=[self.app_config],
+            related_categories=[self.category2, self.category1],
+            related_authors=[self.author])
+        with self.assertNumQueries(1):
+            selections = plugin.get_selections()
+        self.assertEqual(selections['related_types'], [self.app_config.pk])
+        self.assertEqual(
+            selections['related_categories'],
+            [self.category2.pk, self.category1.pk])
+        self.assertEqual(selections['related_types_first'],
+                         self.app_config.namespace)
+        self.assertFalse(selections['default_medium'])
+
+    def test_selections_of_mediums_and_sections(self):
+        other_config = NewsBlogConfig.objects.create(namespace='other')
+        mediums = [
+            ArticleMedium.objects.create(title=title)
+            for title in ('Video', default_medium)]
+        plugin = self.add_plugin(
+            related_types=[other_config, self.app_config],
+            related_mediums=mediums)
+        # a single UNION ALL, on every database
+        with self.assertNumQueries(1):
+            selections = plugin.get_selections()
+        self.assertEqual(
+            selections['related_types'], [other_config.pk, self.app_config.pk])
+        self.assertEqual(selections['related_types_first'], 'other')
+        self.assertEqual(
+            selections['related_mediums'], [medium.pk for medium in mediums])
+        self.assertTrue(selections['default_medium'])
+        self.assertEqual(selections['related_authors'], [])
+
+    def test_render(self):
+        articles, context = self.render(self.add_plugin(
+            related_categories=[self.category1],
+            related_authors=[self.author]))
+        self.assertEqual(articles, [self.article])
+        self.assertEqual(context['related_categories_first'],
+                         self.category1.slug)
+        self.assertEqual(context['author'], self.author)
+        articles, context = self.render(self.add_plugin(
+            related_categories=[self.category2]))
+        self.assertEqual(articles, [])
+
+    def test_query_budget_does_not_depend_on_relations(self):
+        plugin = self.add_plugin()
+        with CaptureQueriesContext(connection) as unfiltered:
+            self.assertEqual(self.render(plugin)[0], [self.article])
+        plugin = self.add_plugin(
+            related_types=[self.app_config],
+            related_categories=[self.category1],
+            related_authors=[self.author])
+        with CaptureQueriesContext(connection) as filtered:
+            self.assertEqual(self.render(plugin)[0], [self.article])
+        self.assertEqual(len(filtered), len(unfiltered))
@@ -1,6 +1,22 @@
 # -*- coding: utf-8 -*-
+from unittest import skipUnless
+
+from django.db import connection
+try:
+    from django.core.urlresolvers import reverse
+except ImportError:
+    # Django 2.0
+    from django.urls import reverse
 from django.utils.translation import activate
 
+from aldryn_newsblog.analytics import record_search, track_search
+from aldryn_newsblog.models import Article, ArticleSearchQuery
+from aldryn_newsblog.search import (
+    IContainsSearchBackend,
+    PostgresSearchBackend,
+    TrigramSearchBackend,
+    update_search_vectors,
+)
 from aldryn_newsblog.search_indexes import ArticleIndex
 
 from . import NewsBlogTestCase
@@ -68,3 +84,145 @@ class ArticleIndexingTests(NewsBlogTestCase):
         # should the index be updated for this object? (no)
         should_update = index.should_update(article)
         self.assertEquals(should_update, False)
+
+    def test_index_queryset_is_loaded_in_bulk(self):
+        activate(self.language)
+        index = self.get_index()
+        articles = [self.create_article() for _ in range(3)]
+        # resolve the namespace's url prefix once
+        articles[0].get_absolute_url(self.language)
+        # articles and app configs, translations, slugs for the urls
+        with self.assertNumQueries(3):
+            indexed = list(index.index_queryset(index._backend_alias))
+        self.assertEqual(
+            [article.pk for article in indexed],
+            sorted(article.pk for article in articles))
+        with self.assertNumQueries(0):
+            for article in indexed:
+                self.assertTrue(index.should_update(article))
+                self.assertEqual(index.get_title(article), article.title)
+                self.assertEqual(
+                    index.get_url(article),
+                    article.get_absolute_url(self.language))
+
+
+class SearchAnalyticsTests(NewsBlogTestCase):
+
+    def test_record_search(self):
+        record_search('apples', 'en', 'news', 3, 0.01)
+        record_search('apples', 'en', 'news', 0, 2.0, 'SELECT 1')
+        entry = ArticleSearchQuery.objects.get()
+        self.assertEqual(entry.searches, 2)
+        self.assertEqual(entry.zero_results, 1)
+        self.assertEqual(entry.slow_searches, 1)
+        self.assertEqual(entry.last_results, 0)
+        self.assertEqual(entry.max_time, 2.0)
+        self.assertAlmostEqual(entry.average_time, 1.005)
+        self.assertEqual(entry.slow_sql, 'SELECT 1')
+
+    def test_track_search(self):
+        with track_search('  Apples\tNorth ', 'en', 'news', True) as search:
+            list(Article.objects.all())
+            search.results = 0
+        entry = ArticleSearchQuery.objects.get()
+        self.assertEqual(entry.query, 'apples north')
+        self.assertEqual(entry.zero_results, 1)
+        self.assertGreater(entry.total_time, 0)
+        with track_search('', 'en', 'news', True) as search:
+            self.assertIsNone(search)
+        with track_search('apples', 'en', 'news', False) as search:
+            self.assertIsNone(search)
+        self.assertEqual(ArticleSearchQuery.objects.count(), 1)
+
+    def test_search_view_records_searches(self):
+        from aldryn_newsblog.views import ArticleSearchResultsList
+
+        self.create_article(title='Apples')
+        url = reverse('{0}:article-search'.format(self.app_config.namespace))
+        ArticleSearchResultsList.search_analytics = True
+        try:
+            self.client.get(url, {'q': 'Apples'})
+        finally:
+            ArticleSearchResultsList.search_analytics = False
+        entry = ArticleSearchQuery.objects.get()
+        self.assertEqual(entry.query, 'apples')
+        self.assertEqual(entry.namespace, self.app_config.namespace)
+        self.assertEqual(entry.last_results, 1)
+
+
+class SearchBackendTestsMixin(object):
+    backend_class = None
+
+    def setUp(self):
+        super(SearchBackendTestsMixin, self).setUp()
+        activate(self.language)
+        self.backend = self.backend_class()
+        self.apples = self.create_article(
+            title='Apples of the north', lead_in='Orchards and harvests')
+        self.pears = self.create_article(
+            title='Pears', lead_in='More than apples')
+        self.other = self.create_article(
+            title='Something else', lead_in='Unrelated')
+
+    def search(self, query):
+        return list(self.backend.search(Article.objects.all(), query))
+
+    def test_search(self):
+        self.assertEqual(
+            set(self.search('apples')), {self.apples, self.pears})
+        self.assertEqual(self.search('orchards'), [self.apples])
+        self.assertEqual(self.search('bananas'), [])
+
+    def test_filter_words(self):
+        Article._parler_meta.root_model.objects.filter(
+            master=self.pears).update(search_data='pears apples orchards')
+        update_search_vectors(Article._parler_meta.root_model.objects.all())
+        self.assertEqual(list(self.backend.filter_words(
+            Article.objects.all(), 'pears orchards')), [self.pears])
+
+    def test_snippets(self):
+        search_data = ' '.join(
+            ['beginning'] + ['filler'] * 200 + ['<pick> the apples'] +
+            ['filler'] * 200 + ['end'])
+        Article._parler_meta.root_model.objects.filter(
+            master=self.pears).update(search_data=search_data)
+        update_search_vectors(Article._parler_meta.root_model.objects.all())
+        snippets = self.backend.get_snippets(
+            [self.pears, self.other], 'apples', self.language)
+        snippet = snippets[self.pears.pk]
+        self.assertIn('&lt;pick&gt; the <mark>apples</mark>', snippet)
+        self.assertNotIn('beginning', snippet)
+        self.assertNotIn('end', snippet)
+        self.assertNotIn('<mark>', snippets.get(self.other.pk, ''))
+        self.assertEqual(self.backend.get_snippets([], 'apples', 'en'), {})
+
+
+class IContainsSearchBackendTests(SearchBackendTestsMixin, NewsBlogTestCase):
+    backend_class = IContainsSearchBackend
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs postgres')
+class PostgresSearchBackendTests(SearchBackendTestsMixin, NewsBlogTestCase):
+    backend_class = PostgresSearchBackend
+
+    def test_vector_follows_saves(self):
+        self.other.title = 'Apples everywhere'
+        self.other.save()
+        self.assertIn(self.other, self.search('apples'))
+
+    def test_prefix_and_stemmed_matches(self):
+        self.assertEqual(self.search('orch'), [self.apples])
+        self.assertEqual(self.search('harvest'), [self.apples])
+
+    def test_title_matches_rank_first(self):
+        self.assertEqual(self.search('apples'), [self.apples, self.pears])
+
+
+@skipUnless(connection.vendor == 'postgresql', 'needs postgres and pg_trgm')
+class TrigramSearchBackendTests(SearchBackendTestsMixin, NewsBlogTestCase):
+    backend_class = TrigramSearchBackend
+
+    def test_typos(self):
+        self.assertEqual(self.search('Apples of the nrth'), [self.apples])
+        self.assertEqual(list(self.backend.filter_title(
+            Article.objects.all(), 'Aples of the north')), [self.apples])
@@ -2,14 +2,28 @@
 
 from __future__ import unicode_literals
 
+import gzip
+import os
+import tempfile
+from xml.etree import ElementTree
+
 from . import NewsBlogTestCase
-from aldryn_newsblog.sitemaps import NewsBlogSitemap
+from aldryn_newsblog.models import Article, ArticleSitemapQueue
+from aldryn_newsblog.sitemaps import (
+    NewsBlogSitemap,
+    get_sitemap_path,
+    streaming_sitemap,
+    write_sitemap_files,
+)
 
 try:
     from django.contrib.sites.shortcuts import get_current_site
 except ImportError:
     # Django 1.6
     from django.contrib.sites.models import get_current_site
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.translation import override
 
 
@@ -95,3 +109,106 @@ class TestSitemaps(NewsBlogTestCase):
         self.assertArticlesIn([multilanguage_article, de_article], de_sitemap)
         self.assertArticlesNotIn([en_article], de_sitemap)
         self.assertSitemapLanguage(de_sitemap, 'de')
+
+
+class TestSitemapAlternates(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestSitemapAlternates, self).setUp()
+        self.articles = [self.create_article() for _ in range(4)]
+        Article._parler_meta.root_model.objects.filter(
+            master__in=self.articles).update(is_published_trans=True)
+        for index, article in enumerate(self.articles[:3]):
+            article.create_translation(
+                'de', title='Artikel {0}'.format(index),
+                slug='artikel-{0}'.format(index),
+                is_published_trans=index != 1)
+
+    def get_alternates(self, articles, get_languages):
+        return dict(
+            (article.pk, [
+                (language, article.get_absolute_url(language))
+                for language in sorted(get_languages(article))])
+            for article in articles)
+
+    def test_alternates_in_two_queries(self):
+        sitemap = NewsBlogSitemap()
+        expected = self.get_alternates(
+            [self.reload(article) for article in self.articles],
+            lambda article: article.translations.filter(
+                is_published_trans=True).values_list(
+                    'language_code', flat=True))
+        # its german translation is not published
+        self.assertEqual(
+            [language for language, __ in expected[self.articles[1].pk]],
+            [self.language])
+
+        # the articles (with their section) and their translations
+        with self.assertNumQueries(2):
+            alternates = self.get_alternates(
+                sitemap.with_alternates(Article.objects.published()),
+                sitemap.published_languages)
+        self.assertEqual(alternates, expected)
+
+
+class TestStreamingSitemaps(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestStreamingSitemaps, self).setUp()
+        self.articles = [self.create_article() for _ in range(7)]
+        self.unpublished = self.create_article(is_published=False)
+        self.domain = get_current_site(self.get_request('en')).domain
+
+    def get_locations(self, document):
+        namespace = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+        return [
+            loc.text for loc in ElementTree.fromstring(document).iter(
+                namespace + 'loc')]
+
+    def test_iter_urls_match_get_urls(self):
+        sitemap = NewsBlogSitemap(language='en')
+        sitemap.chunk_size = 3
+        expected = sorted(url['location'] for url in sitemap.get_urls())
+        with CaptureQueriesContext(connection) as queries:
+            urls = list(sitemap.iter_urls(self.domain, 'http'))
+        self.assertEqual(sorted(url['location'] for url in urls), expected)
+        self.assertEqual(len(urls), 7)
+        for query in queries:
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_streaming_view(self):
+        request = self.get_request('en')
+        response = streaming_sitemap(
+            request, namespace=self.app_config.namespace, language='en')
+        self.assertTrue(response.streaming)
+        locations = self.get_locations(b''.join(response.streaming_content))
+        self.assertEqual(len(locations), 7)
+        for article in self.articles:
+            self.assertIn(
+                'http://{0}{1}'.format(
+                    self.domain, article.get_absolute_url('en')),
+                locations)
+
+    def test_write_sitemap_files(self):
+        root = os.path.join(tempfile.mkdtemp(), 'sitemaps')
+        paths = write_sitemap_files(
+            root, namespaces=[self.app_config.namespace], languages=['en'])
+        self.assertEqual(len(paths), 1)
+        with gzip.open(paths[0]) as sitemap_file:
+            locations = self.get_locations(sitemap_file.read())
+        self.assertEqual(len(locations), 7)
+        self.assertTrue(locations[0].startswith('https://'))
+        self.assertEqual(os.listdir(root), [os.path.basename(paths[0])])
+
+    def test_sitemap_queue(self):
+        root = os.path.join(tempfile.mkdtemp(), 'sitemaps')
+        for _ in range(3):
+            ArticleSitemapQueue.objects.enqueue([self.app_config.namespace])
+        self.assertEqual(ArticleSitemapQueue.objects.count(), 1)
+        self.assertEqual(ArticleSitemapQueue.objects.process(root=root), 1)
+        self.assertFalse(ArticleSitemapQueue.objects.exists())
+        self.assertEqual(
+            sorted(os.listdir(root)),
+            sorted(os.path.basename(get_sitemap_path(
+                root, self.app_config.namespace, language))
+                for language, __ in settings.LANGUAGES))
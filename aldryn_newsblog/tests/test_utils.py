@@ -8,9 +8,63 @@ except ImportError:
     # Django 2.0
     from django.urls import reverse, NoReverseMatch
 
+from html import unescape
 from unittest import TestCase
 
-from ..utils import add_prefix_to_path, default_reverse
+from django.utils.html import strip_tags as django_strip_tags
+from django.utils.text import smart_split
+
+from cms.signals import urls_need_reloading
+from lxml.html.clean import Cleaner
+
+from ..utils import (
+    add_prefix_to_path,
+    default_reverse,
+    get_text_bits,
+    strip_tags,
+)
+from ..utils.urls import get_resolver_cache
+from ..utils.utilities import get_cleaned_bits, get_valid_languages
+from . import NewsBlogTestCase
+
+# bodies of text plugins as saved by the CKEditor, without styles, which the
+# previous pipeline used to index
+TEXT_PLUGIN_BODIES = (
+    '<p>The council approved the <strong>regional transport strategy'
+    '</strong> on Tuesday, after a debate that lasted well into the '
+    'evening.</p>\n<p>&nbsp;</p>\n<p>Funding will come from the '
+    '<a href="/en/budget/" target="_blank">2019 budget</a> &amp; from '
+    'private partners.</p>',
+    '<h2>Key figures</h2>\n<ul>\n\t<li>Revenue: <em>+12%</em></li>\n\t'
+    '<li>Operating margin: 8.4%</li>\n\t<li>Head count: 1&nbsp;250</li>'
+    '\n</ul>\n<p>Figures are unaudited &ndash; see the '
+    '<a href="/en/reports/q3/">full report</a>.</p>',
+    '<blockquote>\n<p>&laquo;We expect the new plant to cut emissions by a '
+    'third&raquo;, said the director.</p>\n</blockquote>\n<p>Construction '
+    'starts in <span class="highlight">spring</span>.</p>',
+    '<table border="1" cellpadding="1" cellspacing="1">\n<thead>\n<tr>\n'
+    '<th scope="col">Region</th>\n<th scope="col">Share</th>\n</tr>\n'
+    '</thead>\n<tbody>\n<tr>\n<td>North</td>\n<td>41&nbsp;%</td>\n</tr>'
+    '\n<tr>\n<td>South</td>\n<td>59&nbsp;%</td>\n</tr>\n</tbody>\n'
+    '</table>\n',
+    '<p><img alt="Chart" src="/media/chart.png" style="width: 400px;" />'
+    '</p>\n<p>Read the <a href="https://example.com/study.pdf">study'
+    '</a> (PDF, 2&nbsp;MB).</p>\n<script>track("study");</script>',
+    '<p>Caf&eacute; owners in Z&uuml;rich say the <em>new rules</em> are '
+    '&quot;unworkable&quot;.</p>\n<!-- editor note: check quote -->\n'
+    '<p>A consultation runs until 30&nbsp;June.</p>',
+)
+
+
+def legacy_cleaned_bits(data):
+    """
+    The pipeline get_cleaned_bits() replaced: lxml's Cleaner, serialised
+    back to HTML, django's strip_tags and smart_split.
+    """
+    data = data.strip()
+    if data:
+        data = django_strip_tags(Cleaner().clean_html(data))
+    return smart_split(data)
 
 
 class TestAddPrefixToPath(TestCase):
@@ -76,3 +130,73 @@ class TestAddPrefixToPath(TestCase):
             except:  # noqa: E722
                 self.fail('default_reverse raised exception even though we '
                           'set a default value of: {0}.'.format(default))
+
+
+class TestGetTextBits(TestCase):
+
+    def test_plain_text(self):
+        self.assertEqual(
+            get_text_bits('Hello! this text  is\nsearchable.'),
+            ['Hello!', 'this', 'text', 'is', 'searchable.'])
+        self.assertEqual(get_text_bits(''), [])
+        self.assertEqual(get_text_bits('   '), [])
+
+    def test_tags_and_entities(self):
+        self.assertEqual(
+            get_text_bits(
+                '<p>Fish &amp; <b>chi</b>ps</p><p>caf&eacute;<br>bar</p>'),
+            ['Fish', '&', 'chips', 'caf\xe9', 'bar'])
+
+    def test_skipped_content(self):
+        self.assertEqual(get_text_bits(
+            '<style>p { color: red; }</style><p>visible</p>'
+            '<script>var hidden = 1;</script><!-- comment -->'
+            '<textarea>field</textarea>tail'), ['visible', 'tail'])
+        self.assertEqual(get_text_bits('<script>alert(1)</script>'), [])
+
+    def test_strip_tags(self):
+        self.assertEqual(strip_tags('<p>one</p> <p>two</p>'), 'one two')
+        self.assertEqual(strip_tags(''), '')
+        self.assertIsNone(strip_tags(None))
+
+
+class TestGetCleanedBits(TestCase):
+
+    def test_same_text_as_the_legacy_cleaner(self):
+        for body in TEXT_PLUGIN_BODIES:
+            legacy = ''.join(legacy_cleaned_bits(body))
+            # the same text, but entities are decoded and block elements
+            # separate words
+            self.assertEqual(
+                ''.join(get_cleaned_bits(body)),
+                unescape(legacy).replace('\xa0', '').replace(' ', ''))
+
+
+class TestValidLanguages(NewsBlogTestCase):
+
+    def test_valid_languages_are_cached(self):
+        namespace = self.app_config.namespace
+        languages = get_valid_languages(namespace, self.language)
+        self.assertIn(self.language, languages)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                get_valid_languages(namespace, self.language), languages)
+        self.assertEqual(
+            get_valid_languages('not-hooked-anywhere', self.language), [])
+
+    def test_warm_cache_skips_the_resolver(self):
+        namespace = self.app_config.namespace
+        languages = get_valid_languages(namespace, self.language)
+        # is_valid_namespace_for_language() reverses, and caches, a url of
+        # the namespace in each language it is asked about
+        valid_namespaces = get_resolver_cache('valid_namespaces')
+        valid_namespaces.clear()
+        self.assertEqual(
+            get_valid_languages(namespace, self.language), languages)
+        self.assertEqual(valid_namespaces, {})
+
+    def test_cache_is_cleared_on_reload(self):
+        get_valid_languages(self.app_config.namespace, self.language)
+        self.assertTrue(get_resolver_cache('valid_languages'))
+        urls_need_reloading.send(sender=None)
+        self.assertFalse(get_resolver_cache('valid_languages'))
@@ -9,17 +9,23 @@ from operator import itemgetter
 from random import randint
 
 from django.conf import settings
+from django.core.cache import cache
 from django.core.files import File as DjangoFile
 try:
-    from django.core.urlresolvers import reverse, NoReverseMatch
+    from django.core.urlresolvers import reverse, resolve, NoReverseMatch
 except ImportError:
     # Django 2.0
-    from django.urls import reverse, NoReverseMatch
+    from django.urls import reverse, resolve, NoReverseMatch
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
 from django.utils.timezone import now
 from django.utils.translation import override
 
 from aldryn_newsblog.models import Article, NewsBlogConfig
+from aldryn_newsblog.pagination import encode_cursor
 from aldryn_newsblog.search_indexes import ArticleIndex
+from aldryn_newsblog.utils import get_current_article
+from aldryn_newsblog.views import ArticleListBase
 from cms.utils.i18n import get_current_language, force_language
 from easy_thumbnails.files import get_thumbnailer
 from filer.models.imagemodels import Image
@@ -227,6 +233,180 @@ class TestViews(NewsBlogTestCase):
         self.assertEqual(response.status_code, 404)
 
 
+class TestListPrefetchPlan(NewsBlogTestCase):
+
+    def count_list_queries(self, paginate_by):
+        self.app_config.paginate_by = paginate_by
+        self.app_config.save()
+        cache.clear()
+        url = reverse('{0}:article-list'.format(self.app_config.namespace))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        for _ in range(12):
+            article = self.create_article()
+            article.categories.add(self.category1, self.category2)
+        # warm up the cms and content type caches
+        self.count_list_queries(1)
+        small_page = self.count_list_queries(3)
+        large_page = self.count_list_queries(12)
+        self.assertLessEqual(large_page, small_page)
+
+    def test_none_plan_is_selectable_per_section(self):
+        for _ in range(6):
+            article = self.create_article()
+            article.categories.add(self.category1)
+        self.app_config.list_prefetch_plan = 'none'
+        self.count_list_queries(1)
+        small_page = self.count_list_queries(2)
+        large_page = self.count_list_queries(6)
+        self.assertGreater(large_page, small_page)
+
+
+class TestKeysetPagination(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestKeysetPagination, self).setUp()
+        self.app_config.pagination_type = 'keyset'
+        self.app_config.paginate_by = 2
+        self.app_config.save()
+        self.list_url = reverse(
+            '{0}:article-list'.format(self.app_config.namespace))
+
+    def test_walks_all_articles_with_ties(self):
+        publishing_date = now()
+        articles = [
+            self.create_article(publishing_date=publishing_date)
+            for _ in range(5)]
+        expected = sorted(articles, key=lambda a: a.pk, reverse=True)
+
+        seen = []
+        url = self.list_url
+        while url:
+            response = self.client.get(url)
+            page = response.context['page_obj']
+            self.assertTrue(page.is_keyset)
+            seen.extend(page.object_list)
+            url = page.next_url and self.list_url + page.next_url
+        self.assertEqual(seen, expected)
+
+        # and back again from the last page
+        previous_url = self.list_url + page.previous_url
+        response = self.client.get(previous_url)
+        self.assertEqual(
+            list(response.context['page_obj'].object_list), expected[2:4])
+
+    def test_does_not_count(self):
+        for _ in range(5):
+            self.create_article()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        article_table = Article._meta.db_table
+        for query in queries:
+            sql = query['sql']
+            self.assertFalse(
+                'COUNT(' in sql and article_table in sql, sql)
+
+    def test_page_numbers_fall_back_to_numbered_pagination(self):
+        for _ in range(5):
+            self.create_article()
+        response = self.client.get(self.list_url + '?page=2')
+        page = response.context['page_obj']
+        self.assertFalse(getattr(page, 'is_keyset', False))
+        self.assertEqual(page.number, 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.list_url + '?after=garbage')
+        self.assertEqual(response.status_code, 404)
+
+    def test_after_oldest_article(self):
+        articles = [self.create_article() for _ in range(3)]
+        oldest = min(articles, key=lambda a: (a.publishing_date, a.pk))
+        response = self.client.get(
+            self.list_url + '?after=' + encode_cursor(oldest))
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page_obj']
+        self.assertEqual(list(page.object_list), [])
+        self.assertFalse(page.has_other_pages())
+        self.assertIsNone(page.previous_url)
+
+    def test_before_newest_article(self):
+        articles = [self.create_article() for _ in range(3)]
+        newest = max(articles, key=lambda a: (a.publishing_date, a.pk))
+        response = self.client.get(
+            self.list_url + '?before=' + encode_cursor(newest))
+        self.assertEqual(response.status_code, 200)
+        page = response.context['page_obj']
+        self.assertEqual(list(page.object_list), [])
+        self.assertFalse(page.has_other_pages())
+        self.assertIsNone(page.next_url)
+
+
+class TestConditionalGet(NewsBlogTestCase):
+
+    def setUp(self):
+        super(TestConditionalGet, self).setUp()
+        self.article = self.create_article()
+        self.list_url = reverse(
+            '{0}:article-list'.format(self.app_config.namespace))
+
+    def assertNotModified(self, url, response):
+        revalidated = self.client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        self.assertEqual(revalidated['ETag'], response['ETag'])
+        revalidated = self.client.get(
+            url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(revalidated.status_code, 304)
+
+    def test_detail(self):
+        url = self.article.get_absolute_url()
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(url, response)
+
+        self.article.title = self.rand_str()
+        self.article.save()
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertContains(changed, self.article.title)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_list(self):
+        response = self.client.get(self.list_url)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotModified(self.list_url, response)
+
+        # any change in the section changes the list
+        self.create_article().categories.add(self.category1)
+        changed = self.client.get(
+            self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], response['ETag'])
+
+    def test_list_answers_before_querying_articles(self):
+        response = self.client.get(self.list_url)
+        with CaptureQueriesContext(connection) as queries:
+            revalidated = self.client.get(
+                self.list_url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        translations_table = Article._parler_meta.root_model._meta.db_table
+        for query in queries:
+            self.assertNotIn(translations_table, query['sql'])
+
+    def test_disabled(self):
+        ArticleListBase.conditional_get = False
+        try:
+            response = self.client.get(self.list_url)
+        finally:
+            ArticleListBase.conditional_get = True
+        self.assertFalse(response.has_header('ETag'))
+
+
 class TestTemplatePrefixes(NewsBlogTestCase):
 
     def setUp(self):
@@ -389,6 +569,8 @@ class TestVariousViews(NewsBlogTestCase):
         article.save()
         months[-1]['num_articles'] -= 1
 
+        for month in months:
+            month['date'] = month['date'].replace(day=1)
         self.assertEquals(
             sorted(
                 Article.objects.get_months(
@@ -488,6 +670,32 @@ class TestVariousViews(NewsBlogTestCase):
             self.client.get(articles[0].get_absolute_url())
 
 
+class TestCurrentArticle(NewsBlogTestCase):
+
+    def test_detail_view_registers_article(self):
+        article = self.create_article()
+        response = self.client.get(article.get_absolute_url())
+        self.assertEqual(
+            get_current_article(response.wsgi_request), article)
+
+    def test_article_is_looked_up_once(self):
+        article = self.create_article()
+        url = article.get_absolute_url()
+        request = self.get_request(self.language, url)
+        request.resolver_match = resolve(url)
+        with self.assertNumQueries(1):
+            self.assertEqual(get_current_article(request), article)
+            self.assertEqual(get_current_article(request), article)
+
+    def test_other_pages_have_no_article(self):
+        url = reverse('{0}:article-list'.format(self.app_config.namespace))
+        request = self.get_request(self.language, url)
+        request.resolver_match = resolve(url)
+        with self.assertNumQueries(0):
+            self.assertIsNone(get_current_article(request))
+        self.assertIsNone(get_current_article(None))
+
+
 class TestIndex(NewsBlogTestCase):
     def test_index_simple(self):
         self.request = self.get_request('en')
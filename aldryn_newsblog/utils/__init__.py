@@ -1,11 +1,21 @@
 # -*- coding: utf-8 -*-
 
+from .cache import (  # NOQA
+    bump_article_version,
+    get_article_versions,
+    get_months_generation,
+    mark_months_stale,
+)
 from .utilities import (  # NOQA
     add_prefix_to_path,
     default_reverse,
     get_cleaned_bits,
+    get_current_article,
     get_field_value,
     get_plugin_index_data,
+    get_plugins_index_data,
     get_request,
+    get_text_bits,
+    set_current_article,
     strip_tags,
 )
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import uuid
+
+from django.core.cache import cache
+
+ARTICLE_VERSION_KEY = 'aldryn_newsblog-article-version-{0}'
+# version stamps must outlive any fragment cached under them
+ARTICLE_VERSION_TIMEOUT = None
+
+
+def _new_version():
+    return uuid.uuid4().hex[:12]
+
+
+def get_article_versions(pks):
+    """
+    Returns a {pk: version} dict with the current version stamp of each of
+    the given articles, using a single cache round trip. Articles without a
+    stamp get a fresh one.
+    """
+    keys = dict((ARTICLE_VERSION_KEY.format(pk), pk) for pk in pks)
+    versions = cache.get_many(keys.keys())
+    missing = dict(
+        (key, _new_version()) for key in keys if key not in versions)
+    if missing:
+        cache.set_many(missing, ARTICLE_VERSION_TIMEOUT)
+        versions.update(missing)
+    return dict((keys[key], version) for key, version in versions.items())
+
+
+def bump_article_version(pk):
+    """
+    Gives the article a new version stamp, so every fragment cached under the
+    previous one is ignored from now on.
+    """
+    cache.set(
+        ARTICLE_VERSION_KEY.format(pk), _new_version(), ARTICLE_VERSION_TIMEOUT)
+
+
+MONTHS_GENERATION_KEY = 'aldryn_newsblog-months-generation'
+
+
+def _get_generation(key):
+    generation = cache.get(key)
+    if generation is None:
+        generation = _new_version()
+        cache.set(key, generation, None)
+    return generation
+
+
+def get_months_generation():
+    """
+    Returns the current generation of the cached month archives.
+    """
+    return _get_generation(MONTHS_GENERATION_KEY)
+
+
+def mark_months_stale():
+    """
+    Invalidates all cached month archives (see AllManager.get_months_cached).
+    """
+    cache.set(MONTHS_GENERATION_KEY, _new_version(), None)
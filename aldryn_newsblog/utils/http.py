@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import calendar
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+
+def use_conditional_get(request):
+    """
+    Conditional responses are only for anonymous GET and HEAD requests
+    outside of the CMS toolbar, whose content depends on the user.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return False
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_authenticated:
+        return False
+    toolbar = getattr(request, 'toolbar', None)
+    return not (toolbar and (toolbar.edit_mode_active or toolbar.show_toolbar))
+
+
+def get_validators(last_modified, *bits):
+    """
+    Returns (etag, timestamp) for a response last modified at the given
+    datetime. The ETag also depends on the given bits (view, language, ...)
+    and, unlike Last-Modified, on fractions of a second.
+    """
+    value = '-'.join(
+        [last_modified.isoformat()] + [str(bit) for bit in bits])
+    etag = '"{0}"'.format(hashlib.md5(value.encode('utf-8')).hexdigest())
+    return etag, calendar.timegm(last_modified.utctimetuple())
+
+
+def set_validators(response, etag, timestamp):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(timestamp)
+    return response
+
+
+def get_not_modified(request, etag, timestamp):
+    """
+    Returns the 304 Not Modified (or 412 Precondition Failed) response for
+    the request's conditional headers, or None if the full response must be
+    rendered.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, timestamp)
+    return response
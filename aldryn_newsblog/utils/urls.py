@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+from __future__ import unicode_literals
+
+import re
+import threading
+
+from django.conf import settings
+try:
+    from django.core.urlresolvers import (
+        NoReverseMatch,
+        get_resolver,
+        get_script_prefix,
+        get_urlconf,
+        reverse,
+    )
+except ImportError:
+    # Django 2.0
+    from django.urls import (
+        NoReverseMatch,
+        get_resolver,
+        get_script_prefix,
+        get_urlconf,
+        reverse,
+    )
+from django.utils.encoding import force_text
+from django.utils.http import RFC3986_SUBDELIMS
+from django.utils.translation import override
+from six.moves.urllib.parse import quote
+
+# the article-detail patterns of aldryn_newsblog.urls, in permalink order
+DETAIL_PATH_PARTS = (
+    ('year', re.compile(r'^\d{4}$')),
+    ('month', re.compile(r'^\d{1,2}$')),
+    ('day', re.compile(r'^\d{1,2}$')),
+    ('pk', re.compile(r'^\d+$')),
+    ('slug', re.compile(r'^\w[-\w]*$', re.UNICODE)),
+)
+DETAIL_PATH_KWARGS = (
+    {'slug'},
+    {'year', 'slug'},
+    {'year', 'month', 'slug'},
+    {'year', 'month', 'day', 'slug'},
+    {'year', 'month', 'day', 'pk'},
+)
+
+_resolver_caches = {}
+_lock = threading.Lock()
+_state = {'resolver': None}
+
+
+def clear_resolver_caches(**kwargs):
+    """
+    Forgets everything cached by get_resolver_cache(). Connected to the
+    signals sent when apphooks or pages change (see models.py).
+    """
+    with _lock:
+        _resolver_caches.clear()
+
+
+def get_resolver_cache(name):
+    """
+    Returns the per-process dict `name`, for caching values derived from
+    the url resolver (use resolver_cache_key() for its keys). All of them are
+    emptied when the url resolver is rebuilt, which is what the CMS does
+    when apphooks are reloaded.
+    """
+    resolver = get_resolver(get_urlconf())
+    with _lock:
+        if _state['resolver'] is not resolver:
+            _resolver_caches.clear()
+            _state['resolver'] = resolver
+        return _resolver_caches.setdefault(name, {})
+
+
+def resolver_cache_key(*bits):
+    return bits + (get_urlconf(), get_script_prefix())
+
+
+def get_url_prefix(namespace, language):
+    """
+    Returns (prefix, namespace) where prefix is the url of the article list
+    of the given namespace in the given language, and namespace is the one
+    actually hooked (the default namespace if the given one is not). The
+    prefix is None if neither is hooked.
+
+    Results are cached per process (see get_resolver_cache), keyed by
+    (namespace, language, site) and the active urlconf.
+    """
+    url_prefixes = get_resolver_cache('url_prefixes')
+    key = resolver_cache_key(
+        namespace, language, getattr(settings, 'SITE_ID', None))
+    if key in url_prefixes:
+        return url_prefixes[key]
+
+    from ..cms_appconfig import NewsBlogConfig
+    result = (None, namespace)
+    with override(language):
+        for candidate in (namespace, NewsBlogConfig.default_namespace):
+            try:
+                prefix = reverse('{0}:article-list'.format(candidate))
+            except NoReverseMatch:
+                continue
+            result = (prefix, candidate)
+            break
+    url_prefixes[key] = result
+    return result
+
+
+def get_detail_path(kwargs):
+    """
+    Returns the article-detail path (relative to the article list) for the
+    given reverse() kwargs, or None if they don't match the patterns.
+    """
+    if set(kwargs) not in DETAIL_PATH_KWARGS:
+        return None
+    bits = []
+    for name, pattern in DETAIL_PATH_PARTS:
+        if name not in kwargs:
+            continue
+        value = force_text(kwargs[name])
+        if not pattern.match(value):
+            return None
+        bits.append(quote(value, safe=RFC3986_SUBDELIMS + '~:@'))
+    return '/'.join(bits) + '/'
+
+
+def reverse_article_detail(namespace, language, kwargs):
+    """
+    Same as reverse('<namespace>:article-detail', kwargs=kwargs) in the given
+    language (falling back to the default namespace if the given one is not
+    hooked), but without resolving anything once the namespace's prefix is
+    cached.
+    """
+    prefix, namespace = get_url_prefix(namespace, language)
+    path = get_detail_path(kwargs)
+    if prefix is None or path is None:
+        with override(language):
+            return reverse(
+                '{0}:article-detail'.format(namespace), kwargs=kwargs)
+    return prefix + path
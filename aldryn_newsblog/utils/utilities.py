@@ -2,9 +2,12 @@
 
 from __future__ import unicode_literals
 
+import threading
+
 from django.conf import settings
 from django.contrib.auth.models import AnonymousUser
 from django.contrib.sites.models import Site
+from django.core.cache import cache
 try:
     from django.contrib.sites.shortcuts import get_current_site
 except ImportError:
@@ -26,15 +29,33 @@ except ImportError:
     except ImportError:
         def force_unicode(value):
             return value.decode()
-from django.utils.html import strip_tags as _strip_tags
-from django.utils.text import smart_split
 
 from cms.plugin_rendering import ContentRenderer
 from cms.utils.i18n import force_language, get_language_object
 
-from lxml.html.clean import Cleaner as LxmlCleaner
+from lxml import etree
+from lxml.html import HTMLParser, fromstring
+
+from ..constants import PLUGIN_INDEX_CACHE_TIMEOUT, SEARCH_SKIP_PLUGINS
+from .urls import get_resolver_cache, resolver_cache_key
+
+# elements whose content is never text
+SKIPPED_TAGS = (
+    'script', 'style', 'noscript', 'template', 'head', 'meta', 'link',
+    'object', 'applet', 'embed', 'iframe', 'frame', 'frameset',
+    'button', 'input', 'select', 'textarea',
+)
+# elements separating words, unlike inline ones (<b>wo</b>rd is one word)
+BLOCK_TAGS = (
+    'address', 'article', 'aside', 'blockquote', 'br', 'dd', 'div', 'dl',
+    'dt', 'figcaption', 'figure', 'footer', 'h1', 'h2', 'h3', 'h4', 'h5',
+    'h6', 'header', 'hr', 'li', 'main', 'nav', 'ol', 'p', 'pre', 'section',
+    'table', 'td', 'th', 'tr', 'ul',
+)
 
-from ..constants import SEARCH_SKIP_PLUGINS
+PLUGIN_INDEX_CACHE_KEY = 'aldryn_newsblog-plugin-index-{0}-{1}-{2:%Y%m%d%H%M%S%f}'
+
+_parsers = threading.local()
 
 def default_reverse(*args, **kwargs):
     """
@@ -72,26 +93,87 @@ def get_request(language=None):
     return request
 
 
-def strip_tags(value):
+def set_current_article(request, article):
     """
-    Returns the given HTML with all tags stripped.
-    We use lxml to strip all js tags and then hand the result to django's
-    strip tags.
+    Registers the article displayed by the given request, so that plugins,
+    the toolbar and menus rendered for it don't have to look it up again.
     """
-    # strip any new lines
-    if value:
-        value = value.strip()
+    if request is not None:
+        request._newsblog_current_article = article
+
+
+def get_current_article(request):
+    """
+    Returns the article displayed by the given request, or None if it is
+    not an article detail page. ArticleDetail registers the article it
+    found; without it, the article is looked up from the resolved url once
+    and remembered for the rest of the request.
+    """
+    if request is None:
+        return None
+    if hasattr(request, '_newsblog_current_article'):
+        return request._newsblog_current_article
+    article = None
+    match = getattr(request, 'resolver_match', None)
+    if (match and match.namespace and
+            match.view_name == '{0}:article-detail'.format(match.namespace)):
+        from ..models import Article
+        articles = Article.all_objects.filter(
+            app_config__namespace=match.namespace)
+        if 'pk' in match.kwargs:
+            article = articles.filter(pk=match.kwargs['pk']).first()
+        elif 'slug' in match.kwargs:
+            language = translation.get_language_from_request(
+                request, check_path=True)
+            article = articles.active_translations(
+                language, slug=match.kwargs['slug']).first()
+    set_current_article(request, article)
+    return article
+
+
+def get_html_parser():
+    # lxml parsers must not be shared between threads
+    parser = getattr(_parsers, 'parser', None)
+    if parser is None:
+        parser = _parsers.parser = HTMLParser(
+            remove_comments=True, remove_pis=True)
+    return parser
+
+
+def get_text_bits(value):
+    """
+    Returns the words of the text content of the given HTML, without the
+    content of scripts, styles, form fields and embedded objects. Entities
+    are decoded and block elements separate words.
+    """
+    if not value or not value.strip():
+        return []
+    try:
+        root = fromstring(value, parser=get_html_parser())
+    except (etree.LxmlError, ValueError):
+        # nothing but comments or processing instructions
+        return []
+    for element in list(root.iter(*SKIPPED_TAGS)):
+        if element is root:
+            return []
+        element.drop_tree()
+    for element in root.iter(*BLOCK_TAGS):
+        element.text = ' ' + (element.text or '')
+        element.tail = ' ' + (element.tail or '')
+    return ''.join(root.itertext()).split()
+
 
+def strip_tags(value):
+    """
+    Returns the text content of the given HTML, see get_text_bits().
+    """
     if value:
-        partial_strip = LxmlCleaner().clean_html(value)
-        value = _strip_tags(partial_strip)
+        value = ' '.join(get_text_bits(value))
     return value
 
 
 def get_cleaned_bits(data):
-    decoded = force_unicode(data)
-    stripped = strip_tags(decoded)
-    return smart_split(stripped)
+    return get_text_bits(force_unicode(data))
 
 
 def get_field_value(obj, name):
@@ -165,6 +247,46 @@ def get_plugin_index_data(base_plugin, request):
     return text_bits
 
 
+def get_plugins_index_data(plugins, request):
+    """
+    Returns the get_plugin_index_data() of each of the given plugins, which
+    must include all descendants of the plugins they contain. The text of
+    each plugin is cached until it or one of its descendants changes, so
+    only the plugins that changed are rendered again.
+    """
+    plugins = list(plugins)
+    if not PLUGIN_INDEX_CACHE_TIMEOUT:
+        return [list(get_plugin_index_data(plugin, request))
+                for plugin in plugins]
+
+    # a plugin's rendering includes its children
+    changed_dates = dict((plugin.pk, plugin.changed_date) for plugin in plugins)
+    parents = dict((plugin.pk, plugin.parent_id) for plugin in plugins)
+    for plugin in plugins:
+        parent_id = plugin.parent_id
+        while parent_id in changed_dates:
+            if changed_dates[parent_id] < plugin.changed_date:
+                changed_dates[parent_id] = plugin.changed_date
+            parent_id = parents[parent_id]
+
+    keys = dict(
+        (plugin.pk, PLUGIN_INDEX_CACHE_KEY.format(
+            plugin.pk, plugin.language, changed_dates[plugin.pk]))
+        for plugin in plugins)
+    cached = cache.get_many(list(keys.values()))
+    missing = {}
+    results = []
+    for plugin in plugins:
+        key = keys[plugin.pk]
+        if key not in cached:
+            cached[key] = missing[key] = list(
+                get_plugin_index_data(plugin, request))
+        results.append(cached[key])
+    if missing:
+        cache.set_many(missing, PLUGIN_INDEX_CACHE_TIMEOUT)
+    return results
+
+
 def add_prefix_to_path(path, prefix):
     splitted_path = path.split('/', 1)
     if len(splitted_path) == 1:
@@ -190,10 +312,15 @@ def is_valid_namespace(namespace):
 def is_valid_namespace_for_language(namespace, language_code):
     """
     Check if provided namespace has an app-hooked page for given language_code.
-    Returns True or False.
+    Returns True or False. The answer is cached per process until the url
+    resolver is rebuilt (see get_resolver_cache).
     """
-    with force_language(language_code):
-        return is_valid_namespace(namespace)
+    valid_namespaces = get_resolver_cache('valid_namespaces')
+    key = resolver_cache_key(namespace, language_code)
+    if key not in valid_namespaces:
+        with force_language(language_code):
+            valid_namespaces[key] = is_valid_namespace(namespace)
+    return valid_namespaces[key]
 
 
 def get_valid_languages_from_request(namespace, request):
@@ -207,6 +334,17 @@ def get_valid_languages_from_request(namespace, request):
 
 
 def get_valid_languages(namespace, language_code, site_id=None):
+    """
+    Returns the given language and its fallbacks (for the given site, the
+    current one by default) in which the namespace is app-hooked. Cached
+    like is_valid_namespace_for_language().
+    """
+    valid_languages = get_resolver_cache('valid_languages')
+    key = resolver_cache_key(
+        namespace, language_code,
+        site_id if site_id is not None else getattr(settings, 'SITE_ID', None))
+    if key in valid_languages:
+        return list(valid_languages[key])
     langs = [language_code]
     if site_id is None:
         site_id = getattr(Site.objects.get_current(), 'pk', None)
@@ -217,4 +355,5 @@ def get_valid_languages(namespace, language_code, site_id=None):
     valid_translations = [
         lang_code for lang_code in langs
         if is_valid_namespace_for_language(namespace, lang_code)]
+    valid_languages[key] = tuple(valid_translations)
     return valid_translations
@@ -39,14 +39,32 @@ from aldryn_people.models import Person
 from js_services.models import Service
 
 from aldryn_newsblog.utils.utilities import get_valid_languages_from_request
-from .cms_appconfig import NewsBlogConfig
+from .cms_appconfig import NewsBlogConfig, PAGINATION_KEYSET, PAGINATION_NUMBERS
 from .models import Article
-from .utils import add_prefix_to_path
+from .pagination import InvalidCursor, KeysetPaginator
+from .analytics import track_search
+from .search import get_search_backend
+from .utils import (
+    add_prefix_to_path,
+    get_article_versions,
+    set_current_article,
+)
+from .utils.http import (
+    get_not_modified,
+    get_validators,
+    set_validators,
+    use_conditional_get,
+)
 from .filters import ArticleFilters, RelatedArticlesFilters
 from .constants import (
+    CONDITIONAL_GET,
     IS_THERE_COMPANIES, 
     SHOW_CONTER_FILTERS, 
     GET_NEXT_ARTICLE,
+    ITEM_CACHE_TIMEOUT,
+    RELATED_ARTICLES_PAGINATION,
+    SEARCH_ANALYTICS,
+    SEARCH_SNIPPETS,
     USE_CACHE,
 )
 
@@ -103,6 +121,48 @@ class CachedMixin():
         return response
 
 
+class ConditionalGetMixin(object):
+    """
+    Sends ETag and Last-Modified headers computed from get_last_modified(),
+    and answers conditional requests with 304 Not Modified as soon as
+    get_not_modified() is called, before the context is built.
+    """
+    conditional_get = CONDITIONAL_GET
+    validators = None
+
+    def get_last_modified(self):
+        return None
+
+    def get_not_modified(self, request):
+        if not (self.conditional_get and use_conditional_get(request)):
+            return None
+        last_modified = self.get_last_modified()
+        if last_modified is None:
+            return None
+        self.validators = get_validators(
+            last_modified, type(self).__name__, translation.get_language())
+        return get_not_modified(request, *self.validators)
+
+    def get_section_last_modified(self, *timestamps):
+        """
+        Returns the last change of the section, its CMS page, the given
+        timestamps and the articles going live in it.
+        """
+        if not self.config:
+            return None
+        page = getattr(self.request, 'current_page', None)
+        return Article.all_objects.get_last_modified(
+            self.config.last_modified, getattr(page, 'changed_date', None),
+            *timestamps, app_config=self.config)
+
+    def dispatch(self, request, *args, **kwargs):
+        response = super(ConditionalGetMixin, self).dispatch(
+            request, *args, **kwargs)
+        if self.validators and response.status_code == 200:
+            set_validators(response, *self.validators)
+        return response
+
+
 class TemplatePrefixMixin(object):
 
     def prefix_template_names(self, template_names):
@@ -154,6 +214,53 @@ class PreviewModeMixin(EditModeMixin):
         return qs
 
 
+class KeysetPaginationMixin(object):
+    """
+    Paginates with a (publishing_date, id) cursor instead of OFFSET/COUNT
+    when get_pagination_type() is 'keyset'. An explicit page number in the
+    request falls back to the regular numbered pagination.
+    """
+    pagination_type = PAGINATION_NUMBERS
+    cursor_after_kwarg = 'after'
+    cursor_before_kwarg = 'before'
+
+    def get_pagination_type(self):
+        return self.pagination_type
+
+    def use_keyset_pagination(self):
+        return (
+            self.get_pagination_type() == PAGINATION_KEYSET and
+            self.page_kwarg not in self.kwargs and
+            self.page_kwarg not in self.request.GET)
+
+    def get_cursor_url(self, kwarg, cursor):
+        query = self.request.GET.copy()
+        for key in (self.page_kwarg, self.cursor_after_kwarg,
+                    self.cursor_before_kwarg):
+            query.pop(key, None)
+        query[kwarg] = cursor
+        return '?{0}'.format(query.urlencode())
+
+    def paginate_queryset(self, queryset, page_size):
+        if not self.use_keyset_pagination():
+            return super(KeysetPaginationMixin, self).paginate_queryset(
+                queryset, page_size)
+        paginator = KeysetPaginator(queryset, page_size)
+        try:
+            page = paginator.page(
+                after=self.request.GET.get(self.cursor_after_kwarg),
+                before=self.request.GET.get(self.cursor_before_kwarg))
+        except InvalidCursor:
+            raise Http404('Invalid pagination cursor.')
+        if page.has_next():
+            page.next_url = self.get_cursor_url(
+                self.cursor_after_kwarg, page.next_cursor)
+        if page.has_previous():
+            page.previous_url = self.get_cursor_url(
+                self.cursor_before_kwarg, page.previous_cursor)
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
 class AppHookCheckMixin(object):
 
     def dispatch(self, request, *args, **kwargs):
@@ -172,8 +279,8 @@ class AppHookCheckMixin(object):
         return qs#.translated(*self.valid_languages)
 
 
-class ArticleDetail(CustomDetailMixin, CachedMixin, AppConfigMixin, AppHookCheckMixin, EditModeMixin,
-                    TranslatableSlugMixin, TemplatePrefixMixin, DetailView):
+class ArticleDetail(CustomDetailMixin, ConditionalGetMixin, CachedMixin, AppConfigMixin, AppHookCheckMixin,
+                    EditModeMixin, TranslatableSlugMixin, TemplatePrefixMixin, DetailView):
     queryset = Article.all_objects
     slug_field = 'slug'
     year_url_kwarg = 'year'
@@ -204,6 +311,9 @@ class ArticleDetail(CustomDetailMixin, CachedMixin, AppConfigMixin, AppHookCheck
             if (self.config.non_permalink_handling == 200 or request.path == url):
                 # Continue as normal
                 #return super(ArticleDetail, self).get(request, *args, **kwargs)
+                not_modified = self.get_not_modified(request)
+                if not_modified is not None:
+                    return not_modified
                 context = self.get_context_data(object=self.object)
                 return self.render_to_response(context)
 
@@ -238,21 +348,26 @@ class ArticleDetail(CustomDetailMixin, CachedMixin, AppConfigMixin, AppHookCheck
 
         if pk is not None:
             # Let the DetailView itself handle this one
-            return DetailView.get_object(self, queryset=queryset)
+            article = DetailView.get_object(self, queryset=queryset)
         elif slug is not None:
             # Let the TranslatedSlugMixin take over
-            return super(ArticleDetail, self).get_object(queryset=queryset)
+            article = super(ArticleDetail, self).get_object(queryset=queryset)
+        else:
+            raise AttributeError('ArticleDetail view must be called with '
+                                 'either an object pk or a slug')
+        # plugins, the toolbar and menus of this request reuse it
+        set_current_article(self.request, article)
+        return article
 
-        raise AttributeError('ArticleDetail view must be called with either '
-                             'an object pk or a slug')
+    def get_last_modified(self):
+        return self.get_section_last_modified(self.object.last_modified)
 
     def get_context_data(self, **kwargs):
         context = super(ArticleDetail, self).get_context_data(**kwargs)
         if GET_NEXT_ARTICLE:
-            context['prev_article'] = self.get_prev_object(
-                self.queryset, self.object)
-            context['next_article'] = self.get_next_object(
-                self.queryset, self.object)
+            context['prev_article'], context['next_article'] = (
+                Article.all_objects.get_neighbours(
+                    self.object, self.get_language(), self.edit_mode))
 
         if False:
             article = context['article']
@@ -277,57 +392,39 @@ class ArticleDetail(CustomDetailMixin, CachedMixin, AppConfigMixin, AppHookCheck
 
         return context
 
-    def get_prev_object(self, queryset=None, object=None):
-        if queryset is None:
-            queryset = self.get_queryset()
-        if object is None:
-            object = self.get_object(self)
-        prev_objs = queryset.filter(
-            publishing_date__lt=object.publishing_date
-        ).order_by(
-            '-publishing_date'
-        )[:1]
-        if prev_objs:
-            return prev_objs[0]
-        else:
-            return None
-
-    def get_next_object(self, queryset=None, object=None):
-        if queryset is None:
-            queryset = self.get_queryset()
-        if object is None:
-            object = self.get_object(self)
-        next_objs = queryset.filter(
-            publishing_date__gt=object.publishing_date
-        ).order_by(
-            'publishing_date'
-        )[:1]
-        if next_objs:
-            return next_objs[0]
-        else:
-            return None
-
 
-class ArticleListBase(CustomListMixin, AppConfigMixin, AppHookCheckMixin, TemplatePrefixMixin,
-                      PreviewModeMixin, ViewUrlMixin, ListView):
+class ArticleListBase(CustomListMixin, ConditionalGetMixin, AppConfigMixin, AppHookCheckMixin,
+                      TemplatePrefixMixin, PreviewModeMixin, ViewUrlMixin, KeysetPaginationMixin, ListView):
     model = Article
     show_header = False
     strict = False
+    # name of the LIST_PREFETCH_PLANS entry used when the section doesn't
+    # choose one
+    prefetch_plan = 'default'
+    item_cache_timeout = ITEM_CACHE_TIMEOUT
+    search_analytics = SEARCH_ANALYTICS
 
     def get(self, request, *args, **kwargs):
         if self.config and self.config.show_landing_page:
             from cms.page_rendering import render_page
             return render_page(request, request.current_page, translation.get_language(), None)
         self.edit_mode = (request.toolbar and request.toolbar.edit_mode_active)
+        not_modified = self.get_not_modified(request)
+        if not_modified is not None:
+            return not_modified
         self.filterset = ArticleFilters(self.request.GET, queryset=self.get_queryset())
         if not self.filterset.is_bound or self.filterset.is_valid() or not self.get_strict():
-            self.object_list = self.filterset.qs.distinct()
+            self.object_list = self.filterset.qs.prefetch_plan(
+                self.get_prefetch_plan()).light_translations().with_urls()
         else:
             self.object_list = self.filterset.queryset.none()
         context = self.get_context_data(filter=self.filterset,
                                         object_list=self.object_list)
         return self.render_to_response(context)
 
+    def get_last_modified(self):
+        return self.get_section_last_modified()
+
     def get_paginate_by(self, queryset):
         if self.paginate_by is not None:
             return self.paginate_by
@@ -358,19 +455,70 @@ class ArticleListBase(CustomListMixin, AppConfigMixin, AppHookCheckMixin, Templa
         options['pages_visible_total_negative'] = pages_visible_negative - 1
         return options
 
+    def get_item_cache(self, object_list):
+        """
+        Stamps the articles of the current page with their cache version and
+        returns the settings the list template uses to cache each rendered
+        item, or None if item caching is off for this request.
+        """
+        if not self.item_cache_timeout or self.edit_mode:
+            return None
+        articles = list(object_list)
+        versions = get_article_versions([article.pk for article in articles])
+        for article in articles:
+            article.cache_version = versions[article.pk]
+        return {
+            'timeout': self.item_cache_timeout,
+            'language': translation.get_language(),
+            'prefix': (self.config and self.config.template_prefix) or '',
+        }
+
+    def get_search_query(self):
+        """
+        Returns the search query of the request, recorded with the database
+        time of the page when search analytics are on.
+        """
+        return self.request.GET.get('q', '')
+
     def get_context_data(self, **kwargs):
+        with track_search(self.get_search_query(), translation.get_language(),
+                          self.namespace, self.search_analytics) as search:
+            context = self.get_list_context_data(**kwargs)
+            if search is not None:
+                search.results = getattr(context.get('paginator'), 'count', None)
+                if search.results is None:
+                    search.results = len(context['object_list'])
+        return context
+
+    def get_list_context_data(self, **kwargs):
         context = super(ArticleListBase, self).get_context_data(**kwargs)
         context['pagination'] = self.get_pagination_options()
+        context['item_cache'] = self.get_item_cache(context['object_list'])
         if SHOW_CONTER_FILTERS:
-            from .filters import get_services, get_authors, get_archive
+            from .filters import (
+                get_archive, get_authors, get_categories, get_locations,
+                get_mediums, get_services)
             context['filter_services'] = get_services(self.namespace)
             context['filter_authors'] = get_authors(self.namespace)
             context['filter_archive'] = get_archive(self.namespace)
+            context['filter_categories'] = get_categories(self.namespace)
+            context['filter_locations'] = get_locations(self.namespace)
+            context['filter_mediums'] = get_mediums(self.namespace)
         return context
 
     def get_strict(self):
         return self.strict
 
+    def get_prefetch_plan(self):
+        if self.config and self.config.list_prefetch_plan:
+            return self.config.list_prefetch_plan
+        return self.prefetch_plan
+
+    def get_pagination_type(self):
+        if self.config:
+            return self.config.pagination_type
+        return self.pagination_type
+
 
 class ArticleList(ArticleListBase):
     """A complete list of articles."""
@@ -395,6 +543,9 @@ class ArticleSearchResultsList(ArticleListBase):
     http_method_names = ['get', 'post', ]
     partial_name = 'aldryn_newsblog/includes/search_results.html'
     template_name = 'aldryn_newsblog/article_list.html'
+    show_snippets = SEARCH_SNIPPETS
+    # searches answered with 304 Not Modified would not be recorded
+    conditional_get = CONDITIONAL_GET and not SEARCH_ANALYTICS
 
     def get(self, request, *args, **kwargs):
         self.query = request.GET.get('q')
@@ -412,17 +563,42 @@ class ArticleSearchResultsList(ArticleListBase):
     def get_queryset(self):
         qs = super(ArticleSearchResultsList, self).get_queryset()
         if self.query:
-            return qs.filter(
-                Q(translations__title__icontains=self.query) |
-                Q(translations__lead_in__icontains=self.query) |
-                Q(translations__search_data__icontains=self.query)
-            ).distinct()
+            return get_search_backend().search(qs, self.query)
         else:
             return qs.none()
 
-    def get_context_data(self, **kwargs):
-        cxt = super(ArticleSearchResultsList, self).get_context_data(**kwargs)
+    def get_pagination_type(self):
+        if self.query and get_search_backend().ranks:
+            # cursors follow the publishing date, not the search rank
+            return PAGINATION_NUMBERS
+        return super(ArticleSearchResultsList, self).get_pagination_type()
+
+    def get_item_cache(self, object_list):
+        if self.show_snippets:
+            # items depend on the query
+            return None
+        return super(ArticleSearchResultsList, self).get_item_cache(
+            object_list)
+
+    def set_snippets(self, object_list):
+        """
+        Sets the search_snippet of the articles of the current page.
+        """
+        articles = list(object_list)
+        snippets = get_search_backend().get_snippets(
+            articles, self.query, translation.get_language())
+        for article in articles:
+            article.search_snippet = snippets.get(article.pk, '')
+
+    def get_search_query(self):
+        return self.query or ''
+
+    def get_list_context_data(self, **kwargs):
+        cxt = super(ArticleSearchResultsList, self).get_list_context_data(
+            **kwargs)
         cxt['query'] = self.query
+        if self.show_snippets and self.query:
+            self.set_snippets(cxt['object_list'])
         return cxt
 
     def get_template_names(self):
@@ -443,7 +619,7 @@ class AuthorArticleList(ArticleListBase):
             Q(author=self.author) |
             Q(author_2=self.author) |
             Q(author_3=self.author)
-        ).distinct()
+        )
 
     def get(self, request, author):
         language = translation.get_language_from_request(
@@ -462,8 +638,8 @@ class AuthorArticleList(ArticleListBase):
 class CategoryArticleList(ArticleListBase):
     """A list of articles filtered by categories."""
     def get_queryset(self):
-        return super(CategoryArticleList, self).get_queryset().filter(
-            categories=self.category
+        return super(CategoryArticleList, self).get_queryset().filter_exists(
+            'categories', pk=self.category.pk
         )
 
     def get(self, request, category):
@@ -481,8 +657,8 @@ class CategoryArticleList(ArticleListBase):
 class ServiceArticleList(ArticleListBase):
     """A list of articles filtered by services."""
     def get_queryset(self):
-        return super(ServiceArticleList, self).get_queryset().filter(
-            services=self.service
+        return super(ServiceArticleList, self).get_queryset().filter_exists(
+            'services', pk=self.service.pk
         )
 
     def get(self, request, service):
@@ -550,10 +726,11 @@ class DayArticleList(DateRangeArticleList):
         return date_from, date_to
 
 
-class RelatedArticles(ListView):
+class RelatedArticles(KeysetPaginationMixin, ListView):
     model = Article
     template_name = 'aldryn_newsblog/article_list.html'
     paginate_by = 8
+    pagination_type = RELATED_ARTICLES_PAGINATION
     type_url_kwarg = 'type'
     category_url_kwarg = 'category'
     pagination_pages_start = 5
@@ -607,13 +784,13 @@ class RelatedArticles(ListView):
         category_url = self.kwargs.get(self.category_url_kwarg, 'all')
 
         qs = Article.objects.all().filter(is_published=True).filter(
-            publishing_date__lte=datetime.now()).distinct()
+            publishing_date__lte=datetime.now())
         if type_url != 'all':
             qs_type = NewsBlogConfig.objects.all().filter(namespace__iexact=type_url)
             qs = qs.filter(app_config__in=qs_type)
         if category_url != 'all':
             qs_category = Category.objects.all().filter(translations__slug__iexact=category_url)
-            qs = qs.filter(categories__in=qs_category.all())
+            qs = qs.filter_exists('categories', pk__in=qs_category.all())
         return qs
 
 
@@ -662,7 +839,7 @@ class ArticleRelatedView(TranslatableSlugMixin, ListView):
 
         try:
             count = int(self.filterset.form['count'].value())
-            self.object_list = self.object_list.distinct()[:count]
+            self.object_list = self.object_list[:count]
         except:
             pass
 